@@ -0,0 +1,275 @@
+# benchmarks/run.py
+"""
+Benchmarks for the hot paths: single-twin and fleet simulation, decisions,
+ET0 from a recorded Open-Meteo payload, ensembles and the dashboard's
+simulate-to-DataFrame pipeline. Nothing touches the network.
+
+    python -m benchmarks.run --days 365 --fields 10000 --members 500 --output bench.json
+    python -m benchmarks.run --compare bench.json
+
+Results are written as JSON together with the scale and environment, so runs
+can be compared over time; --compare exits with status 1 when a benchmark got
+slower than --tolerance times its previous best.
+"""
+import argparse
+import atexit
+import copy
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.ensemble import run_ensemble
+from core.fleet import FleetSimulator, run_closed_loop
+from core.simulator import SoilTwinSimulator
+from core.weather_api import parse_daily
+from domain.soil import LOAM, WHEAT
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "data", "open_meteo_forecast.json")
+
+
+@dataclass
+class Scale:
+    days: int = 365
+    fields: int = 10000
+    members: int = 500
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark: setup(scale) returns the function to time and the work units it covers."""
+    name: str
+    unit: str
+    setup: Callable[[Scale], Tuple[Callable[[], object], int]]
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def register_benchmark(name: str, unit: str):
+    def decorator(setup):
+        BENCHMARKS[name] = Benchmark(name=name, unit=unit, setup=setup)
+        return setup
+    return decorator
+
+
+def recorded_payload(days: int) -> dict:
+    """
+    The recorded Open-Meteo forecast, with its daily series repeated to cover
+    days days on consecutive dates.
+    """
+    with open(PAYLOAD_PATH, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    daily = payload["daily"]
+    recorded = len(daily["time"])
+    start = date.fromisoformat(daily["time"][0])
+    tiled = {
+        variable: [values[i % recorded] for i in range(days)]
+        for variable, values in daily.items()
+    }
+    tiled["time"] = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    payload = copy.deepcopy(payload)
+    payload["daily"] = tiled
+    return payload
+
+
+def _forcing(days: int) -> Tuple[np.ndarray, np.ndarray]:
+    et0, rain = parse_daily(recorded_payload(days)["daily"], latitude=35.7)
+    return np.array(et0), np.array(rain)
+
+
+@register_benchmark("simulator_step", unit="day")
+def _simulator_step(scale: Scale):
+    et0, rain = (values.tolist() for values in _forcing(scale.days))
+
+    def run():
+        simulator = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=100.0)
+        for day in range(scale.days):
+            simulator.step(et0[day], rain[day], 0.0)
+    return run, scale.days
+
+
+@register_benchmark("simulator_fast_forward", unit="day")
+def _simulator_fast_forward(scale: Scale):
+    et0, rain = _forcing(scale.days)
+
+    def run():
+        SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=100.0).fast_forward(et0, rain)
+    return run, scale.days
+
+
+@register_benchmark("decision_evaluate", unit="call")
+def _decision_evaluate(scale: Scale):
+    engine = DecisionEngine()
+    rng = np.random.default_rng(0)
+    stress = rng.uniform(0.0, 1.0, scale.days).tolist()
+    moisture = rng.uniform(0.0, 150.0, scale.days).tolist()
+
+    def run():
+        for i in range(scale.days):
+            engine.evaluate(stress[i], moisture[i], 150.0)
+    return run, scale.days
+
+
+@register_benchmark("decision_evaluate_batch", unit="field")
+def _decision_evaluate_batch(scale: Scale):
+    engine = DecisionEngine()
+    rng = np.random.default_rng(0)
+    stress = rng.uniform(0.0, 1.0, scale.fields)
+    moisture = rng.uniform(0.0, 150.0, scale.fields)
+    return (lambda: engine.evaluate_batch(stress, moisture, 150.0)), scale.fields
+
+
+@register_benchmark("fleet_closed_loop", unit="field-day")
+def _fleet_closed_loop(scale: Scale):
+    et0, rain = _forcing(scale.days)
+    initial = np.random.default_rng(0).uniform(60.0, 150.0, scale.fields)
+    engine = DecisionEngine()
+
+    def run():
+        fleet = FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, initial)
+        run_closed_loop(fleet, engine, et0, rain)
+    return run, scale.fields * scale.days
+
+
+@register_benchmark("et0_hargreaves", unit="day")
+def _et0_hargreaves(scale: Scale):
+    daily = recorded_payload(scale.days)["daily"]
+    return (lambda: parse_daily(daily, 35.7, "hargreaves", 1191.0)), scale.days
+
+
+@register_benchmark("et0_penman_monteith", unit="day")
+def _et0_penman_monteith(scale: Scale):
+    daily = recorded_payload(scale.days)["daily"]
+    return (lambda: parse_daily(daily, 35.7, "penman_monteith", 1191.0)), scale.days
+
+
+@register_benchmark("ensemble", unit="member-day")
+def _ensemble(scale: Scale):
+    et0, rain = _forcing(scale.days)
+
+    def run():
+        run_ensemble(LOAM, WHEAT, 100.0, et0, rain, members=scale.members, seed=0)
+    return run, scale.members * scale.days
+
+
+@register_benchmark("dashboard_pipeline", unit="day")
+def _dashboard_pipeline(scale: Scale):
+    # Imported here: the dashboard module sets up its caches and geocoder on import
+    from core.weather_api import DEFAULT_ET0_METHOD, daily_variables
+    from core.weather_cache import WeatherCache
+    from dashboard.compute import _simulate
+
+    # Offline cache replaying the recorded payload for the benchmark location
+    directory = tempfile.mkdtemp(prefix="soiltwin-bench-")
+    atexit.register(shutil.rmtree, directory, True)
+    cache = WeatherCache(directory=directory, offline=True)
+    variables = daily_variables(DEFAULT_ET0_METHOD)
+    cache.put(cache.key(35.7, 51.4, "recorded", "recorded", variables), recorded_payload(scale.days))
+
+    def run():
+        _simulate("Loam", "Wheat", "Normal", 35.7, 51.4, scale.days, weather_cache=cache)
+    return run, scale.days
+
+
+def time_benchmark(benchmark: Benchmark, scale: Scale, repeat: int) -> dict:
+    """Run one benchmark once to warm up, then repeat times; report the timings in seconds."""
+    run, units = benchmark.setup(scale)
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "unit": benchmark.unit,
+        "units": units,
+        "best_s": best,
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+        "units_per_s": units / best if best > 0 else float("inf"),
+        "repeat": repeat,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare(results: dict, previous: dict, tolerance: float) -> List[str]:
+    """Names of benchmarks whose best time grew beyond tolerance times the previous best."""
+    if results["scale"] != previous.get("scale"):
+        print(f"warning: scale differs from the previous run ({previous.get('scale')})", file=sys.stderr)
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        before = previous.get("benchmarks", {}).get(name)
+        if before is None:
+            continue
+        ratio = result["best_s"] / before["best_s"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"{name:28s} {before['best_s'] * 1e3:10.2f} ms -> {result['best_s'] * 1e3:10.2f} ms  x{ratio:5.2f} {flag}")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SoilTwin performance benchmarks")
+    parser.add_argument("--days", type=int, default=Scale.days, help="simulated days")
+    parser.add_argument("--fields", type=int, default=Scale.fields, help="fields in fleet benchmarks")
+    parser.add_argument("--members", type=int, default=Scale.members, help="ensemble members")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    scale = Scale(days=args.days, fields=args.fields, members=args.members)
+    results = {"environment": environment(), "scale": vars(scale), "benchmarks": {}}
+    for name in args.only or BENCHMARKS:
+        result = time_benchmark(BENCHMARKS[name], scale, args.repeat)
+        results["benchmarks"][name] = result
+        print(f"{name:28s} {result['best_s'] * 1e3:10.2f} ms  {result['units_per_s']:14,.0f} {result['unit']}/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if compare(results, previous, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
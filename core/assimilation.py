@@ -0,0 +1,140 @@
+# core/assimilation.py
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+
+
+@dataclass
+class AssimilationResult:
+    """
+    Outcome of one batch of sensor readings.
+
+    updated lists the flat indices of the fields that received readings;
+    innovation_mm and variance_mm2 hold, per field (fleet shape), the last
+    innovation (NaN for fields without readings) and the posterior variance.
+    """
+    updated: np.ndarray
+    innovation_mm: np.ndarray
+    variance_mm2: np.ndarray
+    accepted: int
+    unknown: int
+    stale: int
+
+
+class MoistureAssimilator:
+    """
+    Kalman filter that corrects the soil moisture of a fleet of twins with
+    probe readings.
+
+    Moisture is the only state a reading observes, so each field carries a
+    scalar Kalman filter: forecast() grows the variance with the process
+    noise after the twins are stepped, assimilate() fuses a batch of readings.
+    Readings are matched to fields through a sorted id index (searchsorted),
+    and several readings of one field in a batch are combined in information
+    form with bincount, which equals applying them one after the other.
+    """
+
+    def __init__(
+        self,
+        fleet: FleetSimulator,
+        field_ids,
+        process_noise_mm2: float = 4.0,
+        sensor_noise_mm2: float = 9.0,
+        initial_variance_mm2: float = 100.0
+    ):
+        """
+        Args:
+            fleet: twins to correct (their soil_moisture_mm is replaced on updates)
+            field_ids: probe field id of every fleet field, in flat fleet order
+            process_noise_mm2: model error variance added per simulated day
+            sensor_noise_mm2: default variance of one reading
+            initial_variance_mm2: variance of the initial moisture
+        """
+        self.fleet = fleet
+        field_ids = np.asarray(field_ids).reshape(-1)
+        if len(field_ids) != fleet.size:
+            raise ValueError(f"Expected {fleet.size} field ids, got {len(field_ids)}")
+        self._order = np.argsort(field_ids, kind="stable")
+        self._sorted_ids = field_ids[self._order]
+        if np.any(self._sorted_ids[1:] == self._sorted_ids[:-1]):
+            raise ValueError("Field ids must be unique")
+
+        self.process_noise_mm2 = process_noise_mm2
+        self.sensor_noise_mm2 = sensor_noise_mm2
+        self.variance_mm2 = np.full(fleet.size, float(initial_variance_mm2))
+        self.last_reading = np.full(fleet.size, -np.inf)
+
+    def lookup(self, field_ids) -> np.ndarray:
+        """Flat fleet index for every id, -1 for unknown ids."""
+        field_ids = np.asarray(field_ids)
+        position = np.searchsorted(self._sorted_ids, field_ids)
+        position = np.minimum(position, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[position] == field_ids
+        return np.where(found, self._order[position], -1)
+
+    def forecast(self, days: int = 1):
+        """Account for the model error of days simulated since the last call."""
+        self.variance_mm2 += self.process_noise_mm2 * days
+
+    def assimilate(self, field_ids, timestamps, moisture_mm, noise_mm2=None) -> AssimilationResult:
+        """
+        Fuse a batch of readings into the fleet's moisture.
+
+        Args:
+            field_ids: probe field id per reading
+            timestamps: reading times (numbers or datetime64); readings not newer
+                than the last one assimilated for their field are dropped as stale
+            moisture_mm: measured soil moisture per reading
+            noise_mm2: variance per reading (default: sensor_noise_mm2)
+
+        Returns:
+            AssimilationResult for the batch
+        """
+        timestamps = np.asarray(timestamps)
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            timestamps = timestamps.astype("datetime64[ms]").astype(np.int64) / 1000.0
+        timestamps = timestamps.astype(np.float64).reshape(-1)
+        moisture_mm = np.asarray(moisture_mm, dtype=np.float64).reshape(-1)
+        noise = np.broadcast_to(
+            np.asarray(self.sensor_noise_mm2 if noise_mm2 is None else noise_mm2, dtype=np.float64),
+            moisture_mm.shape
+        )
+
+        index = self.lookup(np.asarray(field_ids).reshape(-1))
+        known = index >= 0
+        fresh = known & ~np.isnan(moisture_mm)
+        fresh[fresh] = timestamps[fresh] > self.last_reading[index[fresh]]
+        unknown = int(np.count_nonzero(~known))
+        stale = int(np.count_nonzero(known)) - int(np.count_nonzero(fresh))
+
+        index, timestamps, moisture_mm, noise = index[fresh], timestamps[fresh], moisture_mm[fresh], noise[fresh]
+        size = self.fleet.size
+        precision = np.bincount(index, weights=1.0 / noise, minlength=size)
+        weighted = np.bincount(index, weights=moisture_mm / noise, minlength=size)
+        updated = np.flatnonzero(precision)
+
+        moisture = self.fleet.soil_moisture_mm.reshape(-1).copy()
+        prior = moisture[updated]
+        prior_variance = self.variance_mm2[updated]
+        observed = weighted[updated] / precision[updated]
+        posterior_variance = 1.0 / (1.0 / prior_variance + precision[updated])
+        posterior = posterior_variance * (prior / prior_variance + weighted[updated])
+
+        fc = np.broadcast_to(self.fleet.field_capacity_mm, self.fleet.shape).reshape(-1)
+        moisture[updated] = np.clip(posterior, 0.0, fc[updated])
+        self.variance_mm2[updated] = posterior_variance
+        np.maximum.at(self.last_reading, index, timestamps)
+        self.fleet.soil_moisture_mm = moisture.reshape(self.fleet.shape)
+
+        innovation = np.full(size, np.nan)
+        innovation[updated] = observed - prior
+        return AssimilationResult(
+            updated=updated,
+            innovation_mm=innovation.reshape(self.fleet.shape),
+            variance_mm2=self.variance_mm2.reshape(self.fleet.shape).copy(),
+            accepted=len(index),
+            unknown=unknown,
+            stale=stale
+        )
@@ -0,0 +1,294 @@
+# core/batch.py
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.climate_store import ClimateStore, backfill
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, calculate_stress, run_closed_loop
+from core.interpolation import LatticeWeatherFetcher
+from core.metrics import METRICS
+from core.trajectory import TrajectoryWriter
+from core.weather_bulk import BulkWeatherFetcher
+from core.weather_cache import WeatherCache
+from domain.models import FleetState
+from domain.soil import CROP_TYPES, SOIL_TYPES
+
+FIELD_COLUMNS = ("latitude", "longitude", "soil", "crop", "initial_moisture_mm")
+
+# Fields simulated per task; bounds each worker's trajectory to chunk_fields * days rows
+DEFAULT_CHUNK_FIELDS = 2000
+
+# Stress at or above which a day counts as high stress in the summary
+HIGH_STRESS = 0.6
+
+# Days of weather a worker expands from locations to fields at a time
+DAYS_PER_BLOCK = 366
+
+# Tasks queued per worker process; later tasks are built only as results come back
+TASKS_PER_WORKER = 2
+
+
+@dataclass
+class FieldWeather:
+    """
+    Daily forcing for a fields table, shaped (days, locations), with index
+    giving each field's column. Fields sharing a location share a column, so
+    the weather is never expanded to (days, fields) as a whole; index=None
+    means one column per field.
+    """
+    dates: List[str]
+    et0_mm: np.ndarray
+    rainfall_mm: np.ndarray
+    index: Optional[np.ndarray] = None
+
+    def field_index(self, fields: int) -> np.ndarray:
+        return np.arange(fields) if self.index is None else self.index
+
+
+def read_fields(path: str) -> pd.DataFrame:
+    """
+    Read a CSV or Parquet fields file with one row per field.
+
+    Required columns are FIELD_COLUMNS; soil and crop name entries of
+    SOIL_TYPES and CROP_TYPES. An optional field_id column (default: the row
+    number) is carried through to the results.
+    """
+    if path.endswith((".parquet", ".pq")):
+        fields = pd.read_parquet(path)
+    else:
+        fields = pd.read_csv(path)
+
+    missing = [column for column in FIELD_COLUMNS if column not in fields.columns]
+    if missing:
+        raise ValueError(f"Fields file {path} lacks columns: {', '.join(missing)}")
+    if fields.empty:
+        raise ValueError(f"Fields file {path} has no fields")
+    for column in ("latitude", "longitude", "initial_moisture_mm"):
+        values = pd.to_numeric(fields[column], errors="coerce")
+        invalid = np.flatnonzero(~np.isfinite(values.to_numpy(dtype=np.float64)))
+        if invalid.size:
+            raise ValueError(f"Fields file {path} has no valid {column} in rows {invalid[:10].tolist()}")
+        fields[column] = values
+    for column, known in (("soil", SOIL_TYPES), ("crop", CROP_TYPES)):
+        unknown = sorted(set(fields[column]) - set(known))
+        if unknown:
+            raise ValueError(f"Unknown {column} types {unknown}; expected one of {sorted(known)}")
+    if "field_id" not in fields.columns:
+        fields.insert(0, "field_id", np.arange(len(fields)))
+    return fields.reset_index(drop=True)
+
+
+def load_weather(
+    fields: pd.DataFrame,
+    days: int = 10,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    cache: Optional[WeatherCache] = None,
+    store: Optional[ClimateStore] = None,
+    offline: bool = False,
+    precision: int = 2,
+    resolution_degrees: Optional[float] = None
+) -> FieldWeather:
+    """
+    Weather for every field, fetched once per distinct location (coordinates
+    rounded to precision decimals).
+
+    Without dates this is the forecast for days days through the weather
+    cache; with start_date/end_date it is observed weather from the climate
+    store, backfilled first unless offline.
+
+    With resolution_degrees, weather is fetched only at the points of a
+    lattice of that spacing around the fields and interpolated bilinearly to
+    each location (see LatticeWeatherFetcher).
+    """
+    coordinates = np.round(fields[["latitude", "longitude"]].to_numpy(dtype=np.float64), precision)
+    locations, index = np.unique(coordinates, axis=0, return_inverse=True)
+    locations = [tuple(location) for location in locations.tolist()]
+
+    if start_date is not None:
+        store = store or ClimateStore()
+
+        def fetch(points):
+            if not offline:
+                backfill(store, points, start_date, end_date)
+            return store.query(points, start_date, end_date)
+    else:
+        fetch = BulkWeatherFetcher(days=days, cache=cache or WeatherCache(offline=offline)).fetch
+    if resolution_degrees is not None:
+        fetch = LatticeWeatherFetcher(fetch, resolution_degrees).fetch
+    weather = fetch(locations)
+
+    return FieldWeather(
+        dates=weather.dates,
+        et0_mm=weather.et0_mm,
+        rainfall_mm=weather.rainfall_mm,
+        index=index.reshape(-1),
+    )
+
+
+def run_batch(
+    fields: pd.DataFrame,
+    weather: FieldWeather,
+    engine: Optional[DecisionEngine] = None,
+    workers: Optional[int] = None,
+    chunk_fields: int = DEFAULT_CHUNK_FIELDS,
+    trajectory_dir: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> pd.DataFrame:
+    """
+    Simulate every field with daily decisions, chunk_fields fields per task
+    on a pool of worker processes.
+
+    Tasks carry only the weather columns of their chunk's locations and are
+    built as workers free up, and workers summarise day by day, so memory
+    does not grow with the number of fields or (beyond the weather itself)
+    with the horizon.
+
+    Args:
+        fields: table from read_fields()
+        weather: forcing from load_weather()
+        engine: DecisionEngine (default thresholds when None)
+        workers: worker processes (default: all cores); 1 runs in this process
+        chunk_fields: fields per task
+        trajectory_dir: if given, each task streams its daily rows to
+            part-<chunk>.parquet there (field = row number in fields)
+        progress: optional progress(done, total) callback, called per task
+
+    Returns:
+        one summary row per field, in the order of fields
+    """
+    engine = engine or DecisionEngine()
+    workers = workers or os.cpu_count() or 1
+    if trajectory_dir is not None:
+        os.makedirs(trajectory_dir, exist_ok=True)
+
+    total = -(-len(fields) // chunk_fields)
+    tasks = _tasks(fields, weather, engine, chunk_fields, trajectory_dir)
+    METRICS.count("batch_fields", len(fields))
+    with METRICS.timer("batch_run"):
+        if workers == 1 or total <= 1:
+            summaries = _collect(map(run_chunk, tasks), total, progress)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+                results = _bounded_map(pool, run_chunk, tasks, TASKS_PER_WORKER * workers)
+                summaries = _collect(results, total, progress)
+
+    summary = pd.concat(summaries, ignore_index=True)
+    summary.insert(0, "field_id", fields["field_id"].to_numpy())
+    summary.insert(1, "soil", fields["soil"].to_numpy())
+    summary.insert(2, "crop", fields["crop"].to_numpy())
+    return summary
+
+
+def run_chunk(task: dict) -> pd.DataFrame:
+    """Run one chunk of fields (a task built by run_batch) and summarise each field."""
+    fleet = FleetSimulator(
+        task["field_capacity_mm"], task["wilting_point_mm"], task["kc"], task["initial_moisture_mm"]
+    )
+    engine = task["engine"]
+    index = task["index"]
+    writer = None
+    if task["trajectory_path"] is not None:
+        writer = TrajectoryWriter(task["trajectory_path"], first_field=task["first_field"])
+    summary = _SummaryWriter(fleet.shape, forward=writer)
+    try:
+        days = len(task["et0_mm"])
+        for start in range(0, days, DAYS_PER_BLOCK):
+            block = slice(start, start + DAYS_PER_BLOCK)
+            run_closed_loop(fleet, engine, task["et0_mm"][block][:, index],
+                            task["rainfall_mm"][block][:, index], writer=summary)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # What the engine would irrigate on the day after the run
+    stress = calculate_stress(fleet.soil_moisture_mm, fleet.field_capacity_mm, fleet.wilting_point_mm)
+    next_decision = engine.evaluate_batch(stress, fleet.soil_moisture_mm, fleet.field_capacity_mm)
+    return pd.DataFrame({
+        "final_moisture_mm": np.round(fleet.soil_moisture_mm, 1),
+        "final_stress_index": np.round(summary.stress_index, 3),
+        "final_soil_health_score": np.round(summary.soil_health_score, 2),
+        "mean_stress_index": np.round(summary.stress_sum / max(summary.days, 1), 3),
+        "total_irrigation_mm": np.round(summary.irrigation_sum, 1),
+        "irrigation_days": summary.irrigation_days,
+        "high_stress_days": summary.high_stress_days,
+        "next_irrigation_mm": next_decision.irrigation_mm,
+    })
+
+
+class _SummaryWriter:
+    """run_closed_loop writer that keeps per-field running totals instead of rows."""
+
+    def __init__(self, shape: tuple, forward: Optional[TrajectoryWriter] = None):
+        self.forward = forward
+        self.days = 0
+        self.stress_sum = np.zeros(shape)
+        self.irrigation_sum = np.zeros(shape)
+        self.irrigation_days = np.zeros(shape, dtype=np.int64)
+        self.high_stress_days = np.zeros(shape, dtype=np.int64)
+        self.stress_index = np.full(shape, np.nan)
+        self.soil_health_score = np.full(shape, np.nan)
+
+    def append(self, state: FleetState, irrigation_mm: np.ndarray, reason_code: np.ndarray):
+        self.days += 1
+        self.stress_sum += state.stress_index
+        self.irrigation_sum += irrigation_mm
+        self.irrigation_days += irrigation_mm > 0
+        self.high_stress_days += state.stress_index >= HIGH_STRESS
+        self.stress_index = state.stress_index
+        self.soil_health_score = state.soil_health_score
+        if self.forward is not None:
+            self.forward.append(state, irrigation_mm, reason_code)
+
+
+def _tasks(
+    fields: pd.DataFrame,
+    weather: FieldWeather,
+    engine: DecisionEngine,
+    chunk_fields: int,
+    trajectory_dir: Optional[str]
+) -> Iterator[dict]:
+    field_index = weather.field_index(len(fields))
+    for chunk, start in enumerate(range(0, len(fields), chunk_fields)):
+        rows = slice(start, start + chunk_fields)
+        part = fields.iloc[rows]
+        # Only this chunk's locations travel with the task; index maps its fields onto them
+        locations, index = np.unique(field_index[rows], return_inverse=True)
+        yield dict(
+            first_field=start,
+            field_capacity_mm=np.array([SOIL_TYPES[name].field_capacity_mm for name in part["soil"]]),
+            wilting_point_mm=np.array([SOIL_TYPES[name].wilting_point_mm for name in part["soil"]]),
+            kc=np.array([CROP_TYPES[name].kc for name in part["crop"]]),
+            initial_moisture_mm=part["initial_moisture_mm"].to_numpy(dtype=np.float64),
+            et0_mm=weather.et0_mm[:, locations],
+            rainfall_mm=weather.rainfall_mm[:, locations],
+            index=index.reshape(-1),
+            engine=engine,
+            trajectory_path=None if trajectory_dir is None else os.path.join(trajectory_dir, f"part-{chunk:05d}.parquet"),
+        )
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, tasks: Iterable[dict], limit: int) -> Iterator:
+    """pool.map, in order, with at most limit tasks submitted but not yet collected."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, task))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _collect(results, total: int, progress) -> List[pd.DataFrame]:
+    summaries = []
+    for summary in results:
+        summaries.append(summary)
+        if progress is not None:
+            progress(len(summaries), total)
+    return summaries
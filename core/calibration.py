@@ -0,0 +1,183 @@
+# core/calibration.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+from domain.soil import SoilProfile, CropProfile, LOAM
+
+
+@dataclass
+class FieldObservations:
+    """
+    Logged data for one field. All series are daily and of equal length;
+    observed_moisture_mm[d] is the sensor reading after day d (NaN if missing).
+    """
+    observed_moisture_mm: np.ndarray
+    et0_mm: np.ndarray
+    rainfall_mm: np.ndarray
+    irrigation_mm: np.ndarray
+    initial_moisture_mm: Optional[float] = None
+    name: str = "Calibrated"
+
+
+@dataclass
+class CalibrationResult:
+    soil: SoilProfile
+    crop: CropProfile
+    initial_moisture_mm: float
+    rmse_mm: float
+    evaluations: int
+
+
+def simulate_candidates(
+    field_capacity_mm,
+    wilting_point_mm,
+    kc,
+    initial_moisture_mm,
+    et0_mm,
+    rainfall_mm,
+    irrigation_mm
+) -> np.ndarray:
+    """
+    Run one field's forcing through many parameter sets at once.
+
+    Returns:
+        soil moisture after each day, shaped (days, candidates)
+    """
+    fleet = FleetSimulator(field_capacity_mm, wilting_point_mm, kc, initial_moisture_mm)
+    moisture = np.empty((len(et0_mm),) + fleet.shape)
+    for d in range(len(et0_mm)):
+        moisture[d] = fleet.step(et0_mm[d], rainfall_mm[d], irrigation_mm[d]).soil_moisture_mm
+    return moisture
+
+
+class SoilCalibrator:
+    """
+    Fit field capacity, crop coefficient and initial moisture of a field to
+    logged sensor moisture with the cross-entropy method.
+
+    Each iteration draws a population of candidate parameter sets, scores all
+    of them in one batched simulation (RMSE against the observations) and
+    refits the sampling distribution (mean and full covariance) to the best
+    ones; no derivatives are needed. The wilting point does not affect the
+    moisture trajectory, so it cannot be fitted from moisture data; it keeps
+    the wilting point / field capacity ratio of the prior soil.
+    """
+
+    def __init__(
+        self,
+        prior_soil: SoilProfile = LOAM,
+        field_capacity_bounds=(50.0, 300.0),
+        kc_bounds=(0.3, 1.5),
+        population: int = 1000,
+        elite_fraction: float = 0.1,
+        smoothing: float = 0.5,
+        iterations: int = 30,
+        tolerance_mm: float = 1e-3,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            prior_soil: soil whose wilting point / field capacity ratio is kept
+            field_capacity_bounds: search range for field capacity in mm
+            kc_bounds: search range for the crop coefficient
+            population: candidate parameter sets evaluated per iteration
+            elite_fraction: share of the best candidates the next distribution is fitted to
+            smoothing: weight of the elite statistics against the previous distribution
+            iterations: maximum number of iterations
+            tolerance_mm: stop when the best RMSE improves by less than this
+            seed: seed for reproducible fits
+        """
+        self.prior_soil = prior_soil
+        self.field_capacity_bounds = field_capacity_bounds
+        self.kc_bounds = kc_bounds
+        self.population = population
+        self.n_elite = max(2, int(population * elite_fraction))
+        self.smoothing = smoothing
+        self.iterations = iterations
+        self.tolerance_mm = tolerance_mm
+        self.seed = seed
+
+    def calibrate(self, field: FieldObservations) -> CalibrationResult:
+        observed = np.asarray(field.observed_moisture_mm, dtype=np.float64)
+        valid = ~np.isnan(observed)
+        if not valid.any():
+            raise ValueError(f"No moisture observations for field '{field.name}'")
+
+        wp_ratio = self.prior_soil.wilting_point_mm / self.prior_soil.field_capacity_mm
+        fit_initial = field.initial_moisture_mm is None
+        upper_fc = self.field_capacity_bounds[1]
+        lower = np.array([self.field_capacity_bounds[0], self.kc_bounds[0], 0.0])
+        upper = np.array([upper_fc, self.kc_bounds[1], upper_fc])
+        if not fit_initial:
+            lower[2] = upper[2] = field.initial_moisture_mm
+
+        rng = np.random.default_rng(self.seed)
+        mean = (lower + upper) / 2
+        cov = np.diag(((upper - lower) / 2) ** 2)
+        best_params, best_rmse, previous_best = mean, np.inf, np.inf
+        evaluations = 0
+
+        for _ in range(self.iterations):
+            candidates = np.clip(
+                rng.multivariate_normal(mean, cov + 1e-12 * np.eye(3), size=self.population, method="cholesky"),
+                lower,
+                upper
+            )
+            fc, kc, initial = candidates.T
+            moisture = simulate_candidates(
+                fc, fc * wp_ratio, kc, initial,
+                field.et0_mm, field.rainfall_mm, field.irrigation_mm
+            )
+            errors = moisture[valid] - observed[valid][:, np.newaxis]
+            rmse = np.sqrt(np.mean(errors ** 2, axis=0))
+            evaluations += self.population
+
+            elite = np.argsort(rmse)[:self.n_elite]
+            if rmse[elite[0]] < best_rmse:
+                best_params, best_rmse = candidates[elite[0]], float(rmse[elite[0]])
+            # Full covariance follows the correlated fc/kc/initial valley; the
+            # smoothed update keeps the distribution from collapsing early
+            mean = self.smoothing * candidates[elite].mean(axis=0) + (1 - self.smoothing) * mean
+            cov = self.smoothing * np.cov(candidates[elite].T) + (1 - self.smoothing) * cov
+
+            std = np.sqrt(np.diag(cov))
+            if previous_best - best_rmse < self.tolerance_mm and np.all(std[:2] < 1e-3 * (upper - lower)[:2]):
+                break
+            previous_best = best_rmse
+
+        fc, kc, initial = best_params
+        return CalibrationResult(
+            soil=SoilProfile(name=field.name, field_capacity_mm=float(fc), wilting_point_mm=float(fc * wp_ratio)),
+            crop=CropProfile(name=field.name, kc=float(kc)),
+            initial_moisture_mm=float(initial),
+            rmse_mm=best_rmse,
+            evaluations=evaluations
+        )
+
+
+def calibrate_fields(
+    fields: Sequence[FieldObservations],
+    calibrator: Optional[SoilCalibrator] = None,
+    processes: Optional[int] = None
+) -> List[CalibrationResult]:
+    """
+    Calibrate many fields, spread over a process pool.
+
+    Args:
+        fields: observations per field
+        calibrator: settings shared by all fields (default: SoilCalibrator())
+        processes: worker processes (default: all CPUs; 1 runs in this process)
+    """
+    calibrator = calibrator or SoilCalibrator()
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(fields) <= 1:
+        return [calibrator.calibrate(field) for field in fields]
+
+    chunksize = max(1, len(fields) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(calibrator.calibrate, fields, chunksize=chunksize))
@@ -0,0 +1,303 @@
+# core/climate_store.py
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+from core.et0 import ET0_METHODS, compute_et0
+from core.metrics import METRICS
+from core.weather_api import ARCHIVE_URL, DEFAULT_ET0_METHOD, DEFAULT_TIMEOUT, archive_params, make_session
+from core.weather_bulk import BulkWeather
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "soil_twin", "climate")
+
+
+def store_variables() -> str:
+    """Daily variables backfilled: rainfall plus the inputs of every registered ET0 method."""
+    variables = ["precipitation_sum"]
+    for method in ET0_METHODS.values():
+        variables += [variable for variable in method.variables if variable not in variables]
+    return ",".join(variables)
+
+
+class ClimateStore:
+    """
+    Local columnar store of observed daily weather.
+
+    One Parquet file per location and calendar year, partitioned on disk as
+    tile=<lat>_<lon>/year=<year>/<location>.parquet, where a tile spans
+    tile_degrees of latitude and longitude. Each file holds a date column and
+    the raw Open-Meteo variables, so any ET0 method can be computed at query
+    time; its schema metadata records the stored date range and elevation, so
+    checking what is present reads no data. Files are replaced atomically,
+    which makes an interrupted backfill safe to resume.
+    """
+
+    def __init__(self, directory: Optional[str] = None, precision: int = 2, tile_degrees: int = 1):
+        """
+        Args:
+            directory: store root (default: $SOILTWIN_CLIMATE_DIR or ~/.cache/soil_twin/climate)
+            precision: decimals kept when rounding latitude/longitude to a location
+            tile_degrees: size of the location tiles the store is partitioned by
+        """
+        self.directory = directory or os.environ.get("SOILTWIN_CLIMATE_DIR", DEFAULT_STORE_DIR)
+        self.precision = precision
+        self.tile_degrees = tile_degrees
+        os.makedirs(self.directory, exist_ok=True)
+
+    def location(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """The stored location (rounded coordinates) that serves latitude/longitude."""
+        return round(float(latitude), self.precision), round(float(longitude), self.precision)
+
+    def path(self, latitude: float, longitude: float, year: int) -> str:
+        lat, lon = self.location(latitude, longitude)
+        tile = f"tile={math.floor(lat / self.tile_degrees)}_{math.floor(lon / self.tile_degrees)}"
+        name = f"{lat:.{self.precision}f}_{lon:.{self.precision}f}.parquet"
+        return os.path.join(self.directory, tile, f"year={year}", name)
+
+    def coverage(self, latitude: float, longitude: float, year: int) -> Optional[Tuple[str, str]]:
+        """First and last stored date of a year, or None when the year is absent or has gaps."""
+        try:
+            metadata = pq.read_schema(self.path(latitude, longitude, year)).metadata
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        first, last = metadata[b"first"].decode(), metadata[b"last"].decode()
+        days = (date.fromisoformat(last) - date.fromisoformat(first)).days + 1
+        if int(metadata[b"rows"]) != days:
+            return None
+        return first, last
+
+    def missing(self, latitude: float, longitude: float, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """
+        Date chunks (one per calendar year) to fetch so that start_date..end_date
+        is fully stored. A partially stored year is refetched over the union of
+        what is stored and what is needed, so every file stays gap-free.
+        """
+        chunks = []
+        for year, first, last in _years(start_date, end_date):
+            stored = self.coverage(latitude, longitude, year)
+            if stored is None:
+                chunks.append((first, last))
+            elif stored[0] > first or stored[1] < last:
+                chunks.append((min(first, stored[0]), max(last, stored[1])))
+        return chunks
+
+    def write(self, latitude: float, longitude: float, daily: dict, elevation: float = 0.0):
+        """
+        Store an Open-Meteo "daily" block, merging it into the years already stored.
+
+        Trailing days without any value (the archive lags a few days behind
+        today) are dropped so that a later backfill fetches them again.
+        """
+        times = np.asarray(daily.get("time", []), dtype="datetime64[D]")
+        variables = [variable for variable in daily if variable != "time"]
+        columns = {variable: _floats(daily[variable], len(times)) for variable in variables}
+        if variables:
+            present = np.flatnonzero(~np.all(np.isnan(np.stack([columns[v] for v in variables])), axis=0))
+            keep = present[-1] + 1 if present.size else 0
+            times = times[:keep]
+            columns = {variable: values[:keep] for variable, values in columns.items()}
+
+        years = times.astype("datetime64[Y]").astype(np.int64) + 1970
+        for year in np.unique(years):
+            rows = years == year
+            self._write_year(
+                latitude, longitude, int(year), times[rows],
+                {variable: values[rows] for variable, values in columns.items()}, elevation
+            )
+
+    def _write_year(self, latitude, longitude, year: int, times: np.ndarray, columns: Dict[str, np.ndarray], elevation):
+        path = self.path(latitude, longitude, year)
+        try:
+            stored = pq.read_table(path)
+        except FileNotFoundError:
+            stored = None
+        if stored is not None:
+            # Stored days not in the new block are kept; new values win
+            stored_times = stored["time"].to_numpy().astype("datetime64[D]")
+            kept = ~np.isin(stored_times, times)
+            merged = {}
+            for variable in (set(stored.column_names) - {"time"}) | set(columns):
+                old = stored[variable].to_numpy()[kept] if variable in stored.column_names else np.full(kept.sum(), np.nan)
+                new = columns.get(variable, np.full(len(times), np.nan))
+                merged[variable] = np.concatenate([old, new])
+            times = np.concatenate([stored_times[kept], times])
+            columns = merged
+        order = np.argsort(times)
+        times = times[order]
+
+        table = pa.table({"time": pa.array(times, type=pa.date32()), **{
+            variable: pa.array(values[order], type=pa.float64()) for variable, values in sorted(columns.items())
+        }})
+        table = table.replace_schema_metadata({
+            "first": str(times[0]),
+            "last": str(times[-1]),
+            "rows": str(len(times)),
+            "elevation": repr(float(elevation)),
+        })
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def read(self, latitude: float, longitude: float, start_date: str, end_date: str) -> Tuple[dict, float]:
+        """
+        Stored daily block for start_date..end_date and the location's elevation.
+
+        Raises:
+            ValueError: when any day of the range is not stored
+        """
+        tables = []
+        elevation = 0.0
+        for year, first, last in _years(start_date, end_date):
+            stored = self.coverage(latitude, longitude, year)
+            if stored is None or stored[0] > first or stored[1] < last:
+                raise ValueError(
+                    f"No stored climate for {self.location(latitude, longitude)} "
+                    f"from {first} to {last}; run the backfill first"
+                )
+            table = pq.read_table(self.path(latitude, longitude, year))
+            elevation = float(table.schema.metadata[b"elevation"])
+            times = table["time"].to_numpy().astype("datetime64[D]")
+            rows = (times >= np.datetime64(first)) & (times <= np.datetime64(last))
+            tables.append(table.filter(pa.array(rows)))
+
+        table = pa.concat_tables(tables, promote_options="default")
+        daily = {"time": table["time"].to_numpy().astype("datetime64[D]").astype(str).tolist()}
+        for variable in table.column_names:
+            if variable != "time":
+                daily[variable] = table[variable].to_numpy(zero_copy_only=False).astype(np.float64)
+        return daily, elevation
+
+    def query(
+        self,
+        locations: Sequence[Tuple[float, float]],
+        start_date: str,
+        end_date: str,
+        et0_method: str = DEFAULT_ET0_METHOD
+    ) -> BulkWeather:
+        """
+        Aligned daily forcing for many locations from local files only.
+
+        Returns:
+            BulkWeather whose column i belongs to locations[i], shaped (days, locations)
+
+        Raises:
+            ValueError: when a location or day of the range has not been backfilled
+        """
+        with METRICS.timer("climate_query"):
+            dailies, elevations = zip(*(self.read(lat, lon, start_date, end_date) for lat, lon in locations))
+            dates = dailies[0]["time"]
+            block = {"time": dates}
+            for variable in set().union(*dailies) - {"time"}:
+                block[variable] = np.stack(
+                    [daily.get(variable, np.full(len(dates), np.nan)) for daily in dailies], axis=1
+                )
+
+            latitude = np.array([lat for lat, _ in locations], dtype=np.float64)
+            et0_mm = compute_et0(et0_method, block, latitude, np.array(elevations))
+            rainfall_mm = np.nan_to_num(block.get("precipitation_sum", np.zeros_like(et0_mm)), nan=0.0)
+        return BulkWeather(dates=list(dates), et0_mm=np.round(et0_mm, 2), rainfall_mm=np.round(rainfall_mm, 1))
+
+
+def backfill(
+    store: ClimateStore,
+    locations: Sequence[Tuple[float, float]],
+    start_date: str,
+    end_date: str,
+    max_workers: int = 4,
+    timeout: float = DEFAULT_TIMEOUT,
+    session: Optional[requests.Session] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Fetch from the Open-Meteo archive whatever the store lacks for locations
+    over start_date..end_date, one request per location and calendar year.
+
+    Each chunk is written as soon as it arrives, so an interrupted run resumes
+    where it stopped and a repeated run makes no requests at all.
+
+    Args:
+        progress: optional progress(done, total) callback, called per chunk
+
+    Returns:
+        number of requests made
+    """
+    variables = store_variables()
+    chunks = [
+        store.location(lat, lon) + chunk
+        for lat, lon in dict.fromkeys(store.location(lat, lon) for lat, lon in locations)
+        for chunk in store.missing(lat, lon, start_date, end_date)
+    ]
+    if not chunks:
+        return 0
+    session = session or make_session(pool_size=max_workers)
+
+    def fetch(chunk):
+        lat, lon, first, last = chunk
+        with METRICS.timer("climate_backfill_request"):
+            response = session.get(ARCHIVE_URL, params=archive_params(lat, lon, first, last, variables), timeout=timeout)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to fetch archive weather data: {response.status_code}, {response.text}")
+        payload = response.json()
+        store.write(lat, lon, payload.get("daily", {}), payload.get("elevation", 0.0))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        for done, _ in enumerate(pool.map(fetch, chunks), 1):
+            if progress is not None:
+                progress(done, len(chunks))
+    METRICS.count("climate_backfill_requests", len(chunks))
+    return len(chunks)
+
+
+def _years(start_date: str, end_date: str):
+    """(year, first, last) for every calendar year touched by start_date..end_date."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if end < start:
+        raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        yield year, first.isoformat(), last.isoformat()
+
+
+def _floats(values, length: int) -> np.ndarray:
+    """Open-Meteo values (None for missing) as a float array of the given length."""
+    array = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.concatenate([array, np.full(length - len(array), np.nan)]) if len(array) < length else array
+
+
+def _location(text: str) -> Tuple[float, float]:
+    lat, lon = text.split(",")
+    return float(lat), float(lon)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill observed daily weather into the local climate store")
+    parser.add_argument("--location", type=_location, action="append", required=True, metavar="LAT,LON",
+                        help="location to backfill (repeatable)")
+    parser.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="last day, YYYY-MM-DD")
+    parser.add_argument("--directory", help="store root (default: $SOILTWIN_CLIMATE_DIR or ~/.cache/soil_twin/climate)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    args = parser.parse_args(argv)
+
+    store = ClimateStore(directory=args.directory)
+    requests_made = backfill(
+        store, args.location, args.start, args.end, max_workers=args.workers,
+        progress=lambda done, total: print(f"\r{done}/{total} chunks", end="", file=sys.stderr)
+    )
+    print(f"{requests_made} requests; {len(args.location)} locations stored in {store.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# core/decimation.py
+import numpy as np
+
+
+def lttb_indices(x, y, max_points: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; the rest of the series is cut
+    into max_points - 2 buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's mean is
+    kept. Shapes (peaks, dips, trends) survive far better than with plain
+    striding.
+
+    Args:
+        x: strictly increasing positions (numbers or datetime64)
+        y: values, NaN not allowed
+        max_points: number of points to keep (at least 3)
+
+    Returns:
+        sorted indices into x and y, all of them when the series is short enough
+    """
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # Bucket edges over the inner points 1 .. n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sums_x = np.concatenate([[0.0], np.cumsum(x)])
+    sums_y = np.concatenate([[0.0], np.cumsum(y)])
+    counts = ends - starts
+    mean_x = (sums_x[ends] - sums_x[starts]) / counts
+    mean_y = (sums_y[ends] - sums_y[starts]) / counts
+    # The bucket after the last one is the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = starts[bucket], ends[bucket]
+        area = np.abs(
+            (x[previous] - next_x[bucket]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y[bucket] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def bucket_sums(x, y, max_points: int):
+    """
+    Sum y over max_points equal-count buckets, for bar series such as daily
+    irrigation where dropping points would lose water.
+
+    Returns:
+        (x of each bucket's first point, bucket sums)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n:
+        return np.asarray(x), y
+    edges = np.linspace(0, n, max_points + 1).astype(np.int64)[:-1]
+    return np.asarray(x)[edges], np.add.reduceat(y, edges)
+
+
+def window(x, start=None, end=None) -> slice:
+    """Slice of the sorted positions x that lie within [start, end]."""
+    x = np.asarray(x)
+    first = 0 if start is None else int(np.searchsorted(x, start, side="left"))
+    last = len(x) if end is None else int(np.searchsorted(x, end, side="right"))
+    return slice(first, last)
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[s]").astype(np.int64)
+    return x.astype(np.float64)
@@ -1,4 +1,14 @@
-from domain.models import Decision
+import numpy as np
+
+from core.metrics import METRICS
+from domain.models import (
+    Decision,
+    DecisionBatch,
+    REASON_BELOW_LOW,
+    REASON_PROPORTIONAL,
+    REASON_FULL,
+    format_reason,
+)
 
 class DecisionEngine:
     """
@@ -31,15 +41,78 @@ class DecisionEngine:
         """
         if stress_index < self.threshold_low:
             irrigation_mm = 0.0
-            reason = f"Stress {stress_index:.2f} below low threshold {self.threshold_low:.2f}: no irrigation"
+            reason_code = REASON_BELOW_LOW
         elif stress_index > self.threshold_high:
             irrigation_mm = min(self.max_irrigation_mm, field_capacity_mm - soil_moisture_mm)
-            reason = f"Stress {stress_index:.2f} above high threshold {self.threshold_high:.2f}: full irrigation"
+            reason_code = REASON_FULL
         else:
             # Proportional irrigation for moderate stress
             ratio = (stress_index - self.threshold_low) / (self.threshold_high - self.threshold_low)
             irrigation_mm = min(self.max_irrigation_mm, ratio * (field_capacity_mm - soil_moisture_mm))
-            reason = f"Stress {stress_index:.2f} moderate: proportional irrigation {irrigation_mm:.1f} mm"
+            reason_code = REASON_PROPORTIONAL
+
+        irrigation_mm = round(max(irrigation_mm, 0.0), 1)
+        reason = format_reason(reason_code, stress_index, irrigation_mm, self.threshold_low, self.threshold_high)
+        return Decision(irrigation_mm=irrigation_mm, reason=reason)
+
+    def evaluate_batch(self, stress_index, soil_moisture_mm, field_capacity_mm) -> DecisionBatch:
+        """
+        Vectorized evaluate() for many fields at once.
+
+        Args:
+            stress_index: stress ratio per field
+            soil_moisture_mm: current soil moisture per field in mm
+            field_capacity_mm: field capacity per field in mm (or a scalar)
+
+        Returns:
+            DecisionBatch with irrigation amounts and reason codes; reason
+            strings are only formatted when requested from the batch.
+        """
+        with METRICS.timer("decision_batch"):
+            batch = self._evaluate_batch(stress_index, soil_moisture_mm, field_capacity_mm)
+        METRICS.count("decisions", batch.irrigation_mm.size)
+        return batch
 
-        irrigation_mm = max(irrigation_mm, 0.0)
-        return Decision(irrigation_mm=round(irrigation_mm, 1), reason=reason)
+    def _evaluate_batch(self, stress_index, soil_moisture_mm, field_capacity_mm) -> DecisionBatch:
+        stress = np.asarray(stress_index, dtype=np.float64)
+        deficit = np.asarray(field_capacity_mm, dtype=np.float64) - np.asarray(soil_moisture_mm, dtype=np.float64)
+        stress, deficit = np.broadcast_arrays(stress, deficit)
+
+        below = stress < self.threshold_low
+        above = stress > self.threshold_high
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (stress - self.threshold_low) / (self.threshold_high - self.threshold_low)
+            irrigation_mm = np.where(above, deficit, ratio * deficit)
+        irrigation_mm = np.where(below, 0.0, np.minimum(self.max_irrigation_mm, irrigation_mm))
+        irrigation_mm = _round_1(np.maximum(irrigation_mm, 0.0))
+
+        reason_code = np.where(
+            below,
+            REASON_BELOW_LOW,
+            np.where(above, REASON_FULL, REASON_PROPORTIONAL)
+        ).astype(np.int8)
+
+        return DecisionBatch(
+            irrigation_mm=irrigation_mm,
+            reason_code=reason_code,
+            stress_index=stress,
+            threshold_low=self.threshold_low,
+            threshold_high=self.threshold_high
+        )
+
+
+def _round_1(values: np.ndarray) -> np.ndarray:
+    """
+    Round to one decimal exactly like the builtin round(x, 1).
+
+    np.round scales by 10 before rounding, which can disagree with round() for
+    values sitting next to a .x5 tie; those few are rounded with the builtin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.array(np.round(values, 1))
+    scaled = values * 10.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 1) for value in values[near_tie].tolist()]
+    return rounded
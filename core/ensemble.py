@@ -0,0 +1,184 @@
+# core/ensemble.py
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, run_closed_loop
+from domain.soil import SoilProfile, CropProfile
+
+
+class MultiplicativeNoise:
+    """Mean-preserving log-normal scaling: value * exp(N(-sigma²/2, sigma))."""
+
+    def __init__(self, sigma: float = 0.15):
+        self.sigma = sigma
+
+    def perturb(self, values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        factors = rng.lognormal(-0.5 * self.sigma ** 2, self.sigma, size=values.shape)
+        return values * factors
+
+
+class AdditiveNoise:
+    """Gaussian noise added to every value, clipped at a lower bound."""
+
+    def __init__(self, sigma: float = 0.5, minimum: float = 0.0):
+        self.sigma = sigma
+        self.minimum = minimum
+
+    def perturb(self, values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        return np.maximum(values + rng.normal(0.0, self.sigma, size=values.shape), self.minimum)
+
+
+class RainOccurrenceFlip:
+    """
+    Flip rain occurrence: forecast wet days turn dry with p_wet_to_dry, and dry
+    days get exponentially distributed rain with p_dry_to_wet.
+    """
+
+    def __init__(
+        self,
+        p_wet_to_dry: float = 0.2,
+        p_dry_to_wet: float = 0.1,
+        mean_rain_mm: float = 5.0,
+        wet_threshold_mm: float = 0.1
+    ):
+        self.p_wet_to_dry = p_wet_to_dry
+        self.p_dry_to_wet = p_dry_to_wet
+        self.mean_rain_mm = mean_rain_mm
+        self.wet_threshold_mm = wet_threshold_mm
+
+    def perturb(self, values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        wet = values >= self.wet_threshold_mm
+        draw = rng.random(values.shape)
+        dried = wet & (draw < self.p_wet_to_dry)
+        wetted = ~wet & (draw < self.p_dry_to_wet)
+        values = np.where(dried, 0.0, values)
+        return np.where(wetted, rng.exponential(self.mean_rain_mm, size=values.shape), values)
+
+
+DEFAULT_ET0_NOISE = (MultiplicativeNoise(sigma=0.15),)
+DEFAULT_RAIN_NOISE = (RainOccurrenceFlip(), MultiplicativeNoise(sigma=0.4))
+
+
+@dataclass
+class EnsembleResult:
+    """
+    Percentile bands over ensemble members.
+
+    Every band array is shaped (len(percentiles), days).
+    """
+    percentiles: Tuple[float, ...]
+    members: int
+    soil_moisture_mm: np.ndarray
+    stress_index: np.ndarray
+    irrigation_mm: np.ndarray
+    soil_health_score: np.ndarray
+
+    def band(self, variable: str, percentile: float) -> np.ndarray:
+        return getattr(self, variable)[self.percentiles.index(percentile)]
+
+
+def perturb_weather(
+    et0_mm,
+    rainfall_mm,
+    members: int,
+    rng: np.random.Generator,
+    et0_noise: Sequence = DEFAULT_ET0_NOISE,
+    rain_noise: Sequence = DEFAULT_RAIN_NOISE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw member forcings from a deterministic forecast.
+
+    Returns:
+        (et0, rainfall) each shaped (days, members)
+    """
+    et0 = np.repeat(np.asarray(et0_mm, dtype=np.float64)[:, np.newaxis], members, axis=1)
+    rain = np.repeat(np.asarray(rainfall_mm, dtype=np.float64)[:, np.newaxis], members, axis=1)
+    for noise in et0_noise:
+        et0 = noise.perturb(et0, rng)
+    for noise in rain_noise:
+        rain = noise.perturb(rain, rng)
+    return et0, rain
+
+
+def run_ensemble(
+    soil: SoilProfile,
+    crop: CropProfile,
+    initial_moisture_mm: float,
+    et0_mm,
+    rainfall_mm,
+    members: int = 1000,
+    engine: Optional[DecisionEngine] = None,
+    et0_noise: Sequence = DEFAULT_ET0_NOISE,
+    rain_noise: Sequence = DEFAULT_RAIN_NOISE,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    seed: Optional[int] = None,
+    processes: int = 1
+) -> EnsembleResult:
+    """
+    Run a Monte Carlo ensemble of closed-loop simulations for one field.
+
+    Each member gets its own perturbed ET0 and rainfall series and is advanced
+    together with the others through FleetSimulator, with the DecisionEngine
+    choosing irrigation every day as in the deterministic run.
+
+    Args:
+        soil, crop, initial_moisture_mm: the field
+        et0_mm, rainfall_mm: deterministic daily forecast (e.g. from WeatherAPI.fetch)
+        members: number of ensemble members
+        engine: decision engine (default: DecisionEngine())
+        et0_noise, rain_noise: noise models applied in order to the member forcings
+        percentiles: percentiles reported for every variable
+        seed: seed for reproducible ensembles
+        processes: split members across this many worker processes
+
+    Returns:
+        EnsembleResult with percentile bands of moisture, stress, irrigation and health
+    """
+    if members < 1:
+        raise ValueError(f"An ensemble needs at least one member, got {members}")
+    engine = engine or DecisionEngine()
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    chunks = [len(chunk) for chunk in np.array_split(np.arange(members), processes)]
+    jobs = [
+        (soil, crop, initial_moisture_mm, et0_mm, rainfall_mm, size, engine, et0_noise, rain_noise, child)
+        for size, child in zip(chunks, seeds)
+        if size
+    ]
+
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_run_members, *zip(*jobs)))
+    else:
+        parts = [_run_members(*job) for job in jobs]
+
+    series = {
+        variable: np.concatenate([part[variable] for part in parts], axis=1)
+        for variable in parts[0]
+    }
+    percentiles = tuple(percentiles)
+    return EnsembleResult(
+        percentiles=percentiles,
+        members=members,
+        **{variable: np.percentile(values, percentiles, axis=1) for variable, values in series.items()}
+    )
+
+
+def _run_members(
+    soil, crop, initial_moisture_mm, et0_mm, rainfall_mm, members, engine, et0_noise, rain_noise, seed_sequence
+) -> dict:
+    rng = np.random.default_rng(seed_sequence)
+    et0, rain = perturb_weather(et0_mm, rainfall_mm, members, rng, et0_noise, rain_noise)
+    fleet = FleetSimulator(
+        soil.field_capacity_mm, soil.wilting_point_mm, crop.kc, np.full(members, initial_moisture_mm)
+    )
+    trajectory = run_closed_loop(fleet, engine, et0, rain)
+    return {
+        "soil_moisture_mm": trajectory.soil_moisture_mm,
+        "stress_index": trajectory.stress_index,
+        "irrigation_mm": trajectory.irrigation_mm,
+        "soil_health_score": trajectory.soil_health_score,
+    }
@@ -0,0 +1,223 @@
+# core/et0.py
+"""
+Vectorized reference evapotranspiration (ET0).
+
+All kernels work on NumPy arrays and broadcast, so a (days, locations) block
+is computed in one call: pass per-day values shaped (days, locations),
+latitude shaped (locations,) and day of year shaped (days, 1). Missing values
+are NaN and propagate to the result; use fill_missing() to interpolate gaps
+beforehand.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+SOLAR_CONSTANT = 0.0820        # MJ m-2 min-1
+STEFAN_BOLTZMANN = 4.903e-9    # MJ K-4 m-2 day-1
+ALBEDO = 0.23                  # grass reference crop
+
+
+def to_array(values) -> np.ndarray:
+    """Convert a (possibly nested) list with None entries to a float array with NaN."""
+    return np.array(values, dtype=np.float64)
+
+
+def day_of_year(dates: Sequence[str]) -> np.ndarray:
+    """Day of year (1-366) for ISO date strings."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    return (days - days.astype("datetime64[Y]")).astype(np.int64) + 1
+
+
+def fill_missing(values, axis: int = 0) -> np.ndarray:
+    """
+    Fill NaN gaps along axis (time) by linear interpolation.
+
+    Leading and trailing gaps take the nearest valid value; a series with no
+    valid value at all stays NaN.
+    """
+    values = np.array(values, dtype=np.float64)
+    moved = np.moveaxis(values, axis, 0)
+    series = moved.reshape(moved.shape[0], -1)
+    index = np.arange(series.shape[0])
+    for j in np.flatnonzero(np.isnan(series).any(axis=0)):
+        valid = ~np.isnan(series[:, j])
+        if valid.any():
+            series[:, j] = np.interp(index, index[valid], series[valid, j])
+    return np.moveaxis(series.reshape(moved.shape), 0, axis)
+
+
+def extraterrestrial_radiation(latitude_deg, day_of_year) -> np.ndarray:
+    """Daily extraterrestrial radiation Ra in MJ m-2 day-1 (FAO-56 eq. 21)."""
+    phi = np.radians(np.asarray(latitude_deg, dtype=np.float64))
+    j = np.asarray(day_of_year, dtype=np.float64)
+
+    dr = 1.0 + 0.033 * np.cos(2.0 * np.pi * j / 365.0)
+    delta = 0.409 * np.sin(2.0 * np.pi * j / 365.0 - 1.39)
+    ws = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1.0, 1.0))
+
+    return (24.0 * 60.0 / np.pi) * SOLAR_CONSTANT * dr * (
+        ws * np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.sin(ws)
+    )
+
+
+def saturation_vapour_pressure(temperature_c) -> np.ndarray:
+    """e°(T) in kPa (FAO-56 eq. 11)."""
+    t = np.asarray(temperature_c, dtype=np.float64)
+    return 0.6108 * np.exp(17.27 * t / (t + 237.3))
+
+
+def wind_speed_2m(wind_speed, height_m: float = 10.0) -> np.ndarray:
+    """Convert wind speed measured at height_m to 2 m (FAO-56 eq. 47)."""
+    return np.asarray(wind_speed, dtype=np.float64) * 4.87 / np.log(67.8 * height_m - 5.42)
+
+
+def hargreaves(tmax, tmin, latitude_deg, day_of_year) -> np.ndarray:
+    """Hargreaves ET0 in mm/day (FAO-56 eq. 52)."""
+    tmax = np.asarray(tmax, dtype=np.float64)
+    tmin = np.asarray(tmin, dtype=np.float64)
+    tmean = (tmax + tmin) / 2
+    ra = extraterrestrial_radiation(latitude_deg, day_of_year)
+    return 0.0023 * (tmean + 17.8) * np.sqrt(np.maximum(tmax - tmin, 0.0)) * 0.408 * ra
+
+
+def penman_monteith(
+    tmax,
+    tmin,
+    shortwave_radiation,
+    rh_max,
+    rh_min,
+    wind_speed_2m,
+    latitude_deg,
+    day_of_year,
+    elevation_m=0.0
+) -> np.ndarray:
+    """
+    FAO-56 Penman-Monteith ET0 in mm/day (FAO-56 eq. 6) for daily time steps.
+
+    Args:
+        tmax, tmin: daily air temperature extremes in °C
+        shortwave_radiation: incoming solar radiation Rs in MJ m-2 day-1
+        rh_max, rh_min: daily relative humidity extremes in %
+        wind_speed_2m: mean wind speed at 2 m in m/s
+        latitude_deg: latitude in degrees
+        day_of_year: day of year (1-366)
+        elevation_m: station elevation in m
+    """
+    tmax = np.asarray(tmax, dtype=np.float64)
+    tmin = np.asarray(tmin, dtype=np.float64)
+    rs = np.asarray(shortwave_radiation, dtype=np.float64)
+    u2 = np.asarray(wind_speed_2m, dtype=np.float64)
+    z = np.asarray(elevation_m, dtype=np.float64)
+    tmean = (tmax + tmin) / 2
+
+    pressure = 101.3 * ((293.0 - 0.0065 * z) / 293.0) ** 5.26
+    gamma = 0.000665 * pressure
+    delta = 4098.0 * saturation_vapour_pressure(tmean) / (tmean + 237.3) ** 2
+
+    e_tmax = saturation_vapour_pressure(tmax)
+    e_tmin = saturation_vapour_pressure(tmin)
+    es = (e_tmax + e_tmin) / 2
+    ea = (e_tmin * np.asarray(rh_max) / 100.0 + e_tmax * np.asarray(rh_min) / 100.0) / 2
+
+    ra = extraterrestrial_radiation(latitude_deg, day_of_year)
+    rso = (0.75 + 2e-5 * z) * ra
+    relative_shortwave = np.minimum(np.divide(rs, rso, out=np.ones(np.broadcast(rs, rso).shape), where=rso > 0), 1.0)
+    rnl = STEFAN_BOLTZMANN * ((tmax + 273.16) ** 4 + (tmin + 273.16) ** 4) / 2 \
+        * (0.34 - 0.14 * np.sqrt(np.maximum(ea, 0.0))) \
+        * (1.35 * relative_shortwave - 0.35)
+    rn = (1.0 - ALBEDO) * rs - rnl
+
+    numerator = 0.408 * delta * rn + gamma * (900.0 / (tmean + 273.0)) * u2 * (es - ea)
+    return np.maximum(numerator / (delta + gamma * (1.0 + 0.34 * u2)), 0.0)
+
+
+@dataclass
+class Et0Method:
+    """A registered ET0 method and the Open-Meteo daily variables it needs."""
+    name: str
+    variables: Tuple[str, ...]
+    compute: Callable[[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+ET0_METHODS: Dict[str, Et0Method] = {}
+
+
+def register_et0_method(name: str, variables: Sequence[str]):
+    """
+    Register an ET0 method under name.
+
+    The decorated function receives (daily, latitude, day_of_year, elevation),
+    where daily maps each Open-Meteo variable in variables to a float array with
+    gaps already filled.
+    """
+    def decorator(compute):
+        ET0_METHODS[name] = Et0Method(name=name, variables=tuple(variables), compute=compute)
+        return compute
+    return decorator
+
+
+def get_et0_method(name: str) -> Et0Method:
+    try:
+        return ET0_METHODS[name]
+    except KeyError:
+        raise ValueError(f"Unknown ET0 method '{name}', choose from {sorted(ET0_METHODS)}") from None
+
+
+def compute_et0(method: str, daily: dict, latitude, elevation=0.0) -> np.ndarray:
+    """
+    Compute ET0 from an Open-Meteo "daily" block (or a dict of arrays shaped
+    (days, locations) with a "time" entry).
+
+    Gaps in each input variable are filled by interpolation over time; a
+    variable with no data at all, for any location, raises ValueError.
+    """
+    et0_method = get_et0_method(method)
+    inputs = {}
+    for variable in et0_method.variables:
+        values = fill_missing(to_array(daily.get(variable, [])))
+        if values.size == 0 or np.isnan(values).all():
+            raise ValueError(f"No '{variable}' data for ET0 method '{method}'")
+        if values.ndim == 2:
+            empty = np.flatnonzero(np.isnan(values).all(axis=0))
+            if empty.size:
+                raise ValueError(
+                    f"No '{variable}' data for ET0 method '{method}' at location index {empty.tolist()}"
+                )
+        inputs[variable] = values
+
+    doy = day_of_year(daily["time"])
+    if inputs[et0_method.variables[0]].ndim == 2:
+        doy = doy[:, np.newaxis]
+    return et0_method.compute(inputs, np.asarray(latitude, dtype=np.float64), doy, np.asarray(elevation, dtype=np.float64))
+
+
+@register_et0_method("hargreaves", ("temperature_2m_max", "temperature_2m_min"))
+def _hargreaves_daily(daily, latitude, doy, elevation):
+    return hargreaves(daily["temperature_2m_max"], daily["temperature_2m_min"], latitude, doy)
+
+
+@register_et0_method(
+    "penman_monteith",
+    (
+        "temperature_2m_max",
+        "temperature_2m_min",
+        "shortwave_radiation_sum",
+        "relative_humidity_2m_max",
+        "relative_humidity_2m_min",
+        "wind_speed_10m_mean",
+    )
+)
+def _penman_monteith_daily(daily, latitude, doy, elevation):
+    # Open-Meteo reports wind in km/h at 10 m
+    return penman_monteith(
+        daily["temperature_2m_max"],
+        daily["temperature_2m_min"],
+        daily["shortwave_radiation_sum"],
+        daily["relative_humidity_2m_max"],
+        daily["relative_humidity_2m_min"],
+        wind_speed_2m(daily["wind_speed_10m_mean"] / 3.6, 10.0),
+        latitude,
+        doy,
+        elevation
+    )
@@ -0,0 +1,358 @@
+# core/fleet.py
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from core.metrics import METRICS
+from core.scan import clamped_cumsum, exponential_filter
+from domain.models import FleetState, FleetTrajectory, STATE_FIELDS
+from domain.soil import SoilProfile, CropProfile
+
+# Progress callbacks per closed-loop run, so UI updates do not grow with the horizon
+PROGRESS_UPDATES = 5
+
+
+class FleetSimulator:
+    """
+    Structure-of-arrays version of SoilTwinSimulator.
+
+    Every per-field attribute of SoilTwinSimulator is held as a NumPy array so a
+    single step() call advances all fields at once. The arithmetic mirrors
+    SoilTwinSimulator.step operation by operation, so results are identical to
+    stepping each field on its own.
+    """
+
+    # Above this many fields a step already amortizes its per-day overhead and
+    # fast_forward() steps day by day instead of scanning
+    SCAN_MAX_FIELDS = 256
+
+    def __init__(
+        self,
+        field_capacity_mm,
+        wilting_point_mm,
+        kc,
+        initial_moisture_mm
+    ):
+        """
+        Args:
+            field_capacity_mm: field capacity per field in mm
+            wilting_point_mm: wilting point per field in mm
+            kc: crop coefficient per field
+            initial_moisture_mm: initial soil moisture per field in mm
+
+        All arguments are broadcast to a common shape, which becomes the shape
+        of the fleet (usually one dimension: number of fields).
+        """
+        fc, wp, kc, sm = np.broadcast_arrays(
+            np.asarray(field_capacity_mm, dtype=np.float64),
+            np.asarray(wilting_point_mm, dtype=np.float64),
+            np.asarray(kc, dtype=np.float64),
+            np.asarray(initial_moisture_mm, dtype=np.float64),
+        )
+        self.field_capacity_mm = fc.copy()
+        self.wilting_point_mm = wp.copy()
+        self.kc = kc.copy()
+        self.soil_moisture_mm = sm.copy()
+        self.memory_factor = np.zeros(self.shape, dtype=np.float64)
+        self.day = np.zeros(self.shape, dtype=np.int64)
+
+    @classmethod
+    def from_profiles(
+        cls,
+        soils: Sequence[SoilProfile],
+        crops: Sequence[CropProfile],
+        initial_moisture_mm
+    ) -> "FleetSimulator":
+        """Build a fleet from one SoilProfile and CropProfile per field."""
+        return cls(
+            field_capacity_mm=[soil.field_capacity_mm for soil in soils],
+            wilting_point_mm=[soil.wilting_point_mm for soil in soils],
+            kc=[crop.kc for crop in crops],
+            initial_moisture_mm=initial_moisture_mm,
+        )
+
+    @classmethod
+    def from_state(
+        cls,
+        field_capacity_mm: np.ndarray,
+        wilting_point_mm: np.ndarray,
+        kc: np.ndarray,
+        soil_moisture_mm: np.ndarray,
+        memory_factor: np.ndarray,
+        day: np.ndarray
+    ) -> "FleetSimulator":
+        """
+        Wrap existing state arrays (e.g. memory-mapped) without copying them.
+
+        step() rebinds the state arrays rather than writing into them, so
+        read-only arrays are fine.
+        """
+        fleet = cls.__new__(cls)
+        fleet.field_capacity_mm = field_capacity_mm
+        fleet.wilting_point_mm = wilting_point_mm
+        fleet.kc = kc
+        fleet.soil_moisture_mm = soil_moisture_mm
+        fleet.memory_factor = memory_factor
+        fleet.day = day
+        return fleet
+
+    def copy(self) -> "FleetSimulator":
+        """Independent fleet with the same parameters and current state."""
+        fleet = FleetSimulator(self.field_capacity_mm, self.wilting_point_mm, self.kc, self.soil_moisture_mm)
+        fleet.memory_factor = self.memory_factor.copy()
+        fleet.day = self.day.copy()
+        return fleet
+
+    @property
+    def shape(self) -> tuple:
+        return self.field_capacity_mm.shape
+
+    @property
+    def size(self) -> int:
+        return self.field_capacity_mm.size
+
+    def step(self, et0_mm, rainfall_mm, irrigation_mm) -> FleetState:
+        """
+        Advance every field by one day.
+
+        Args:
+            et0_mm: reference evapotranspiration, scalar or one value per field
+            rainfall_mm: rainfall, scalar or one value per field
+            irrigation_mm: irrigation, scalar or one value per field
+
+        Returns:
+            FleetState with one entry per field
+        """
+        self.day = self.day + 1
+
+        # 1. Water balance
+        evapotranspiration = np.asarray(et0_mm, dtype=np.float64) * self.kc
+        moisture = self.soil_moisture_mm + (
+            np.asarray(rainfall_mm, dtype=np.float64) + np.asarray(irrigation_mm, dtype=np.float64)
+        )
+        moisture = moisture - evapotranspiration
+
+        # Clamp
+        self.soil_moisture_mm = np.maximum(
+            0.0,
+            np.minimum(moisture, self.field_capacity_mm)
+        )
+
+        # 2. Stress Index
+        stress_index = self._calculate_stress()
+
+        # 3. Memory Factor (simple decay)
+        self.memory_factor = 0.7 * self.memory_factor + 0.3 * stress_index
+
+        # 4. Soil Health Score
+        soil_health_score = np.maximum(
+            0.0,
+            100.0 * (1.0 - self.memory_factor)
+        )
+
+        return FleetState(
+            day=self.day,
+            soil_moisture_mm=self.soil_moisture_mm,
+            stress_index=stress_index,
+            memory_factor=self.memory_factor,
+            soil_health_score=soil_health_score
+        )
+
+    def fast_forward(
+        self,
+        et0_mm,
+        rainfall_mm,
+        irrigation_mm=0.0,
+        return_trajectory: bool = True
+    ) -> FleetState:
+        """
+        Advance every field through a stretch of days without per-day decisions.
+
+        Same result as calling step() once per day (up to floating point
+        rounding), but computed with array scans: the water balance is a
+        cumulative sum clamped to [0, FC] and the memory factor a linear filter
+        of the stress, both evaluated in blocks of days. The scans do more
+        arithmetic than stepping and only pay off while per-day call overhead
+        dominates, so fleets above SCAN_MAX_FIELDS are stepped.
+
+        Args:
+            et0_mm: reference ET0, shaped (days, *shape) or (days,) for all fields
+            rainfall_mm: rainfall, same shape rules as et0_mm
+            irrigation_mm: fixed irrigation, same shape rules or a scalar
+            return_trajectory: return every day's state, shaped (days, *shape),
+                instead of only the final one
+
+        Returns:
+            FleetState of the stretch (or of its last day)
+        """
+        et0_mm = _per_day(et0_mm, self.shape)
+        METRICS.count("simulated_days", len(et0_mm) * self.size)
+        with METRICS.timer("simulation"):
+            return self._fast_forward(et0_mm, rainfall_mm, irrigation_mm, return_trajectory)
+
+    def _fast_forward(self, et0_mm, rainfall_mm, irrigation_mm, return_trajectory: bool) -> FleetState:
+        days = len(et0_mm)
+        water_mm = _per_day(rainfall_mm, self.shape) + _per_day(irrigation_mm, self.shape)
+        if self.size > self.SCAN_MAX_FIELDS and days:
+            return self._step_through(et0_mm, water_mm, return_trajectory)
+
+        trajectory = ([], [], [])
+        for moisture in clamped_cumsum(water_mm - et0_mm * self.kc, self.soil_moisture_mm, self.field_capacity_mm):
+            stress = calculate_stress(moisture, self.field_capacity_mm, self.wilting_point_mm)
+            memory = exponential_filter(stress, self.memory_factor, 0.7, 0.3)
+            self.soil_moisture_mm = moisture[-1].copy()
+            self.memory_factor = memory[-1].copy()
+            if return_trajectory:
+                for column, block in zip(trajectory, (moisture, stress, memory)):
+                    column.append(block)
+
+        start_day = self.day
+        self.day = self.day + days
+        if not return_trajectory:
+            moisture, stress, memory = self.soil_moisture_mm, self._calculate_stress(), self.memory_factor
+            day = self.day
+        else:
+            empty = np.empty((0,) + self.shape)
+            moisture, stress, memory = (np.concatenate(column) if column else empty for column in trajectory)
+            day = start_day + np.arange(1, days + 1).reshape((days,) + (1,) * len(self.shape))
+
+        return FleetState(
+            day=day,
+            soil_moisture_mm=moisture,
+            stress_index=stress,
+            memory_factor=memory,
+            soil_health_score=np.maximum(0.0, 100.0 * (1.0 - memory))
+        )
+
+    def _step_through(self, et0_mm: np.ndarray, water_mm: np.ndarray, return_trajectory: bool) -> FleetState:
+        """fast_forward() by calling step() for every day; water_mm is rain plus irrigation."""
+        days = len(et0_mm)
+        shape = (days,) + self.shape
+        if return_trajectory:
+            trajectory = FleetState(
+                day=np.empty(shape, dtype=np.int64),
+                soil_moisture_mm=np.empty(shape),
+                stress_index=np.empty(shape),
+                memory_factor=np.empty(shape),
+                soil_health_score=np.empty(shape),
+            )
+        for d in range(days):
+            state = self.step(et0_mm[d], water_mm[d], 0.0)
+            if return_trajectory:
+                for name in STATE_FIELDS:
+                    getattr(trajectory, name)[d] = getattr(state, name)
+        return trajectory if return_trajectory else state
+
+    def _calculate_stress(self) -> np.ndarray:
+        """
+        Stress index per field, linear between wilting point and field capacity.
+        """
+        return calculate_stress(self.soil_moisture_mm, self.field_capacity_mm, self.wilting_point_mm)
+
+
+def run_closed_loop(
+    fleet: FleetSimulator,
+    engine,
+    et0_mm,
+    rainfall_mm,
+    writer=None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Optional[FleetTrajectory]:
+    """
+    Run a fleet day by day, letting a DecisionEngine pick each day's
+    irrigation from the state before that day's step.
+
+    Args:
+        fleet: FleetSimulator to advance (modified in place)
+        engine: DecisionEngine used through evaluate_batch()
+        et0_mm: reference ET0, shaped (days, *fleet.shape) or (days,) for all fields
+        rainfall_mm: rainfall, same shape rules as et0_mm
+        writer: optional TrajectoryWriter; days are streamed to it instead of
+            being collected, so memory does not grow with the horizon
+        progress: optional progress(day, days) callback, called at most
+            PROGRESS_UPDATES times per run whatever the horizon
+
+    Returns:
+        FleetTrajectory with one row per day, or None when writing to writer
+    """
+    et0_mm = np.asarray(et0_mm, dtype=np.float64)
+    METRICS.count("simulated_days", len(et0_mm) * fleet.size)
+    with METRICS.timer("simulation"):
+        return _run_closed_loop(fleet, engine, et0_mm, rainfall_mm, writer, progress)
+
+
+def _run_closed_loop(fleet, engine, et0_mm, rainfall_mm, writer, progress) -> Optional[FleetTrajectory]:
+    rainfall_mm = np.asarray(rainfall_mm, dtype=np.float64)
+    days = len(et0_mm)
+    shape = (days,) + fleet.shape
+    report_every = progress_interval(days) if progress is not None else 0
+
+    if writer is not None:
+        for d in range(days):
+            decisions = engine.evaluate_batch(
+                fleet._calculate_stress(), fleet.soil_moisture_mm, fleet.field_capacity_mm
+            )
+            state = fleet.step(et0_mm[d], rainfall_mm[d], decisions.irrigation_mm)
+            writer.append(state, decisions.irrigation_mm, decisions.reason_code)
+            if report_every and ((d + 1) % report_every == 0 or d + 1 == days):
+                progress(d + 1, days)
+        return None
+
+    trajectory = FleetTrajectory(
+        day=np.empty(shape, dtype=np.int64),
+        soil_moisture_mm=np.empty(shape),
+        stress_index=np.empty(shape),
+        memory_factor=np.empty(shape),
+        soil_health_score=np.empty(shape),
+        irrigation_mm=np.empty(shape),
+        reason_code=np.empty(shape, dtype=np.int8),
+    )
+
+    for d in range(days):
+        decisions = engine.evaluate_batch(
+            fleet._calculate_stress(), fleet.soil_moisture_mm, fleet.field_capacity_mm
+        )
+        state = fleet.step(et0_mm[d], rainfall_mm[d], decisions.irrigation_mm)
+
+        trajectory.day[d] = state.day
+        trajectory.soil_moisture_mm[d] = state.soil_moisture_mm
+        trajectory.stress_index[d] = state.stress_index
+        trajectory.memory_factor[d] = state.memory_factor
+        trajectory.soil_health_score[d] = state.soil_health_score
+        trajectory.irrigation_mm[d] = decisions.irrigation_mm
+        trajectory.reason_code[d] = decisions.reason_code
+        if report_every and ((d + 1) % report_every == 0 or d + 1 == days):
+            progress(d + 1, days)
+
+    return trajectory
+
+
+def progress_interval(days: int) -> int:
+    """Days between progress reports so a run makes at most PROGRESS_UPDATES of them."""
+    return max(1, -(-days // PROGRESS_UPDATES))
+
+
+def _per_day(values, shape: tuple) -> np.ndarray:
+    """Daily series as (days, *shape); a (days,) series applies to all fields."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1 and shape:
+        values = values.reshape((len(values),) + (1,) * len(shape))
+    return values
+
+
+def calculate_stress(soil_moisture_mm, field_capacity_mm, wilting_point_mm) -> np.ndarray:
+    """
+    Vectorized SoilTwinSimulator._calculate_stress.
+
+    0 at or above field capacity, 1 at or below wilting point and linear in
+    between.
+    """
+    sm = np.asarray(soil_moisture_mm, dtype=np.float64)
+    fc = np.asarray(field_capacity_mm, dtype=np.float64)
+    wp = np.asarray(wilting_point_mm, dtype=np.float64)
+    sm, fc, wp = np.broadcast_arrays(sm, fc, wp)
+
+    linear = (sm < fc) & (sm > wp)
+    stress = np.where(sm >= fc, 0.0, 1.0)
+    np.divide(fc - sm, fc - wp, out=stress, where=linear)
+    return stress
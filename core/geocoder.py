@@ -0,0 +1,198 @@
+# core/geocoder.py
+import csv
+import itertools
+import logging
+import math
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.metrics import METRICS
+from core.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_PLACES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "places.csv")
+UNKNOWN_REGION = "Unknown Region"
+
+
+def _unit_vectors(latitude, longitude) -> np.ndarray:
+    phi = np.radians(np.asarray(latitude, dtype=np.float64))
+    lam = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(chord / 2.0, 1.0))
+
+
+class Gazetteer:
+    """
+    Local nearest-place index over a bundled list of named places.
+
+    Places are stored as unit vectors on the sphere and hashed into a uniform
+    3-D grid. Straight-line (chord) distance orders points exactly like
+    great-circle distance, so searching grid shells outward from the query
+    cell finds the true nearest place. Only a few cells are visited for nearby
+    places; far-away queries fall back to one vectorized pass over all places.
+    """
+
+    MAX_SHELLS = 3
+
+    def __init__(self, names, countries, latitudes, longitudes, cell_km: float = 100.0):
+        """
+        Args:
+            names, countries, latitudes, longitudes: one entry per place
+            cell_km: approximate edge length of a grid cell
+        """
+        self.names = list(names)
+        self.countries = list(countries)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.points = _unit_vectors(self.latitudes, self.longitudes).reshape(-1, 3)
+        self.cell = cell_km / EARTH_RADIUS_KM
+
+        cells = np.floor(self.points / self.cell).astype(np.int64)
+        self._cells = {}
+        for index, cell in enumerate(map(tuple, cells.tolist())):
+            self._cells.setdefault(cell, []).append(index)
+        self._xyz = [tuple(point) for point in self.points.tolist()]
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_PLACES, **kwargs) -> "Gazetteer":
+        """Load places from a CSV with name, country, latitude and longitude columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return cls(
+            names=[row["name"] for row in rows],
+            countries=[row["country"] for row in rows],
+            latitudes=[float(row["latitude"]) for row in rows],
+            longitudes=[float(row["longitude"]) for row in rows],
+            **kwargs
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest(self, latitude: float, longitude: float) -> Tuple[int, float]:
+        """Return (index, distance in km) of the place nearest to a location."""
+        phi, lam = math.radians(latitude), math.radians(longitude)
+        qx, qy, qz = math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+        cx, cy, cz = math.floor(qx / self.cell), math.floor(qy / self.cell), math.floor(qz / self.cell)
+
+        best_index, best_chord2 = -1, math.inf
+        for shell, offsets in enumerate(_SHELL_OFFSETS):
+            for dx, dy, dz in offsets:
+                for index in self._cells.get((cx + dx, cy + dy, cz + dz), ()):
+                    x, y, z = self._xyz[index]
+                    chord2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                    if chord2 < best_chord2:
+                        best_index, best_chord2 = index, chord2
+            # Anything outside the shells searched so far is at least shell * cell away
+            if best_chord2 <= (shell * self.cell) ** 2:
+                return best_index, _chord_to_km(math.sqrt(best_chord2))
+
+        chords = np.linalg.norm(self.points - np.array([qx, qy, qz]), axis=1)
+        best_index = int(np.argmin(chords))
+        return best_index, _chord_to_km(float(chords[best_index]))
+
+    def name(self, index: int) -> str:
+        return self.names[index]
+
+
+def _shell_offsets(shell: int):
+    return [
+        offset
+        for offset in itertools.product(range(-shell, shell + 1), repeat=3)
+        if max(abs(o) for o in offset) == shell
+    ]
+
+
+# Cells at Chebyshev distance 0, 1, ... from the query cell
+_SHELL_OFFSETS = [_shell_offsets(shell) for shell in range(Gazetteer.MAX_SHELLS + 1)]
+
+
+class _LookupFailed(Exception):
+    pass
+
+
+class NominatimFallback:
+    """
+    Optional online reverse geocoding through Nominatim (geopy), with a short
+    timeout and an in-process cache keyed by rounded location.
+    """
+
+    def __init__(self, user_agent: str = "soil_twin", timeout: float = 2.0, precision: int = 2):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.precision = precision
+        self.cache = ResultCache(maxsize=1024, ttl_seconds=7 * 24 * 3600.0)
+        self._geolocator = None
+
+    def reverse(self, latitude: float, longitude: float) -> Optional[str]:
+        key = (round(latitude, self.precision), round(longitude, self.precision))
+        try:
+            return self.cache.get_or_compute(key, lambda: self._reverse(*key))
+        except _LookupFailed:
+            # Failures are not cached, so the next call retries
+            return None
+
+    def _reverse(self, latitude: float, longitude: float) -> Optional[str]:
+        try:
+            from geopy.exc import GeopyError
+            from geopy.geocoders import Nominatim
+        except ImportError:
+            return None
+
+        if self._geolocator is None:
+            self._geolocator = Nominatim(user_agent=self.user_agent, timeout=self.timeout)
+        try:
+            location = self._geolocator.reverse(f"{latitude}, {longitude}", language="en")
+        except GeopyError as error:
+            logger.warning("Nominatim reverse geocoding failed: %s", error)
+            raise _LookupFailed() from error
+        if location is None:
+            return None
+        address = location.raw.get("address", {})
+        return address.get("city") or address.get("town") or address.get("village")
+
+
+class ReverseGeocoder:
+    """
+    Resolve a location to a place name from the local gazetteer, optionally
+    falling back to Nominatim when no bundled place is close enough.
+    """
+
+    def __init__(
+        self,
+        gazetteer: Optional[Gazetteer] = None,
+        max_distance_km: float = 150.0,
+        fallback: Optional[NominatimFallback] = None
+    ):
+        """
+        Args:
+            gazetteer: local place index (default: bundled places list)
+            max_distance_km: nearest places farther than this are not used
+            fallback: optional online geocoder for locations without a nearby place
+        """
+        self.gazetteer = gazetteer or Gazetteer.from_csv()
+        self.max_distance_km = max_distance_km
+        self.fallback = fallback
+
+    def region_name(self, latitude: float, longitude: float) -> str:
+        with METRICS.timer("geocode"):
+            return self._region_name(latitude, longitude)
+
+    def _region_name(self, latitude: float, longitude: float) -> str:
+        index, distance_km = self.gazetteer.nearest(latitude, longitude)
+        if index >= 0 and distance_km <= self.max_distance_km:
+            METRICS.count("geocode_local")
+            return self.gazetteer.name(index)
+        if self.fallback is not None:
+            METRICS.count("geocode_fallback")
+            name = self.fallback.reverse(latitude, longitude)
+            if name:
+                return name
+        return UNKNOWN_REGION
@@ -0,0 +1,263 @@
+# core/grid.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core.climate_store import ClimateStore, backfill
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, calculate_stress
+from core.interpolation import InterpolationWeights, lattice_weights
+from core.metrics import METRICS
+from core.snapshot import create_snapshot, load_fleet
+
+GRID_FILE = "grid.json"
+STATE_FILE = "state.snap"
+# The state a run is writing; swapped in for STATE_FILE once every tile has finished
+NEXT_STATE_FILE = "state.next.snap"
+
+# Raster outputs of run_grid, float32 .npy files
+DAILY_RASTERS = ("stress_index", "irrigation_mm")
+SUMMARY_RASTERS = ("mean_stress_index", "total_irrigation_mm", "soil_moisture_mm")
+
+# A parameter given per cell: a scalar, or f(latitude, longitude) evaluated one tile at a time
+CellValues = Union[float, Callable[[np.ndarray, np.ndarray], np.ndarray]]
+
+
+@dataclass
+class GridSpec:
+    """
+    A regular latitude/longitude grid, rows running south from north and
+    columns east from west, processed in tiles of tile_rows x tile_cols cells.
+    """
+    rows: int
+    cols: int
+    north: float
+    west: float
+    cell_degrees: float
+    tile_rows: int = 128
+    tile_cols: int = 128
+
+    def tiles(self) -> List[Tuple[slice, slice]]:
+        return [
+            (slice(row, min(row + self.tile_rows, self.rows)), slice(col, min(col + self.tile_cols, self.cols)))
+            for row in range(0, self.rows, self.tile_rows)
+            for col in range(0, self.cols, self.tile_cols)
+        ]
+
+    def cell_centers(self, rows: slice = slice(None), cols: slice = slice(None)) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitude and longitude of the centres of a block of cells, each shaped (rows, cols)."""
+        row = np.arange(self.rows)[rows]
+        col = np.arange(self.cols)[cols]
+        latitude = self.north - (row + 0.5) * self.cell_degrees
+        longitude = self.west + (col + 0.5) * self.cell_degrees
+        return np.meshgrid(latitude, longitude, indexing="ij")
+
+
+class UniformWeather:
+    """The same daily series over the whole grid (scenarios, tests)."""
+
+    def __init__(self, et0_mm, rainfall_mm):
+        self.et0_mm = np.asarray(et0_mm, dtype=np.float64)
+        self.rainfall_mm = np.broadcast_to(np.asarray(rainfall_mm, dtype=np.float64), self.et0_mm.shape)
+        self.days = len(self.et0_mm)
+
+    def prepare(self, spec: GridSpec):
+        pass
+
+    def tile(self, spec: GridSpec, rows: slice, cols: slice) -> Tuple[np.ndarray, np.ndarray]:
+        return self.et0_mm[:, None, None], self.rainfall_mm[:, None, None]
+
+
+class ClimateStoreWeather:
+    """
+    Observed weather from the climate store, fetched at the points of a
+    coarser resolution_degrees lattice (weather varies far more slowly than
+    soil) and interpolated to each cell (see lattice_weights).
+    """
+
+    def __init__(self, start_date: str, end_date: str, resolution_degrees: float = 0.25,
+                 directory: Optional[str] = None, method: str = "bilinear"):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.resolution_degrees = resolution_degrees
+        self.directory = directory
+        self.method = method
+        self.days = int(
+            (np.datetime64(end_date) - np.datetime64(start_date)).astype(np.int64) + 1
+        )
+
+    def weights(self, spec: GridSpec, rows: slice = slice(None), cols: slice = slice(None)) -> InterpolationWeights:
+        """Interpolation from the lattice to a block of cells, flattened row-major."""
+        latitude, longitude = spec.cell_centers(rows, cols)
+        return lattice_weights(latitude, longitude, self.resolution_degrees, self.method)
+
+    def prepare(self, spec: GridSpec):
+        """Backfill every lattice point of the domain, once, before tiles run in parallel."""
+        points = sorted({point for rows, cols in spec.tiles() for point in self.weights(spec, rows, cols).points})
+        backfill(ClimateStore(self.directory), points, self.start_date, self.end_date)
+
+    def tile(self, spec: GridSpec, rows: slice, cols: slice) -> Tuple[np.ndarray, np.ndarray]:
+        weights = self.weights(spec, rows, cols)
+        weather = ClimateStore(self.directory).query(weights.points, self.start_date, self.end_date)
+        shape = (len(weather.dates),) + spec.cell_centers(rows, cols)[0].shape
+        return weights.apply(weather.et0_mm).reshape(shape), weights.apply(weather.rainfall_mm).reshape(shape)
+
+
+def create_grid(
+    directory: str,
+    spec: GridSpec,
+    field_capacity_mm: CellValues,
+    wilting_point_mm: CellValues,
+    kc: CellValues,
+    initial_moisture_mm: CellValues
+) -> GridSpec:
+    """
+    Create a grid domain in directory: grid.json and a memory-mapped state
+    snapshot holding the parameters and state of every cell.
+
+    Parameters are filled tile by tile, so grids larger than memory can be
+    created; callables receive the latitude/longitude of a tile's cells.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fleet = create_snapshot(os.path.join(directory, STATE_FILE), (spec.rows, spec.cols))
+    parameters = {
+        "field_capacity_mm": field_capacity_mm,
+        "wilting_point_mm": wilting_point_mm,
+        "kc": kc,
+        "soil_moisture_mm": initial_moisture_mm,
+    }
+    for rows, cols in spec.tiles():
+        latitude, longitude = spec.cell_centers(rows, cols)
+        for name, values in parameters.items():
+            getattr(fleet, name)[rows, cols] = values(latitude, longitude) if callable(values) else values
+    for column in (fleet.field_capacity_mm, fleet.wilting_point_mm, fleet.kc, fleet.soil_moisture_mm,
+                   fleet.memory_factor, fleet.day):
+        column.flush()
+
+    with open(os.path.join(directory, GRID_FILE), "w", encoding="utf-8") as f:
+        json.dump(asdict(spec), f, indent=2)
+    return spec
+
+
+def open_grid(directory: str) -> GridSpec:
+    with open(os.path.join(directory, GRID_FILE), "r", encoding="utf-8") as f:
+        return GridSpec(**json.load(f))
+
+
+def run_grid(
+    directory: str,
+    weather,
+    output: str,
+    engine: Optional[DecisionEngine] = None,
+    workers: Optional[int] = None,
+    daily: bool = True,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, str]:
+    """
+    Advance every cell of a grid through weather.days days, tile by tile on
+    a pool of worker processes, and write rasters to output.
+
+    Each task maps only its tile of the state snapshot and rasters, builds a
+    FleetSimulator over that tile, streams the tile's weather in and steps
+    day by day, writing each day's rasters as it goes; memory per worker is
+    bounded by the tile size, not the grid size. Tiles write the advanced
+    state to a separate snapshot, which replaces the domain's state only when
+    every tile has finished: a failed run leaves the domain as it was, and a
+    later run continues from where the last complete one ended.
+
+    Args:
+        weather: UniformWeather, ClimateStoreWeather or any object with days,
+            prepare(spec) and tile(spec, rows, cols) -> (et0, rain) shaped
+            (days, tile rows, tile cols) or broadcastable to it
+        output: directory for the .npy rasters
+        engine: DecisionEngine (default thresholds when None)
+        workers: worker processes (default: all cores); 1 runs in this process
+        daily: also write (days, rows, cols) rasters of DAILY_RASTERS
+        progress: optional progress(done, total) callback, called per tile
+
+    Returns:
+        raster name -> path
+    """
+    spec = open_grid(directory)
+    engine = engine or DecisionEngine()
+    weather.prepare(spec)
+    os.makedirs(output, exist_ok=True)
+
+    paths = {name: os.path.join(output, f"{name}.npy") for name in SUMMARY_RASTERS}
+    for name in SUMMARY_RASTERS:
+        np.lib.format.open_memmap(paths[name], mode="w+", dtype=np.float32, shape=(spec.rows, spec.cols)).flush()
+    if daily:
+        for name in DAILY_RASTERS:
+            paths[name] = os.path.join(output, f"{name}.npy")
+            np.lib.format.open_memmap(
+                paths[name], mode="w+", dtype=np.float32, shape=(weather.days, spec.rows, spec.cols)
+            ).flush()
+
+    next_path = os.path.join(directory, NEXT_STATE_FILE)
+    create_snapshot(next_path, (spec.rows, spec.cols))
+    tasks = [
+        dict(directory=directory, spec=spec, rows=rows, cols=cols, weather=weather, engine=engine, paths=paths)
+        for rows, cols in spec.tiles()
+    ]
+    workers = workers or os.cpu_count() or 1
+    METRICS.count("grid_cells", spec.rows * spec.cols)
+    with METRICS.timer("grid_run"):
+        if workers == 1 or len(tasks) == 1:
+            _drain(map(run_tile, tasks), len(tasks), progress)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                _drain(pool.map(run_tile, tasks), len(tasks), progress)
+    os.replace(next_path, os.path.join(directory, STATE_FILE))
+    return paths
+
+
+def run_tile(task: dict):
+    """Run one tile of a grid (a task built by run_grid)."""
+    spec, rows, cols, engine = task["spec"], task["rows"], task["cols"], task["engine"]
+    state = load_fleet(os.path.join(task["directory"], STATE_FILE))
+    # Copies of the tile only; the rest of the snapshot is never read
+    fleet = FleetSimulator.from_state(
+        field_capacity_mm=np.array(state.field_capacity_mm[rows, cols]),
+        wilting_point_mm=np.array(state.wilting_point_mm[rows, cols]),
+        kc=np.array(state.kc[rows, cols]),
+        soil_moisture_mm=np.array(state.soil_moisture_mm[rows, cols]),
+        memory_factor=np.array(state.memory_factor[rows, cols]),
+        day=np.array(state.day[rows, cols], dtype=np.int64),
+    )
+    et0_mm, rainfall_mm = task["weather"].tile(spec, rows, cols)
+    rasters = {name: np.load(path, mmap_mode="r+") for name, path in task["paths"].items()}
+
+    days = len(et0_mm)
+    stress_sum = np.zeros(fleet.shape)
+    irrigation_sum = np.zeros(fleet.shape)
+    for d in range(days):
+        stress = calculate_stress(fleet.soil_moisture_mm, fleet.field_capacity_mm, fleet.wilting_point_mm)
+        irrigation_mm = engine.evaluate_batch(stress, fleet.soil_moisture_mm, fleet.field_capacity_mm).irrigation_mm
+        day = fleet.step(et0_mm[d], rainfall_mm[d], irrigation_mm)
+        stress_sum += day.stress_index
+        irrigation_sum += irrigation_mm
+        if "stress_index" in rasters:
+            rasters["stress_index"][d, rows, cols] = day.stress_index
+            rasters["irrigation_mm"][d, rows, cols] = irrigation_mm
+
+    rasters["mean_stress_index"][rows, cols] = stress_sum / max(days, 1)
+    rasters["total_irrigation_mm"][rows, cols] = irrigation_sum
+    rasters["soil_moisture_mm"][rows, cols] = fleet.soil_moisture_mm
+    for raster in rasters.values():
+        raster.flush()
+
+    advanced = load_fleet(os.path.join(task["directory"], NEXT_STATE_FILE), writable=True)
+    for name in ("field_capacity_mm", "wilting_point_mm", "kc", "soil_moisture_mm", "memory_factor", "day"):
+        column = getattr(advanced, name)
+        column[rows, cols] = getattr(fleet, name)
+        column.flush()
+
+
+def _drain(results, total: int, progress):
+    for done, _ in enumerate(results, 1):
+        if progress is not None:
+            progress(done, total)
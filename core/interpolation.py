@@ -0,0 +1,131 @@
+# core/interpolation.py
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from core.metrics import METRICS
+from core.weather_bulk import BulkWeather
+
+INTERPOLATION_METHODS = ("bilinear", "idw", "nearest")
+
+# Offsets of the lattice points around a location considered by inverse-distance weighting
+_IDW_WINDOW = np.array([(di, dj) for di in (-1, 0, 1, 2) for dj in (-1, 0, 1, 2)], dtype=np.float64)
+
+
+@dataclass
+class InterpolationWeights:
+    """
+    Sparse (locations x points) interpolation matrix with k non-zeros per
+    location, kept as index and weight arrays shaped (locations, k) into
+    points, the lattice points it needs.
+    """
+    points: List[Tuple[float, float]]
+    index: np.ndarray
+    weight: np.ndarray
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        """Interpolate values shaped (..., points) to shape (..., locations)."""
+        values = np.asarray(values, dtype=np.float64)
+        result = values[..., self.index[:, 0]] * self.weight[:, 0]
+        for k in range(1, self.index.shape[1]):
+            result += values[..., self.index[:, k]] * self.weight[:, k]
+        return result
+
+
+def lattice_weights(
+    latitude,
+    longitude,
+    resolution_degrees: float,
+    method: str = "bilinear",
+    neighbours: int = 4,
+    power: float = 2.0
+) -> InterpolationWeights:
+    """
+    Weights interpolating from the lattice of points at multiples of
+    resolution_degrees to each location.
+
+    The lattice is global, so the same points (and their cached or stored
+    weather) are shared by every region and run; only points carrying
+    weight for some location are listed.
+
+    Args:
+        method: "bilinear" (the four surrounding points), "idw" (inverse
+            distance to the nearest neighbours points, distance**-power) or
+            "nearest"
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method {method!r}; expected one of {INTERPOLATION_METHODS}")
+    latitude = np.asarray(latitude, dtype=np.float64).reshape(-1)
+    longitude = np.asarray(longitude, dtype=np.float64).reshape(-1)
+    # Rounded so that locations on the lattice do not pick up neighbours at weight 1e-15
+    y = np.round(latitude / resolution_degrees, 9)
+    x = np.round(longitude / resolution_degrees, 9)
+
+    if method == "nearest":
+        cells = np.stack([np.round(y), np.round(x)], axis=-1)[:, None, :]
+        weight = np.ones((len(y), 1))
+    elif method == "bilinear":
+        i, j = np.floor(y), np.floor(x)
+        ty, tx = y - i, x - j
+        cells = np.stack([
+            np.stack([i, j], axis=-1), np.stack([i, j + 1], axis=-1),
+            np.stack([i + 1, j], axis=-1), np.stack([i + 1, j + 1], axis=-1),
+        ], axis=1)
+        weight = np.stack([(1 - ty) * (1 - tx), (1 - ty) * tx, ty * (1 - tx), ty * tx], axis=1)
+    else:
+        cells = np.stack([np.floor(y), np.floor(x)], axis=-1)[:, None, :] + _IDW_WINDOW
+        dy = y[:, None] - cells[..., 0]
+        dx = (x[:, None] - cells[..., 1]) * np.cos(np.radians(latitude))[:, None]
+        distance = np.hypot(dy, dx)
+        nearest = np.argpartition(distance, neighbours - 1, axis=1)[:, :neighbours]
+        cells = np.take_along_axis(cells, nearest[..., None], axis=1)
+        distance = np.take_along_axis(distance, nearest, axis=1)
+        with np.errstate(divide="ignore"):
+            weight = distance ** -power
+        exact = distance == 0
+        weight = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), weight)
+        weight /= weight.sum(axis=1, keepdims=True)
+
+    # Points with no weight are replaced by the location's heaviest point, so they are never fetched
+    heaviest = np.take_along_axis(cells, weight.argmax(axis=1)[:, None, None], axis=1)
+    cells = np.where((weight == 0)[..., None], heaviest, cells).astype(np.int64)
+
+    keys, index = np.unique(cells.reshape(-1, 2), axis=0, return_inverse=True)
+    points = [
+        (round(i * resolution_degrees, 6), round(j * resolution_degrees, 6)) for i, j in keys.tolist()
+    ]
+    return InterpolationWeights(points=points, index=index.reshape(cells.shape[:2]), weight=weight)
+
+
+class LatticeWeatherFetcher:
+    """
+    Weather for many locations from a coarse lattice: the lattice points
+    around the locations are fetched once through fetch (any callable taking
+    points and returning BulkWeather, e.g. BulkWeatherFetcher.fetch) and
+    ET0 and rainfall interpolated to every location.
+
+    Requests scale with the lattice points the locations cover, not with the
+    number of locations; fields a few hundred metres apart share points.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[Tuple[float, float]]], BulkWeather],
+        resolution_degrees: float = 0.1,
+        method: str = "bilinear"
+    ):
+        self._fetch = fetch
+        self.resolution_degrees = resolution_degrees
+        self.method = method
+
+    def fetch(self, locations: Sequence[Tuple[float, float]]) -> BulkWeather:
+        locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        weights = lattice_weights(locations[:, 0], locations[:, 1], self.resolution_degrees, self.method)
+        METRICS.count("lattice_points_fetched", len(weights.points))
+        weather = self._fetch(weights.points)
+        return BulkWeather(
+            dates=weather.dates,
+            et0_mm=weights.apply(weather.et0_mm),
+            rainfall_mm=weights.apply(weather.rainfall_mm),
+        )
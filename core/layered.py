@@ -0,0 +1,306 @@
+# core/layered.py
+from typing import Sequence
+
+import numpy as np
+
+from core.fleet import calculate_stress
+from domain.models import FleetState
+from domain.soil import LayeredSoilProfile, CropProfile
+
+
+class LayeredFleetSimulator:
+    """
+    FleetSimulator with the root zone split into layers.
+
+    Layer arrays are shaped (layers, *fleet shape), so each layer is one
+    contiguous vector over the fleet and the vertical solvers loop over the
+    (few) layers while every operation covers all fields. A day's step:
+
+    1. rain and irrigation enter the top layer
+    2. ET is drawn from each layer by root fraction, never below empty
+    3. layers exchange water towards equal saturation (implicit, tridiagonal)
+    4. water above field capacity percolates downwards at drainage_rate per
+       layer; what leaves the bottom layer is deep drainage
+
+    Results are reported per field as totals over the layers, with stress
+    computed against the profile's total FC and WP. With a single layer and
+    drainage_rate 1 this reproduces FleetSimulator exactly.
+    """
+
+    def __init__(
+        self,
+        layer_field_capacity_mm,
+        layer_wilting_point_mm,
+        kc,
+        initial_moisture_mm,
+        root_fraction=None,
+        drainage_rate=1.0,
+        redistribution_mm=0.0
+    ):
+        """
+        Args:
+            layer_field_capacity_mm: field capacity per layer, shaped (layers,)
+                or (layers, *fleet shape)
+            layer_wilting_point_mm: wilting point per layer, same shape rules
+            kc: crop coefficient per field
+            initial_moisture_mm: initial total moisture per field, spread over
+                the layers in proportion to their field capacity
+            root_fraction: share of ET drawn from each layer (same shape rules;
+                default: in proportion to field capacity)
+            drainage_rate: share of the water above FC that percolates per day,
+                scalar or per field
+            redistribution_mm: daily exchange between neighbouring layers per
+                unit difference in saturation, scalar or per field (0 disables it)
+        """
+        fc = np.asarray(layer_field_capacity_mm, dtype=np.float64)
+        wp = np.asarray(layer_wilting_point_mm, dtype=np.float64)
+        roots = fc if root_fraction is None else np.asarray(root_fraction, dtype=np.float64)
+        kc = np.asarray(kc, dtype=np.float64)
+        sm = np.asarray(initial_moisture_mm, dtype=np.float64)
+        drainage = np.asarray(drainage_rate, dtype=np.float64)
+        redistribution = np.asarray(redistribution_mm, dtype=np.float64)
+
+        layers = len(fc)
+        if len(wp) != layers or len(roots) != layers:
+            raise ValueError("Layer arrays must all have the same number of layers")
+        shape = np.broadcast_shapes(
+            fc.shape[1:], wp.shape[1:], roots.shape[1:], kc.shape, sm.shape, drainage.shape, redistribution.shape
+        )
+        layered = (layers,) + shape
+
+        self.layer_field_capacity_mm = np.broadcast_to(_per_layer(fc, shape), layered).copy()
+        self.layer_wilting_point_mm = np.broadcast_to(_per_layer(wp, shape), layered).copy()
+        roots = np.broadcast_to(_per_layer(roots, shape), layered)
+        self.root_fraction = roots / roots.sum(axis=0)
+        self.field_capacity_mm = self.layer_field_capacity_mm.sum(axis=0)
+        self.wilting_point_mm = self.layer_wilting_point_mm.sum(axis=0)
+        self.kc = np.broadcast_to(kc, shape).copy()
+        self.drainage_rate = np.broadcast_to(drainage, shape).copy()
+        self.redistribution_mm = np.broadcast_to(redistribution, shape).copy()
+
+        self.layer_moisture_mm = self.layer_field_capacity_mm / self.field_capacity_mm * sm
+        self.memory_factor = np.zeros(shape, dtype=np.float64)
+        self.day = np.zeros(shape, dtype=np.int64)
+        self.deep_drainage_mm = np.zeros(shape, dtype=np.float64)
+        self._free_drainage = bool(np.all(self.drainage_rate == 1.0))
+        self._factor_redistribution()
+
+    @classmethod
+    def from_profiles(
+        cls,
+        soils: Sequence[LayeredSoilProfile],
+        crops: Sequence[CropProfile],
+        initial_moisture_mm
+    ) -> "LayeredFleetSimulator":
+        """Build a fleet from one LayeredSoilProfile and CropProfile per field."""
+        if len({soil.layers for soil in soils}) > 1:
+            raise ValueError("All soil profiles of a fleet must have the same number of layers")
+        layers = soils[0].layers
+        return cls(
+            layer_field_capacity_mm=np.array([soil.layer_field_capacity_mm for soil in soils]).T,
+            layer_wilting_point_mm=np.array([soil.layer_wilting_point_mm for soil in soils]).T,
+            kc=[crop.kc for crop in crops],
+            initial_moisture_mm=initial_moisture_mm,
+            root_fraction=np.array([
+                soil.layer_field_capacity_mm if soil.root_fraction is None else soil.root_fraction
+                for soil in soils
+            ]).reshape(len(soils), layers).T,
+            drainage_rate=[soil.drainage_rate for soil in soils],
+            redistribution_mm=[soil.redistribution_mm for soil in soils],
+        )
+
+    def copy(self) -> "LayeredFleetSimulator":
+        """Independent fleet with the same parameters and current state."""
+        fleet = LayeredFleetSimulator.__new__(LayeredFleetSimulator)
+        fleet.__dict__.update({
+            name: value.copy() if isinstance(value, np.ndarray) else value
+            for name, value in self.__dict__.items()
+        })
+        return fleet
+
+    @property
+    def shape(self) -> tuple:
+        return self.field_capacity_mm.shape
+
+    @property
+    def size(self) -> int:
+        return self.field_capacity_mm.size
+
+    @property
+    def layers(self) -> int:
+        return len(self.layer_field_capacity_mm)
+
+    @property
+    def soil_moisture_mm(self) -> np.ndarray:
+        """Total moisture over all layers per field."""
+        return self.layer_moisture_mm.sum(axis=0)
+
+    @soil_moisture_mm.setter
+    def soil_moisture_mm(self, value):
+        # Keep each field's vertical distribution; empty fields are filled by capacity
+        total = self.layer_moisture_mm.sum(axis=0)
+        share = np.where(
+            total > 0.0,
+            self.layer_moisture_mm / np.where(total > 0.0, total, 1.0),
+            self.layer_field_capacity_mm / self.field_capacity_mm
+        )
+        self.layer_moisture_mm = share * np.asarray(value, dtype=np.float64)
+
+    def update_water(self, et0_mm, rainfall_mm, irrigation_mm) -> np.ndarray:
+        """
+        Apply one day's water balance to the layers.
+
+        Returns:
+            total moisture per field after the update; the water that left the
+            bottom layer is kept in deep_drainage_mm
+        """
+        theta = self.layer_moisture_mm.copy()
+
+        # 1. Inputs enter the top layer
+        theta[0] += np.asarray(rainfall_mm, dtype=np.float64) + np.asarray(irrigation_mm, dtype=np.float64)
+
+        # 2. Root water uptake, limited to the water each layer holds
+        evapotranspiration = np.asarray(et0_mm, dtype=np.float64) * self.kc
+        if self.layers == 1:
+            theta[0] -= evapotranspiration
+        else:
+            theta -= evapotranspiration * self.root_fraction
+        np.maximum(theta, 0.0, out=theta)
+
+        # 3. Redistribution towards equal saturation
+        if self._redistributes:
+            theta = self._redistribute(theta)
+
+        # 4. Gravity drainage cascade
+        drained = np.zeros(self.shape)
+        excess = np.empty(self.shape)
+        free_drainage = self._free_drainage
+        for i in range(self.layers):
+            layer = theta[i]
+            layer += drained
+            fc = self.layer_field_capacity_mm[i]
+            if free_drainage:
+                # Exactly FC where the layer overflows, as the single bucket clamps
+                np.minimum(layer, fc, out=excess)
+                np.subtract(layer, excess, out=drained)
+                layer[...] = excess
+            else:
+                np.subtract(layer, fc, out=excess)
+                np.maximum(excess, 0.0, out=excess)
+                np.multiply(excess, self.drainage_rate, out=drained)
+                layer -= drained
+
+        self.layer_moisture_mm = theta
+        self.deep_drainage_mm = drained
+        return theta.sum(axis=0)
+
+    def step(self, et0_mm, rainfall_mm, irrigation_mm) -> FleetState:
+        """
+        Advance every field by one day.
+
+        Args:
+            et0_mm: reference evapotranspiration, scalar or one value per field
+            rainfall_mm: rainfall, scalar or one value per field
+            irrigation_mm: irrigation, scalar or one value per field
+
+        Returns:
+            FleetState with one entry per field (moisture summed over layers)
+        """
+        self.day = self.day + 1
+        moisture = self.update_water(et0_mm, rainfall_mm, irrigation_mm)
+
+        stress_index = calculate_stress(moisture, self.field_capacity_mm, self.wilting_point_mm)
+        self.memory_factor = 0.7 * self.memory_factor + 0.3 * stress_index
+        soil_health_score = np.maximum(
+            0.0,
+            100.0 * (1.0 - self.memory_factor)
+        )
+
+        return FleetState(
+            day=self.day,
+            soil_moisture_mm=moisture,
+            stress_index=stress_index,
+            memory_factor=self.memory_factor,
+            soil_health_score=soil_health_score
+        )
+
+    def _calculate_stress(self) -> np.ndarray:
+        return calculate_stress(self.soil_moisture_mm, self.field_capacity_mm, self.wilting_point_mm)
+
+    def _factor_redistribution(self):
+        """
+        Factor the implicit redistribution system once.
+
+        The exchange between layers i and i+1 is k * (s_i - s_i+1) with
+        saturation s = theta / FC, solved implicitly so any k is stable. The
+        matrix only depends on parameters, so the Thomas forward sweep
+        coefficients are kept and a step only substitutes.
+        """
+        self._redistributes = self.layers > 1 and bool(np.any(self.redistribution_mm > 0.0))
+        if not self._redistributes:
+            return
+
+        conductance = self.redistribution_mm / self.layer_field_capacity_mm
+        lower = np.zeros_like(conductance)
+        upper = np.zeros_like(conductance)
+        lower[1:] = -conductance[:-1]
+        upper[:-1] = -conductance[1:]
+        diag = 1.0 + conductance
+        diag[1:-1] += conductance[1:-1]
+
+        self._lower = lower
+        pivot, self._upper = _factor_tridiagonal(lower, diag, upper)
+        self._inverse_pivot = 1.0 / pivot
+
+    def _redistribute(self, theta: np.ndarray) -> np.ndarray:
+        return _substitute_tridiagonal(self._lower, self._inverse_pivot, self._upper, theta)
+
+
+def _per_layer(values: np.ndarray, shape: tuple) -> np.ndarray:
+    """Give a (layers,) array trailing axes so it broadcasts against the fleet shape."""
+    return values.reshape(values.shape + (1,) * (len(shape) + 1 - values.ndim))
+
+
+def _factor_tridiagonal(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray):
+    """Forward sweep of the Thomas algorithm along axis 0, batched over the other axes."""
+    pivot = np.empty_like(diag)
+    ratio = np.empty_like(upper)
+    pivot[0] = diag[0]
+    ratio[0] = upper[0] / pivot[0]
+    for i in range(1, len(diag)):
+        pivot[i] = diag[i] - lower[i] * ratio[i - 1]
+        ratio[i] = upper[i] / pivot[i]
+    return pivot, ratio
+
+
+def _substitute_tridiagonal(
+    lower: np.ndarray,
+    inverse_pivot: np.ndarray,
+    ratio: np.ndarray,
+    rhs: np.ndarray
+) -> np.ndarray:
+    """Solve a system factored by _factor_tridiagonal, overwriting rhs with the solution."""
+    x = rhs
+    x[0] *= inverse_pivot[0]
+    scratch = np.empty_like(x[0])
+    for i in range(1, len(x)):
+        np.multiply(lower[i], x[i - 1], out=scratch)
+        x[i] -= scratch
+        x[i] *= inverse_pivot[i]
+    for i in range(len(x) - 2, -1, -1):
+        np.multiply(ratio[i], x[i + 1], out=scratch)
+        x[i] -= scratch
+    return x
+
+
+def solve_tridiagonal(lower, diag, upper, rhs) -> np.ndarray:
+    """
+    Solve tridiagonal systems along axis 0, batched over the remaining axes.
+
+    lower[0] and upper[-1] are ignored.
+    """
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64).copy()
+    upper[-1] = 0.0
+    pivot, ratio = _factor_tridiagonal(lower, np.asarray(diag, dtype=np.float64), upper)
+    return _substitute_tridiagonal(lower, 1.0 / pivot, ratio, np.array(rhs, dtype=np.float64))
@@ -0,0 +1,160 @@
+# core/metrics.py
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional
+
+PREFIX = "soiltwin"
+
+# Returned by timer() while disabled, so an instrumented block costs one call
+_NULL_TIMER = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """
+    Process-wide counters and stage timers.
+
+    Instrumented code calls count(), observe() or timer() unconditionally;
+    while the registry is disabled these return immediately, and hot loops
+    check the enabled attribute once and record totals afterwards. Timers keep
+    count, total and maximum seconds per stage. Collectors are callables
+    polled on export for values other components already track (e.g. cache
+    hit counts), so those cost nothing between exports.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters: Dict[str, float] = {}
+        self._timers: Dict[str, list] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def count(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        """Record one run of a stage that took seconds."""
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def timer(self, name: str):
+        """Context manager timing the enclosed block as one run of stage name."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, float]]):
+        """Add counters read from collect() at export time; name replaces an earlier collector."""
+        self._collectors[name] = collect
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Current counters and timers, plus derived rates: <name>_hit_rate for
+        every <name>_hits/<name>_misses pair and simulated days per second of
+        the simulation stage.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {
+                name: {"count": count, "total_s": total, "max_s": longest, "mean_s": total / count}
+                for name, (count, total, longest) in self._timers.items()
+            }
+        for collect in list(self._collectors.values()):
+            counters.update(collect())
+
+        derived = {}
+        for name, hits in counters.items():
+            if name.endswith("_hits"):
+                base = name[:-len("_hits")]
+                lookups = hits + counters.get(f"{base}_misses", 0)
+                if lookups:
+                    derived[f"{base}_hit_rate"] = hits / lookups
+        simulation = timers.get("simulation")
+        if simulation and simulation["total_s"] > 0 and "simulated_days" in counters:
+            derived["simulated_days_per_second"] = counters["simulated_days"] / simulation["total_s"]
+
+        return {"enabled": self.enabled, "counters": counters, "timers": timers, "derived": derived}
+
+    def to_prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{PREFIX}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {_number(value)}"]
+        for name, timer in sorted(snapshot["timers"].items()):
+            metric = f"{PREFIX}_{name}_seconds"
+            lines += [
+                f"# TYPE {metric} summary",
+                f"{metric}_count {timer['count']}",
+                f"{metric}_sum {_number(timer['total_s'])}",
+                f"# TYPE {metric}_max gauge",
+                f"{metric}_max {_number(timer['max_s'])}",
+            ]
+        for name, value in sorted(snapshot["derived"].items()):
+            metric = f"{PREFIX}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _from_environment() -> Metrics:
+    """
+    Registry configured by SOILTWIN_METRICS=1 (enable) and SOILTWIN_METRICS_FILE
+    (enable and write a JSON snapshot there when the process exits).
+    """
+    path: Optional[str] = os.environ.get("SOILTWIN_METRICS_FILE")
+    metrics = Metrics(enabled=os.environ.get("SOILTWIN_METRICS") == "1" or bool(path))
+    if path:
+        atexit.register(metrics.write_json, path)
+    return metrics
+
+
+METRICS = _from_environment()
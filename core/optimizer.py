@@ -0,0 +1,187 @@
+# core/optimizer.py
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from core.fleet import FleetSimulator, calculate_stress
+
+
+@dataclass
+class IrrigationPlan:
+    """
+    Optimized irrigation schedule for a fleet over a forecast horizon.
+
+    Daily arrays are shaped (days, fields); the states are those reached by
+    applying the schedule to the exact (not discretized) dynamics.
+    """
+    irrigation_mm: np.ndarray
+    soil_moisture_mm: np.ndarray
+    stress_index: np.ndarray
+    soil_health_score: np.ndarray
+
+    @property
+    def total_irrigation_mm(self) -> np.ndarray:
+        return self.irrigation_mm.sum(axis=0)
+
+
+class IrrigationOptimizer:
+    """
+    Forecast-horizon irrigation planner based on dynamic programming.
+
+    Soil moisture of every field is discretized on a grid between 0 and field
+    capacity and irrigation on fixed steps. Backward induction over the ET0
+    and rainfall horizon finds, for every grid state, the least water needed
+    to keep stress at or below max_stress on all remaining days (violations
+    are allowed only at a heavy per-unit penalty, so the problem is always
+    solvable). Fields are solved together in chunks as (fields, grid, actions)
+    arrays, which bounds memory for large fleets, and irrigation steps that
+    would overflow field capacity for every state on a day are never
+    evaluated.
+
+    Use it receding-horizon style: plan every day with the latest forecast and
+    apply only the first day of the schedule.
+    """
+
+    CHUNK_FIELDS = 256
+
+    def __init__(
+        self,
+        max_stress: float = 0.3,
+        min_health: Optional[float] = None,
+        max_irrigation_mm: float = 15.0,
+        irrigation_step_mm: float = 2.5,
+        grid_points: int = 101,
+        stress_penalty_mm: float = 1000.0
+    ):
+        """
+        Args:
+            max_stress: highest acceptable daily stress index
+            min_health: optional lowest acceptable soil health score; applied as the
+                stress cap 1 - min_health/100, which keeps the memory factor (an
+                average of past stress) and so the health score within bounds
+            max_irrigation_mm: upper limit of irrigation in mm per day
+            irrigation_step_mm: resolution of the irrigation decision
+            grid_points: number of moisture grid points per field
+            stress_penalty_mm: cost, in mm of water, of one unit of stress above the cap
+        """
+        if min_health is not None:
+            max_stress = min(max_stress, 1.0 - min_health / 100.0)
+        self.max_stress = max_stress
+        self.max_irrigation_mm = max_irrigation_mm
+        self.actions = np.arange(0.0, max_irrigation_mm + 1e-9, irrigation_step_mm)
+        self.grid_points = grid_points
+        self.stress_penalty_mm = stress_penalty_mm
+
+    def plan(self, fleet: FleetSimulator, et0_mm, rainfall_mm) -> IrrigationPlan:
+        """
+        Plan irrigation for every field of a fleet from its current state.
+
+        Args:
+            fleet: fleet whose current state starts the plan (not modified)
+            et0_mm: reference ET0 per day, shaped (days, fields) or (days,)
+            rainfall_mm: rainfall per day, same shape rules as et0_mm
+
+        Returns:
+            IrrigationPlan for the whole horizon
+
+        Raises:
+            ValueError: when the forecast horizon has no days
+        """
+        days = len(et0_mm)
+        if days == 0:
+            raise ValueError("Cannot plan irrigation over an empty forecast horizon")
+        fields = fleet.size
+        start = fleet.copy()
+        et0 = np.broadcast_to(np.asarray(et0_mm, dtype=np.float64).reshape(days, -1), (days, fields))
+        rain = np.broadcast_to(np.asarray(rainfall_mm, dtype=np.float64).reshape(days, -1), (days, fields))
+
+        shape = (days, fields)
+        plan = IrrigationPlan(
+            irrigation_mm=np.empty(shape),
+            soil_moisture_mm=np.empty(shape),
+            stress_index=np.empty(shape),
+            soil_health_score=np.empty(shape),
+        )
+
+        # Fields are independent; solving them in chunks keeps the
+        # (fields, grid, actions) work arrays cache-sized
+        for lo in range(0, fields, self.CHUNK_FIELDS):
+            chunk = slice(lo, min(lo + self.CHUNK_FIELDS, fields))
+            simulator = FleetSimulator(
+                start.field_capacity_mm.reshape(fields)[chunk],
+                start.wilting_point_mm.reshape(fields)[chunk],
+                start.kc.reshape(fields)[chunk],
+                start.soil_moisture_mm.reshape(fields)[chunk]
+            )
+            simulator.memory_factor = start.memory_factor.reshape(fields)[chunk].copy()
+            simulator.day = start.day.reshape(fields)[chunk].copy()
+            self._plan_chunk(simulator, et0[:, chunk], rain[:, chunk], plan, chunk)
+
+        return plan
+
+    def _plan_chunk(self, simulator: FleetSimulator, et0, rain, plan: IrrigationPlan, chunk: slice):
+        days = len(et0)
+        fc, wp, kc = simulator.field_capacity_mm, simulator.wilting_point_mm, simulator.kc
+
+        # Grid of moisture states per field: (fields, grid)
+        grid = fc[:, np.newaxis] * np.linspace(0.0, 1.0, self.grid_points)
+
+        values = np.zeros((days + 1, simulator.size, self.grid_points))
+        for t in range(days - 1, -1, -1):
+            q, _ = self._action_costs(grid, t, et0, rain, fc, wp, kc, values[t + 1])
+            values[t] = q.min(axis=-1)
+
+        # Forward pass on the exact dynamics
+        for t in range(days):
+            moisture = simulator.soil_moisture_mm[:, np.newaxis]
+            q, actions = self._action_costs(moisture, t, et0, rain, fc, wp, kc, values[t + 1])
+            irrigation = actions[np.argmin(q[:, 0, :], axis=-1)]
+            state = simulator.step(et0[t], rain[t], irrigation)
+
+            plan.irrigation_mm[t, chunk] = irrigation
+            plan.soil_moisture_mm[t, chunk] = state.soil_moisture_mm
+            plan.stress_index[t, chunk] = state.stress_index
+            plan.soil_health_score[t, chunk] = state.soil_health_score
+
+    def _action_costs(self, moisture, t, et0, rain, fc, wp, kc, next_values):
+        """
+        Cost of every useful action from every state in moisture (fields, states).
+
+        Returns:
+            (costs shaped (fields, states, actions), the actions evaluated)
+        """
+        net = (rain[t] - et0[t] * kc)[:, np.newaxis]
+
+        # Prune actions that overflow field capacity even from the driest state
+        needed = float(np.max(fc[:, np.newaxis] - (moisture + net)))
+        n_actions = min(len(self.actions), int(np.searchsorted(self.actions, needed)) + 1)
+        actions = self.actions[:n_actions]
+
+        before = moisture[:, :, np.newaxis]
+        after = before + (rain[t][:, np.newaxis, np.newaxis] + actions)
+        after = after - (et0[t] * kc)[:, np.newaxis, np.newaxis]
+        after = np.maximum(0.0, np.minimum(after, fc[:, np.newaxis, np.newaxis]))
+
+        stress = calculate_stress(after, fc[:, np.newaxis, np.newaxis], wp[:, np.newaxis, np.newaxis])
+        cost = actions + self.stress_penalty_mm * np.maximum(stress - self.max_stress, 0.0)
+
+        # Water beyond what fills the profile is wasted: once an action reaches
+        # field capacity, larger ones are dominated
+        overflow = np.zeros(after.shape, dtype=bool)
+        overflow[..., 1:] = (before + net[:, :, np.newaxis] + actions[:-1]) >= fc[:, np.newaxis, np.newaxis]
+        cost = np.where(overflow, np.inf, cost)
+
+        return cost + _interpolate(next_values, after, fc), actions
+
+
+def _interpolate(values: np.ndarray, moisture: np.ndarray, fc: np.ndarray) -> np.ndarray:
+    """Linear interpolation of values (fields, grid) at moisture (fields, ...)."""
+    fields, grid_points = values.shape
+    position = moisture / fc.reshape((fields,) + (1,) * (moisture.ndim - 1)) * (grid_points - 1)
+    lower = np.clip(np.floor(position).astype(np.int64), 0, grid_points - 2)
+    weight = position - lower
+    flat = lower.reshape(fields, -1)
+    v_lower = np.take_along_axis(values, flat, axis=1).reshape(moisture.shape)
+    v_upper = np.take_along_axis(values, flat + 1, axis=1).reshape(moisture.shape)
+    return v_lower * (1.0 - weight) + v_upper * weight
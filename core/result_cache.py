@@ -0,0 +1,95 @@
+# core/result_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.completed = False
+
+
+class ResultCache:
+    """
+    Thread-safe in-process cache with LRU and TTL eviction and single-flight
+    computation.
+
+    When several threads ask for the same missing key at once, only the first
+    runs the computation; the others wait for and share its result. Errors
+    (Exception) are passed to every waiter and not cached. A leader stopped by
+    anything else (a Streamlit rerun/stop, KeyboardInterrupt) abandons the
+    computation instead, and one of the waiters takes it over.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl_seconds: float = 600.0):
+        """
+        Args:
+            maxsize: number of entries kept; the least recently used is dropped first
+            ttl_seconds: age after which an entry is recomputed
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+
+                self.misses += 1
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                return self._lead(key, flight, compute)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.completed:
+                return flight.result
+            # The leader was interrupted; try again (possibly as the new leader)
+
+    def _lead(self, key: Hashable, flight: _Flight, compute: Callable[[], Any]) -> Any:
+        try:
+            flight.result = compute()
+        except Exception as error:
+            flight.error = error
+            raise
+        else:
+            flight.completed = True
+            self._store(key, flight.result)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
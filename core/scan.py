@@ -0,0 +1,75 @@
+# core/scan.py
+from functools import lru_cache
+
+import numpy as np
+
+# Days handled per block; bounds the temporaries of a scan to (BLOCK_DAYS, *shape)
+BLOCK_DAYS = 256
+
+
+def clamped_cumsum(increments, initial, upper, lower=0.0, block_days: int = BLOCK_DAYS):
+    """
+    Running sum x_t = clamp(x_t-1 + increments_t, lower, upper) along axis 0.
+
+    Each day is the map x -> clamp(x + a, lo, hi), and these maps stay of that
+    form under composition, so all prefixes of a block are found with a
+    parallel (Hillis-Steele) scan in log2(block_days) vectorized passes.
+    Results equal the day-by-day loop up to floating point rounding of the sums.
+
+    Yields:
+        the values of each block of days, shaped (block, *shape)
+    """
+    increments = np.asarray(increments, dtype=np.float64)
+    x = np.asarray(initial, dtype=np.float64)
+    for start in range(0, len(increments), block_days):
+        shift = increments[start:start + block_days]
+        shape = (len(shift),) + np.broadcast_shapes(shift.shape[1:], x.shape, np.shape(upper), np.shape(lower))
+        shift = np.broadcast_to(shift, shape).copy()
+        low = np.broadcast_to(np.asarray(lower, dtype=np.float64), shape).copy()
+        high = np.broadcast_to(np.asarray(upper, dtype=np.float64), shape).copy()
+
+        offset = 1
+        while offset < len(shift):
+            # Compose day t's map with the map covering the offset days before it
+            late_shift, late_low, late_high = shift[offset:], low[offset:], high[offset:]
+            new_low = np.clip(low[:-offset] + late_shift, late_low, late_high)
+            new_high = np.clip(high[:-offset] + late_shift, late_low, late_high)
+            shift[offset:] = shift[:-offset] + late_shift
+            low[offset:] = new_low
+            high[offset:] = new_high
+            offset *= 2
+
+        values = np.minimum(np.maximum(x + shift, low), high)
+        x = values[-1]
+        yield values
+
+
+def exponential_filter(values, initial, decay: float, weight: float):
+    """
+    Linear recurrence m_t = decay * m_t-1 + weight * values_t along axis 0.
+
+    Unrolled, m_t = decay^t * (m_0 + weight * sum_k<=t values_k / decay^k), one
+    cumulative sum. decay^-t overflows for long stretches, so callers pass
+    blocks of at most BLOCK_DAYS days.
+
+    Returns:
+        m for every day, shaped like values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    growth, decayed = _filter_weights(len(values), decay)
+    shape = (len(values),) + (1,) * (values.ndim - 1)
+    scaled = np.cumsum(values * (weight * growth).reshape(shape), axis=0)
+    scaled += np.asarray(initial, dtype=np.float64)
+    scaled *= decayed.reshape(shape)
+    return scaled
+
+
+@lru_cache(maxsize=8)
+def _filter_weights(days: int, decay: float):
+    """decay^-t and decay^t for t = 1..days."""
+    power = np.arange(1, days + 1, dtype=np.float64)
+    growth = decay ** -power
+    decayed = decay ** power
+    growth.flags.writeable = False
+    decayed.flags.writeable = False
+    return growth, decayed
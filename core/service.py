@@ -0,0 +1,417 @@
+# core/service.py
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, calculate_stress
+from core.metrics import METRICS
+from domain.soil import CROP_TYPES, SOIL_TYPES
+
+# Requests arriving within this window are evaluated as one batch
+DEFAULT_MAX_DELAY_S = 0.002
+DEFAULT_MAX_BATCH = 4096
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ServiceError(Exception):
+    """A request the service rejects; status is the HTTP status returned."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FieldRegistry:
+    """
+    Twin state of every registered field, kept warm as growable arrays (one
+    slot per field) so that any subset can be gathered into a FleetSimulator,
+    stepped and scattered back in a few vectorized operations.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.index: Dict[str, int] = {}
+        self.size = 0
+        self._arrays = {
+            "field_capacity_mm": np.empty(capacity),
+            "wilting_point_mm": np.empty(capacity),
+            "kc": np.empty(capacity),
+            "soil_moisture_mm": np.empty(capacity),
+            "memory_factor": np.empty(capacity),
+            "day": np.empty(capacity, dtype=np.int64),
+        }
+
+    def register(self, field_id: str, soil: str, crop: str, initial_moisture_mm: float) -> int:
+        """Add a field, or reset an existing one to a new profile and moisture."""
+        slot = self.index.get(field_id)
+        if slot is None:
+            slot = self.size
+            if slot == len(self._arrays["day"]):
+                self._arrays = {
+                    name: np.concatenate([values, np.empty_like(values)]) for name, values in self._arrays.items()
+                }
+            self.index[field_id] = slot
+            self.size += 1
+        profile = SOIL_TYPES[soil]
+        values = self._arrays
+        values["field_capacity_mm"][slot] = profile.field_capacity_mm
+        values["wilting_point_mm"][slot] = profile.wilting_point_mm
+        values["kc"][slot] = CROP_TYPES[crop].kc
+        values["soil_moisture_mm"][slot] = min(max(initial_moisture_mm, 0.0), profile.field_capacity_mm)
+        values["memory_factor"][slot] = 0.0
+        values["day"][slot] = 0
+        return slot
+
+    def slots(self, field_ids: List[str]) -> np.ndarray:
+        return np.fromiter((self.index[field_id] for field_id in field_ids), dtype=np.int64, count=len(field_ids))
+
+    def gather(self, slots: np.ndarray) -> FleetSimulator:
+        """FleetSimulator over copies of the given fields' state."""
+        return FleetSimulator.from_state(**{name: values[slots] for name, values in self._arrays.items()})
+
+    def scatter(self, slots: np.ndarray, fleet: FleetSimulator):
+        """Write a gathered fleet's state back; slots must be unique."""
+        self._arrays["soil_moisture_mm"][slots] = fleet.soil_moisture_mm
+        self._arrays["memory_factor"][slots] = fleet.memory_factor
+        self._arrays["day"][slots] = fleet.day
+
+    def set_moisture(self, slots: np.ndarray, soil_moisture_mm: np.ndarray):
+        """Replace the modelled moisture with readings (clamped to [0, FC]); the last reading of a slot wins."""
+        self._arrays["soil_moisture_mm"][slots] = np.clip(
+            soil_moisture_mm, 0.0, self._arrays["field_capacity_mm"][slots]
+        )
+
+    def state(self, field_id: str) -> dict:
+        slot = self.index[field_id]
+        return {name: values[slot].item() for name, values in self._arrays.items()}
+
+
+class DecisionService:
+    """
+    Local HTTP service answering "how much should I irrigate now" for
+    registered fields, one asyncio event loop, no dependencies.
+
+    decide and simulate requests are not evaluated one by one: they wait up
+    to max_delay_s, then everything that arrived meanwhile is gathered into
+    one FleetSimulator/evaluate_batch call. Per-request latency (parsed
+    request to ready response) is kept for the last latency_window requests
+    and reported as p50/p99 by GET /stats.
+
+    Endpoints (JSON bodies):
+        PUT  /fields/<id>   {"soil", "crop", "initial_moisture_mm"}
+        GET  /fields/<id>   current twin state
+        POST /decide        {"field_id", "soil_moisture_mm"?} -> irrigation for now
+        POST /simulate      {"field_id", "et0_mm", "rainfall_mm"?, "irrigation_mm"?}
+                            advance one day; irrigation is decided when omitted
+        GET  /stats         latency quantiles and batch sizes
+        GET  /metrics       Prometheus text of core.metrics.METRICS
+        GET  /health
+    """
+
+    def __init__(
+        self,
+        engine: Optional[DecisionEngine] = None,
+        max_delay_s: float = DEFAULT_MAX_DELAY_S,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        latency_window: int = 10000
+    ):
+        self.engine = engine or DecisionEngine()
+        self.fields = FieldRegistry()
+        self.max_delay_s = max_delay_s
+        self.max_batch = max_batch
+        self.latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self._pending: List[Tuple[str, dict, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    # ----- batching -----
+
+    async def submit(self, kind: str, request: dict) -> dict:
+        """Queue a validated decide/simulate request and wait for its batch."""
+        if self._batcher is None:
+            self._wakeup = asyncio.Event()
+            self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((kind, request, future))
+        self._wakeup.set()
+        return await future
+
+    async def _batch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            # Let concurrent requests join the batch
+            await asyncio.sleep(self.max_delay_s)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if not self._pending:
+                self._wakeup.clear()
+            try:
+                self.process(batch)
+            except Exception as error:  # never leave a caller waiting
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def process(self, batch: List[Tuple[str, dict, asyncio.Future]]):
+        """
+        Evaluate one batch: decide requests, then simulate requests, each in
+        rounds with at most one request per field, so a field asked about
+        twice in one batch is handled twice, in arrival order.
+        """
+        self.batches += 1
+        METRICS.count("service_batches")
+        with METRICS.timer("service_batch"):
+            for kind, evaluate in (("decide", self._decide), ("simulate", self._simulate)):
+                for this_round in _rounds([item for item in batch if item[0] == kind]):
+                    evaluate([request for _, request, _ in this_round], [future for _, _, future in this_round])
+
+    def _decide(self, requests: List[dict], futures: List[asyncio.Future]):
+        slots = self.fields.slots([request["field_id"] for request in requests])
+        readings = [(slot, request["soil_moisture_mm"]) for slot, request in zip(slots.tolist(), requests)
+                    if request.get("soil_moisture_mm") is not None]
+        if readings:
+            reading_slots, values = zip(*readings)
+            self.fields.set_moisture(np.array(reading_slots), np.array(values, dtype=np.float64))
+
+        fleet = self.fields.gather(slots)
+        stress = calculate_stress(fleet.soil_moisture_mm, fleet.field_capacity_mm, fleet.wilting_point_mm)
+        decisions = self.engine.evaluate_batch(stress, fleet.soil_moisture_mm, fleet.field_capacity_mm)
+        moisture = fleet.soil_moisture_mm.tolist()
+        for i, (request, future) in enumerate(zip(requests, futures)):
+            _resolve(future, {
+                "field_id": request["field_id"],
+                "irrigation_mm": float(decisions.irrigation_mm[i]),
+                "reason": decisions.reason(i),
+                "stress_index": float(decisions.stress_index[i]),
+                "soil_moisture_mm": moisture[i],
+            })
+
+    def _simulate(self, requests: List[dict], futures: List[asyncio.Future]):
+        slots = self.fields.slots([request["field_id"] for request in requests])
+        fleet = self.fields.gather(slots)
+        stress = calculate_stress(fleet.soil_moisture_mm, fleet.field_capacity_mm, fleet.wilting_point_mm)
+        decisions = self.engine.evaluate_batch(stress, fleet.soil_moisture_mm, fleet.field_capacity_mm)
+        given = np.array([request.get("irrigation_mm", np.nan) for request in requests], dtype=np.float64)
+        irrigation_mm = np.where(np.isnan(given), decisions.irrigation_mm, given)
+
+        state = fleet.step(
+            np.array([request["et0_mm"] for request in requests], dtype=np.float64),
+            np.array([request.get("rainfall_mm", 0.0) for request in requests], dtype=np.float64),
+            irrigation_mm
+        )
+        self.fields.scatter(slots, fleet)
+        for i, (request, future) in enumerate(zip(requests, futures)):
+            _resolve(future, {
+                "field_id": request["field_id"],
+                "day": int(state.day[i]),
+                "irrigation_mm": float(irrigation_mm[i]),
+                "soil_moisture_mm": float(state.soil_moisture_mm[i]),
+                "stress_index": float(state.stress_index[i]),
+                "memory_factor": float(state.memory_factor[i]),
+                "soil_health_score": float(state.soil_health_score[i]),
+            })
+
+    # ----- HTTP -----
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """Route one request; returns (status, JSON-able payload or str for text)."""
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if parts[0] in ("decide", "simulate") and len(parts) == 1:
+            if method != "POST":
+                raise ServiceError(405, f"Use POST for /{parts[0]}")
+            started = time.perf_counter()
+            request = self._validate(parts[0], _json(body))
+            response = await self.submit(parts[0], request)
+            latency = time.perf_counter() - started
+            self.latencies.append(latency)
+            self.requests += 1
+            METRICS.observe(f"service_{parts[0]}", latency)
+            return 200, response
+        if parts[0] == "fields" and len(parts) == 2:
+            if method == "PUT":
+                request = _json(body)
+                soil, crop = request.get("soil"), request.get("crop")
+                if soil not in SOIL_TYPES or crop not in CROP_TYPES:
+                    raise ServiceError(400, f"soil must be one of {sorted(SOIL_TYPES)}, crop one of {sorted(CROP_TYPES)}")
+                initial = _number(request, "initial_moisture_mm", 0.6 * SOIL_TYPES[soil].field_capacity_mm)
+                self.fields.register(parts[1], soil, crop, initial)
+                return 200, {"field_id": parts[1], **self.fields.state(parts[1])}
+            if method == "GET":
+                if parts[1] not in self.fields.index:
+                    raise ServiceError(404, f"Unknown field {parts[1]!r}")
+                return 200, {"field_id": parts[1], **self.fields.state(parts[1])}
+            raise ServiceError(405, "Use PUT or GET for /fields/<id>")
+        if method == "GET" and parts == ["stats"]:
+            return 200, self.stats()
+        if method == "GET" and parts == ["metrics"]:
+            return 200, METRICS.to_prometheus()
+        if method == "GET" and parts == ["health"]:
+            return 200, {"status": "ok", "fields": self.fields.size}
+        raise ServiceError(404, f"No route for {method} {path}")
+
+    def _validate(self, kind: str, request: dict) -> dict:
+        field_id = request.get("field_id")
+        if field_id not in self.fields.index:
+            raise ServiceError(404, f"Unknown field {field_id!r}; register it with PUT /fields/<id>")
+        if kind == "decide":
+            return {"field_id": field_id, "soil_moisture_mm": _number(request, "soil_moisture_mm", None)}
+        validated = {
+            "field_id": field_id,
+            "et0_mm": _number(request, "et0_mm"),
+            "rainfall_mm": _number(request, "rainfall_mm", 0.0),
+        }
+        irrigation_mm = _number(request, "irrigation_mm", None)
+        if irrigation_mm is not None:
+            validated["irrigation_mm"] = irrigation_mm
+        return validated
+
+    def stats(self) -> dict:
+        latencies = np.array(self.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if latencies.size else (None, None)
+        return {
+            "fields": self.fields.size,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else None,
+            "latency_window": int(latencies.size),
+            "p50_ms": p50,
+            "p99_ms": p99,
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                try:
+                    status, payload = await self.handle(method, path, body)
+                except ServiceError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": repr(error)}
+
+                if isinstance(payload, str):
+                    content, content_type = payload.encode(), "text/plain; version=0.0.4"
+                else:
+                    content, content_type = json.dumps(payload).encode(), "application/json"
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(content)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        """Stop the batcher; requests still queued are cancelled."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending = []
+
+
+def _rounds(items: List[Tuple[str, dict, asyncio.Future]]):
+    """Split requests into rounds in which every field_id appears at most once."""
+    while items:
+        seen, this_round, later = set(), [], []
+        for item in items:
+            (later if item[1]["field_id"] in seen else this_round).append(item)
+            seen.add(item[1]["field_id"])
+        yield this_round
+        items = later
+
+
+def _resolve(future: asyncio.Future, result: dict):
+    if not future.done():
+        future.set_result(result)
+
+
+def _json(body: bytes) -> dict:
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError as error:
+        raise ServiceError(400, f"Invalid JSON: {error}")
+    if not isinstance(request, dict):
+        raise ServiceError(400, "Expected a JSON object")
+    return request
+
+
+_REQUIRED = object()
+
+
+def _number(request: dict, name: str, default=_REQUIRED) -> Optional[float]:
+    value = request.get(name)
+    if value is None:
+        if default is _REQUIRED:
+            raise ServiceError(400, f"Missing {name!r}")
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"{name!r} must be a number")
+    # json.loads and float() both accept NaN/Infinity, which would stick in the field's state
+    if not math.isfinite(number):
+        raise ServiceError(400, f"{name!r} must be a finite number")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SoilTwin local decision service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY_S * 1e3,
+                        help="how long a request waits for others to batch with")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="requests per batch at most")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        service = DecisionService(max_delay_s=args.max_delay_ms / 1e3, max_batch=args.max_batch)
+        server = await service.start(args.host, args.port)
+        print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,19 @@
 # core/simulator.py
-from domain.models import SoilState
-from domain.soil import SoilProfile, CropProfile
+from typing import Callable, Optional, Tuple, Union
+
+import numpy as np
+
+from core.fleet import FleetSimulator, progress_interval
+from core.layered import LayeredFleetSimulator
+from core.metrics import METRICS
+from domain.models import SoilState, SoilStateBatch
+from domain.soil import SoilProfile, LayeredSoilProfile, CropProfile
 
 
 class SoilTwinSimulator:
     def __init__(
         self,
-        soil: SoilProfile,
+        soil: Union[SoilProfile, LayeredSoilProfile],
         crop: CropProfile,
         initial_moisture_mm: float
     ):
@@ -16,6 +23,11 @@ class SoilTwinSimulator:
         self.memory_factor = 0.0
         self.day = 0
 
+        # Layered profiles keep their per-layer water in a one-field LayeredFleetSimulator
+        self.layers = None
+        if isinstance(soil, LayeredSoilProfile):
+            self.layers = LayeredFleetSimulator.from_profiles([soil], [crop], [initial_moisture_mm])
+
     def step(
         self,
         et0_mm: float,
@@ -25,15 +37,18 @@ class SoilTwinSimulator:
         self.day += 1
 
         # 1. Water balance
-        evapotranspiration = et0_mm * self.crop.kc
-        self.soil_moisture_mm += rainfall_mm + irrigation_mm
-        self.soil_moisture_mm -= evapotranspiration
+        if self.layers is not None:
+            self.soil_moisture_mm = float(self.layers.update_water(et0_mm, rainfall_mm, irrigation_mm)[0])
+        else:
+            evapotranspiration = et0_mm * self.crop.kc
+            self.soil_moisture_mm += rainfall_mm + irrigation_mm
+            self.soil_moisture_mm -= evapotranspiration
 
-        # Clamp
-        self.soil_moisture_mm = max(
-            0.0,
-            min(self.soil_moisture_mm, self.soil.field_capacity_mm)
-        )
+            # Clamp
+            self.soil_moisture_mm = max(
+                0.0,
+                min(self.soil_moisture_mm, self.soil.field_capacity_mm)
+            )
 
         # 2. Stress Index
         stress_index = self._calculate_stress()
@@ -54,6 +69,112 @@ class SoilTwinSimulator:
             memory_factor=self.memory_factor,
             soil_health_score=soil_health_score
         )
+
+    def run_closed_loop(
+        self,
+        engine,
+        et0_series,
+        rain_series,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[SoilStateBatch, np.ndarray]:
+        """
+        Advance the twin through a horizon, letting a DecisionEngine pick each
+        day's irrigation from the state before that day's step.
+
+        The single-field counterpart of core.fleet.run_closed_loop: plain float
+        steps beat one-element arrays, and the whole trajectory comes back at once.
+
+        Args:
+            engine: DecisionEngine used through evaluate()
+            et0_series: daily reference ET0 in mm (Kc is applied by step())
+            rain_series: daily rainfall in mm
+            progress: optional progress(day, days) callback, called at most
+                PROGRESS_UPDATES times per run whatever the horizon
+
+        Returns:
+            (SoilStateBatch with one state per day, irrigation applied per day in mm)
+        """
+        et0_series = np.asarray(et0_series, dtype=np.float64).tolist()
+        rain_series = np.asarray(rain_series, dtype=np.float64).tolist()
+        days = len(et0_series)
+        report_every = progress_interval(days) if progress is not None else 0
+        field_capacity_mm = self.soil.field_capacity_mm
+
+        METRICS.count("simulated_days", days)
+        with METRICS.timer("simulation"):
+            states = []
+            irrigation = []
+            for d in range(days):
+                decision = engine.evaluate(self._calculate_stress(), self.soil_moisture_mm, field_capacity_mm)
+                states.append(self.step(et0_series[d], rain_series[d], decision.irrigation_mm))
+                irrigation.append(decision.irrigation_mm)
+                if report_every and ((d + 1) % report_every == 0 or d + 1 == days):
+                    progress(d + 1, days)
+        return SoilStateBatch.from_states(states), np.array(irrigation)
+
+    def fast_forward(
+        self,
+        et0_series,
+        rain_series,
+        irrigation_mm=0.0,
+        return_trajectory: bool = True
+    ) -> Union[SoilStateBatch, SoilState]:
+        """
+        Advance the twin through a stretch of days without per-day decisions.
+
+        Equivalent to calling step() for every day, but computed with array
+        scans (see FleetSimulator.fast_forward), so years take milliseconds.
+        Layered profiles are stepped day by day.
+
+        Args:
+            et0_series: daily reference ET0 in mm
+            rain_series: daily rainfall in mm
+            irrigation_mm: fixed daily irrigation, scalar or one value per day
+            return_trajectory: return every day's state instead of only the last
+
+        Returns:
+            SoilStateBatch with one state per day, or the final SoilState
+        """
+        et0_series = np.asarray(et0_series, dtype=np.float64)
+        rain_series = np.broadcast_to(np.asarray(rain_series, dtype=np.float64), et0_series.shape)
+        irrigation_series = np.broadcast_to(np.asarray(irrigation_mm, dtype=np.float64), et0_series.shape)
+
+        if self.layers is not None:
+            METRICS.count("simulated_days", len(et0_series))
+            with METRICS.timer("simulation"):
+                states = [
+                    self.step(et0, rain, irrigation)
+                    for et0, rain, irrigation in zip(
+                        et0_series.tolist(), rain_series.tolist(), irrigation_series.tolist()
+                    )
+                ]
+            if return_trajectory:
+                return SoilStateBatch.from_states(states)
+            return states[-1] if states else None
+
+        fleet = FleetSimulator.from_state(
+            field_capacity_mm=np.asarray(self.soil.field_capacity_mm, dtype=np.float64),
+            wilting_point_mm=np.asarray(self.soil.wilting_point_mm, dtype=np.float64),
+            kc=np.asarray(self.crop.kc, dtype=np.float64),
+            soil_moisture_mm=np.asarray(self.soil_moisture_mm, dtype=np.float64),
+            memory_factor=np.asarray(self.memory_factor, dtype=np.float64),
+            day=np.asarray(self.day, dtype=np.int64)
+        )
+        state = fleet.fast_forward(et0_series, rain_series, irrigation_series, return_trajectory)
+        self.soil_moisture_mm = float(fleet.soil_moisture_mm)
+        self.memory_factor = float(fleet.memory_factor)
+        self.day = int(fleet.day)
+
+        if return_trajectory:
+            return SoilStateBatch.from_fleet_state(state)
+        return SoilState(
+            day=self.day,
+            soil_moisture_mm=self.soil_moisture_mm,
+            stress_index=float(state.stress_index),
+            memory_factor=self.memory_factor,
+            soil_health_score=float(state.soil_health_score)
+        )
+
 # core/simulator.py (تغییرات)
     def _calculate_stress(self) -> float:
         """
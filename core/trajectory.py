@@ -0,0 +1,152 @@
+# core/trajectory.py
+from typing import Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from domain.models import SoilState, Decision, FleetState
+
+SCHEMA = pa.schema([
+    ("field", pa.int64()),
+    ("day", pa.int64()),
+    ("soil_moisture_mm", pa.float64()),
+    ("stress_index", pa.float64()),
+    ("memory_factor", pa.float64()),
+    ("soil_health_score", pa.float64()),
+    ("irrigation_mm", pa.float64()),
+    ("reason_code", pa.int8()),
+])
+
+# reason_code of rows appended from a Decision, which only carries the text
+REASON_UNKNOWN = -1
+
+
+class TrajectoryWriter:
+    """
+    Columnar sink for simulated days, one row per field and day.
+
+    Rows are copied into fixed-size column buffers; every full buffer becomes
+    one Arrow record batch, which is either kept in memory (path=None, read it
+    with table()) or written to Parquet as one row group. Streaming to Parquet
+    therefore holds at most rows_per_batch rows, however long the run.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        rows_per_batch: int = 65536,
+        compression: str = "snappy",
+        first_field: int = 0
+    ):
+        """
+        Args:
+            path: Parquet file to stream to; None keeps an in-memory Arrow table
+            rows_per_batch: rows per record batch / Parquet row group
+            compression: Parquet compression codec
+            first_field: id of the first field when append() numbers fields itself
+                (a fleet that is one chunk of a larger run)
+        """
+        self.path = path
+        self.first_field = first_field
+        self.rows_per_batch = rows_per_batch
+        self.rows = 0
+        self._batches = []
+        self._writer = pq.ParquetWriter(path, SCHEMA, compression=compression) if path else None
+        self._new_buffers()
+
+    def _new_buffers(self):
+        # Fresh buffers per batch: flushed batches wrap the old ones without copying
+        self._buffers = {
+            field.name: np.empty(self.rows_per_batch, dtype=field.type.to_pandas_dtype())
+            for field in SCHEMA
+        }
+        self._fill = 0
+
+    def append(self, state: FleetState, irrigation_mm, reason_code, field=None):
+        """
+        Append one day of a fleet.
+
+        Args:
+            state: FleetState returned by FleetSimulator.step
+            irrigation_mm: irrigation applied on that day, per field
+            reason_code: decision reason codes, per field (see DecisionBatch)
+            field: field ids (default: first_field + flat index within the fleet)
+        """
+        shape = np.shape(state.soil_moisture_mm) or (1,)
+        size = int(np.prod(shape, dtype=np.int64))
+        columns = {
+            "field": np.arange(self.first_field, self.first_field + size) if field is None else field,
+            "day": state.day,
+            "soil_moisture_mm": state.soil_moisture_mm,
+            "stress_index": state.stress_index,
+            "memory_factor": state.memory_factor,
+            "soil_health_score": state.soil_health_score,
+            "irrigation_mm": irrigation_mm,
+            "reason_code": reason_code,
+        }
+        columns = {name: np.broadcast_to(value, shape).reshape(size) for name, value in columns.items()}
+
+        start = 0
+        while start < size:
+            take = min(size - start, self.rows_per_batch - self._fill)
+            for name, values in columns.items():
+                self._buffers[name][self._fill:self._fill + take] = values[start:start + take]
+            self._fill += take
+            start += take
+            if self._fill == self.rows_per_batch:
+                self.flush()
+
+    def append_state(self, state: SoilState, decision: Decision, field: int = 0, reason_code: int = REASON_UNKNOWN):
+        """Append one day of a single SoilTwinSimulator."""
+        self.append(
+            FleetState(
+                day=state.day,
+                soil_moisture_mm=np.float64(state.soil_moisture_mm),
+                stress_index=state.stress_index,
+                memory_factor=state.memory_factor,
+                soil_health_score=state.soil_health_score,
+            ),
+            decision.irrigation_mm,
+            reason_code,
+            field
+        )
+
+    def flush(self):
+        """Turn buffered rows into a record batch (and a row group when streaming)."""
+        if not self._fill:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._buffers[field.name][:self._fill], type=field.type) for field in SCHEMA],
+            schema=SCHEMA
+        )
+        self.rows += self._fill
+        if self._writer is not None:
+            self._writer.write_batch(batch)
+        else:
+            self._batches.append(batch)
+        self._new_buffers()
+
+    def table(self) -> pa.Table:
+        """All rows written so far (in-memory mode only)."""
+        if self.path is not None:
+            raise ValueError("Trajectory is streamed to Parquet; read it with read_trajectory()")
+        self.flush()
+        return pa.Table.from_batches(self._batches, schema=SCHEMA)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trajectory(path: str, columns=None) -> pa.Table:
+    """Read a Parquet trajectory; the file is memory-mapped rather than copied into Python objects."""
+    return pq.read_table(path, columns=columns, memory_map=True)
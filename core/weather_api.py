@@ -1,7 +1,105 @@
 from datetime import datetime, timedelta
 import requests
 import pandas as pd
-import math
+from typing import Optional, Tuple, List
+
+import numpy as np
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.et0 import compute_et0, get_et0_method, to_array
+from core.metrics import METRICS
+from core.weather_cache import WeatherCache
+
+DAILY_VARIABLES = "temperature_2m_max,temperature_2m_min,precipitation_sum"
+DEFAULT_ET0_METHOD = "hargreaves"
+DEFAULT_TIMEOUT = 10.0
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+_default_session = None
+
+
+def make_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    HTTP session with a pooled adapter that retries connection errors and
+    429/5xx responses with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def default_session() -> requests.Session:
+    """Process-wide session shared by WeatherAPI instances that are not given one."""
+    global _default_session
+    if _default_session is None:
+        _default_session = make_session()
+    return _default_session
+
+
+def forecast_dates(days: int) -> Tuple[str, str]:
+    start_date = datetime.now().strftime("%Y-%m-%d")
+    end_date = (datetime.now() + timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    return start_date, end_date
+
+
+def daily_variables(et0_method: str = DEFAULT_ET0_METHOD) -> str:
+    """Open-Meteo daily variables needed for rainfall and the given ET0 method."""
+    variables = DAILY_VARIABLES.split(",")
+    for variable in get_et0_method(et0_method).variables:
+        if variable not in variables:
+            variables.append(variable)
+    return ",".join(variables)
+
+
+def forecast_params(latitude, longitude, start_date: str, end_date: str, variables: str = DAILY_VARIABLES) -> dict:
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": variables,
+        "timezone": "auto",
+        "current_weather": True  # اضافه کردن وضعیت فعلی
+    }
+
+
+def archive_params(latitude, longitude, start_date: str, end_date: str, variables: str = DAILY_VARIABLES) -> dict:
+    """Params for the archive endpoint, which has no current weather."""
+    params = forecast_params(latitude, longitude, start_date, end_date, variables)
+    del params["current_weather"]
+    return params
+
+
+def parse_daily(
+    daily: dict,
+    latitude: float,
+    et0_method: str = DEFAULT_ET0_METHOD,
+    elevation: float = 0.0
+) -> Tuple[List[float], List[float]]:
+    """
+    Turn the "daily" block of an Open-Meteo response into ET0 and rainfall lists.
+
+    Missing temperature (and other ET0 input) days are interpolated from their
+    neighbours; missing precipitation counts as no rain.
+    """
+    if not daily.get("time"):
+        raise ValueError("No weather data returned from API")
+
+    et0 = compute_et0(et0_method, daily, latitude, elevation)
+    rainfall = np.nan_to_num(to_array(daily.get("precipitation_sum", [])), nan=0.0)
+
+    return np.round(et0, 2).tolist(), np.round(rainfall, 1).tolist()
+
 
 class WeatherAPI:
     """
@@ -11,59 +109,83 @@ class WeatherAPI:
 
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
 
-    def __init__(self, latitude: float, longitude: float, days: int = 10):
+    def __init__(
+        self,
+        latitude: float,
+        longitude: float,
+        days: int = 10,
+        cache: Optional[WeatherCache] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        et0_method: str = DEFAULT_ET0_METHOD
+    ):
         self.latitude = latitude
         self.longitude = longitude
         self.days = days
+        self.cache = cache
+        self.session = session
+        self.timeout = timeout
+        self.et0_method = et0_method
         self.daily_data = None
         self.current_weather_data = None
 
     def fetch(self):
-        start_date = datetime.now().strftime("%Y-%m-%d")
-        end_date = (datetime.now() + timedelta(days=self.days - 1)).strftime("%Y-%m-%d")
-
-        params = {
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "start_date": start_date,
-            "end_date": end_date,
-            "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
-            "timezone": "auto",
-            "current_weather": True  # اضافه کردن وضعیت فعلی
-        }
-
-        response = requests.get(self.BASE_URL, params=params)
-        if response.status_code != 200:
-            raise ValueError(f"Failed to fetch weather data: {response.status_code}, {response.text}")
+        params = self._params()
+        with METRICS.timer("weather_fetch"):
+            json_data = self._load(params)
+            daily = json_data.get("daily", {})
+            self.daily_data = daily
+            self.current_weather_data = json_data.get("current_weather", {})
 
-        json_data = response.json()
-        daily = json_data.get("daily", {})
-        self.daily_data = daily
-        self.current_weather_data = json_data.get("current_weather", {})
+            return parse_daily(daily, self.latitude, self.et0_method, json_data.get("elevation", 0.0))
 
-        dates = daily.get("time", [])
-        tmax_list = daily.get("temperature_2m_max", [])
-        tmin_list = daily.get("temperature_2m_min", [])
-        prcp_list = daily.get("precipitation_sum", [])
+    def dates(self) -> List[str]:
+        """Dates of the days returned by the last fetch()."""
+        return list(self.daily_data.get("time", [])) if self.daily_data else []
 
-        if not dates:
-            raise ValueError("No weather data returned from API")
+    def _params(self) -> dict:
+        start_date, end_date = forecast_dates(self.days)
+        return forecast_params(
+            self.latitude, self.longitude, start_date, end_date, daily_variables(self.et0_method)
+        )
+
+    def _load(self, params: dict) -> dict:
+        """
+        Return the Open-Meteo payload for params, going through the cache if one is set.
+        """
+        if self.cache is None:
+            return self._request(params)
 
-        et0_list = []
-        rainfall_list = []
+        key = self.cache.key(
+            self.latitude, self.longitude, params["start_date"], params["end_date"], params["daily"]
+        )
+        json_data = self.cache.get(key)
+        if json_data is not None:
+            METRICS.count("weather_cache_hits")
+            return json_data
+        METRICS.count("weather_cache_misses")
 
-        for tmax, tmin, prcp in zip(tmax_list, tmin_list, prcp_list):
-            if tmax is None or tmin is None:
-                tmax = 25.0
-                tmin = 15.0
-            tmean = (tmax + tmin) / 2
+        if self.cache.offline:
+            METRICS.count("weather_cache_replays")
+            json_data = self.cache.latest(self.latitude, self.longitude, params["daily"])
+            if json_data is None:
+                raise ValueError(
+                    f"No cached weather data for ({self.latitude}, {self.longitude}) in offline mode"
+                )
+            return json_data
 
-            # Hargreaves ET0 (FAO-56 simplified)
-            et0 = 0.0023 * (tmean + 17.8) * math.sqrt(max(tmax - tmin, 0)) * 0.408 * 136
-            et0_list.append(round(et0, 2))
-            rainfall_list.append(round(prcp if prcp is not None else 0.0, 1))
+        json_data = self._request(params)
+        self.cache.put(key, json_data)
+        return json_data
 
-        return et0_list, rainfall_list
+    def _request(self, params: dict) -> dict:
+        session = self.session or default_session()
+        with METRICS.timer("weather_http"):
+            response = session.get(self.BASE_URL, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            METRICS.count("weather_http_errors")
+            raise ValueError(f"Failed to fetch weather data: {response.status_code}, {response.text}")
+        return response.json()
 
     def current_temperature(self):
         """
@@ -102,3 +224,4 @@ class WeatherAPI:
             }
             return code_map.get(weather_code, "Unknown")
         return "Unknown"
+
@@ -0,0 +1,180 @@
+# core/weather_bulk.py
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from core.weather_api import (
+    DEFAULT_ET0_METHOD,
+    DEFAULT_TIMEOUT,
+    WeatherAPI,
+    daily_variables,
+    forecast_dates,
+    forecast_params,
+    make_session,
+)
+from core.et0 import compute_et0
+from core.weather_cache import WeatherCache
+
+
+@dataclass
+class BulkWeather:
+    """Daily forcing for many locations, shaped (days, locations) for FleetSimulator.step."""
+    dates: List[str]
+    et0_mm: np.ndarray
+    rainfall_mm: np.ndarray
+
+
+class BulkWeatherFetcher:
+    """
+    Fetch Open-Meteo forecasts for many locations at once.
+
+    Coordinates are packed batch_size at a time into a single request (the API
+    accepts comma-separated latitude/longitude lists), batches run on a bounded
+    thread pool over one pooled session, and failed requests are retried with
+    exponential backoff. Locations already in the cache are not requested.
+    """
+
+    BASE_URL = WeatherAPI.BASE_URL
+
+    def __init__(
+        self,
+        days: int = 10,
+        batch_size: int = 50,
+        max_workers: int = 8,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache: Optional[WeatherCache] = None,
+        session: Optional[requests.Session] = None,
+        et0_method: str = DEFAULT_ET0_METHOD,
+        precision: int = 2
+    ):
+        """
+        Args:
+            days: forecast days starting today
+            batch_size: coordinates packed into one request
+            max_workers: concurrent requests in flight
+            timeout: per-request timeout in seconds
+            retries: retries per request on connection errors and 429/5xx
+            backoff_factor: base of the exponential backoff between retries
+            cache: optional WeatherCache shared with WeatherAPI
+            session: optional requests session (default: pooled session sized to max_workers)
+            et0_method: name of a registered ET0 method (see core.et0)
+            precision: decimals locations are rounded to without a cache
+                (with one, the cache's own precision, so keys always match)
+        """
+        self.days = days
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self.et0_method = et0_method
+        self.precision = precision
+        self.variables = daily_variables(et0_method)
+        self.session = session or make_session(
+            pool_size=max_workers, retries=retries, backoff_factor=backoff_factor
+        )
+
+    def fetch(self, locations: Sequence[Tuple[float, float]]) -> BulkWeather:
+        """
+        Args:
+            locations: (latitude, longitude) pairs
+
+        Returns:
+            BulkWeather whose column i belongs to locations[i]
+
+        Locations are rounded as the cache keys them (precision decimals) and
+        each distinct rounded location is looked up and requested once.
+        """
+        precision = self.cache.precision if self.cache is not None else self.precision
+        keys = [(round(float(lat), precision), round(float(lon), precision)) for lat, lon in locations]
+        locations = list(dict.fromkeys(keys))
+        column = {location: i for i, location in enumerate(locations)}
+        start_date, end_date = forecast_dates(self.days)
+        payloads = [None] * len(locations)
+
+        missing = []
+        for i, (lat, lon) in enumerate(locations):
+            payload = self._cached(lat, lon, start_date, end_date)
+            if payload is None:
+                missing.append(i)
+            else:
+                payloads[i] = payload
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                results = pool.map(
+                    lambda batch: self._request([locations[i] for i in batch], start_date, end_date),
+                    batches
+                )
+                for batch, batch_payloads in zip(batches, results):
+                    for i, payload in zip(batch, batch_payloads):
+                        payloads[i] = payload
+                        if self.cache is not None:
+                            lat, lon = locations[i]
+                            self.cache.put(
+                                self.cache.key(lat, lon, start_date, end_date, self.variables),
+                                payload
+                            )
+
+        weather = _assemble(payloads, locations, self.et0_method)
+        index = np.array([column[key] for key in keys], dtype=np.int64)
+        return BulkWeather(
+            dates=weather.dates, et0_mm=weather.et0_mm[:, index], rainfall_mm=weather.rainfall_mm[:, index]
+        )
+
+    def _cached(self, lat: float, lon: float, start_date: str, end_date: str) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        payload = self.cache.get(self.cache.key(lat, lon, start_date, end_date, self.variables))
+        if payload is None and self.cache.offline:
+            payload = self.cache.latest(lat, lon, self.variables)
+            if payload is None:
+                raise ValueError(f"No cached weather data for ({lat}, {lon}) in offline mode")
+        return payload
+
+    def _request(self, batch: List[Tuple[float, float]], start_date: str, end_date: str) -> List[dict]:
+        params = forecast_params(
+            ",".join(f"{lat:.4f}" for lat, _ in batch),
+            ",".join(f"{lon:.4f}" for _, lon in batch),
+            start_date,
+            end_date,
+            self.variables
+        )
+        response = self.session.get(self.BASE_URL, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to fetch weather data: {response.status_code}, {response.text}")
+
+        json_data = response.json()
+        # A single location comes back as an object, several as a list
+        if isinstance(json_data, dict):
+            json_data = [json_data]
+        if len(json_data) != len(batch):
+            raise ValueError(f"Expected {len(batch)} locations in response, got {len(json_data)}")
+        return json_data
+
+
+def _assemble(payloads: List[dict], locations: List[Tuple[float, float]], et0_method: str) -> BulkWeather:
+    dailies = [payload.get("daily", {}) for payload in payloads]
+    n_days = max((len(daily.get("time", [])) for daily in dailies), default=0)
+    if n_days == 0:
+        raise ValueError("No weather data returned from API")
+
+    dates = next(daily["time"] for daily in dailies if len(daily.get("time", [])) == n_days)
+    block = {"time": dates}
+    for variable in set().union(*(daily.keys() for daily in dailies)) - {"time"}:
+        values = np.full((n_days, len(dailies)), np.nan)
+        for i, daily in enumerate(dailies):
+            column = np.array(daily.get(variable, []), dtype=np.float64)
+            values[:len(column), i] = column
+        block[variable] = values
+
+    latitude = np.array([lat for lat, _ in locations])
+    elevation = np.array([payload.get("elevation", 0.0) for payload in payloads], dtype=np.float64)
+    et0_mm = compute_et0(et0_method, block, latitude, elevation)
+    rainfall_mm = np.nan_to_num(block.get("precipitation_sum", np.zeros((n_days, len(dailies)))), nan=0.0)
+    return BulkWeather(dates=list(dates), et0_mm=np.round(et0_mm, 2), rainfall_mm=np.round(rainfall_mm, 1))
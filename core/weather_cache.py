@@ -0,0 +1,144 @@
+# core/weather_cache.py
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "soil_twin", "weather")
+
+
+class WeatherCache:
+    """
+    Persistent on-disk cache for Open-Meteo responses.
+
+    Entries are JSON files keyed by rounded latitude/longitude, date range and
+    requested variable set. A file's modification time is when it was fetched
+    and its access time when it was last used, so expiry (TTL) and size-based
+    eviction (least recently used first) need no separate index; reading an
+    entry never extends its TTL. In offline mode the network is never touched:
+    exact hits are served regardless of age, and otherwise the most recent
+    response for the same location and variables is replayed.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl_seconds: float = 3600.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        offline: bool = False,
+        precision: int = 2
+    ):
+        """
+        Args:
+            directory: cache directory (default: $SOILTWIN_CACHE_DIR or ~/.cache/soil_twin/weather)
+            ttl_seconds: age after which an entry is refetched when online
+            max_bytes: total size above which least recently used entries are evicted
+            offline: serve only from the cache, never from the network
+            precision: decimals kept when rounding latitude/longitude for the key
+        """
+        self.directory = directory or os.environ.get("SOILTWIN_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.precision = precision
+        os.makedirs(self.directory, exist_ok=True)
+
+    def location_key(self, latitude: float, longitude: float, variables: str) -> str:
+        lat = f"{round(latitude, self.precision):.{self.precision}f}"
+        lon = f"{round(longitude, self.precision):.{self.precision}f}"
+        variables_hash = hashlib.sha1(",".join(sorted(variables.split(","))).encode()).hexdigest()[:12]
+        return f"{lat}_{lon}_{variables_hash}"
+
+    def key(self, latitude: float, longitude: float, start_date: str, end_date: str, variables: str) -> str:
+        return f"{self.location_key(latitude, longitude, variables)}__{start_date}_{end_date}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached payload for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+        if not self.offline and age > self.ttl_seconds:
+            return None
+        return self._read(path)
+
+    def latest(self, latitude: float, longitude: float, variables: str) -> Optional[dict]:
+        """Return the most recently stored payload for a location and variable set."""
+        prefix = self.location_key(latitude, longitude, variables) + "__"
+        candidates = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(".json")
+        ]
+        for path in sorted(candidates, key=_mtime, reverse=True):
+            payload = self._read(path)
+            if payload is not None:
+                return payload
+        return None
+
+    def put(self, key: str, payload: dict):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                _remove(os.path.join(self.directory, name))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Mark use in the access time only, so eviction is least-recently-used
+        # while the modification time (the TTL) stays the fetch time
+        try:
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+        except OSError:
+            pass
+        return payload
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
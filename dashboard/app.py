@@ -1,20 +1,21 @@
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
 import pandas as pd
 import altair as alt
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
-from geopy.geocoders import Nominatim
-from core.simulator import SoilTwinSimulator
-from core.decision_engine import DecisionEngine
-from domain.soil import SoilProfile, CropProfile
-from core.weather_api import WeatherAPI
+from core.metrics import METRICS
+from dashboard.charts import (
+    LONG_HORIZON_DAYS, bucket_frame, decimate_frame, monthly_summary, window_frame
+)
+from dashboard.compute import SOIL_TYPES, CROP_TYPES, REVERSE_GEOCODER, run_history_simulation, run_simulation
 
 # ===== PAGE CONFIG =====
 st.set_page_config(
@@ -24,6 +25,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Stage timings are collected server-wide with SOILTWIN_METRICS=1; ?debug=1 shows
+# them in this session only (the registry is shared by every session of the process)
+debug_panel = st.query_params.get("debug") == "1"
+rerun_started = time.perf_counter()
+
 # ===== MODERN MINIMAL CSS =====
 st.markdown("""
 <style>
@@ -250,21 +256,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ===== DEFAULT PROFILES =====
-SOIL_TYPES = {
-    "Loam": SoilProfile(name="Loam", field_capacity_mm=150.0, wilting_point_mm=60.0),
-    "Clay": SoilProfile(name="Clay", field_capacity_mm=200.0, wilting_point_mm=80.0),
-    "Sand": SoilProfile(name="Sand", field_capacity_mm=100.0, wilting_point_mm=30.0),
-}
-
-CROP_TYPES = {
-    "Wheat": CropProfile(name="Wheat", kc=1.05),
-    "Corn": CropProfile(name="Corn", kc=1.15),
-    "Rice": CropProfile(name="Rice", kc=1.20),
-    "Tomato": CropProfile(name="Tomato", kc=1.10),
-    "Potato": CropProfile(name="Potato", kc=1.00),
-}
-
 # ===== MINIMAL SIDEBAR =====
 with st.sidebar:
     # Header
@@ -310,29 +301,68 @@ with st.sidebar:
     with col2:
         longitude = st.number_input("Longitude", value=51.3890, format="%.6f", key="lon")
     
-    # Simulation Days
-    simulation_days = st.slider(
-        "Simulation Days",
-        3, 30, 10,
-        key="sim_days"
+    # Horizon: forecast days ahead, or observed weather over past seasons/years
+    st.markdown("**Horizon**")
+    horizon = st.radio(
+        "",
+        ["Forecast", "History"],
+        horizontal=True,
+        key="horizon"
     )
     
+    if horizon == "Forecast":
+        # Simulation Days
+        simulation_days = st.slider(
+            "Simulation Days",
+            3, 30, 10,
+            key="sim_days"
+        )
+    else:
+        # The archive lags a few days behind today
+        last_day = date.today() - timedelta(days=7)
+        history_range = st.date_input(
+            "Period",
+            value=(last_day.replace(year=last_day.year - 1), last_day),
+            min_value=date(1950, 1, 1),
+            max_value=last_day,
+            key="history_range"
+        )
+        if len(history_range) != 2:
+            st.info("Select the last day of the period")
+            st.stop()
+    
     # Get region name
-    try:
-        geolocator = Nominatim(user_agent="soil_dashboard_minimal")
-        location = geolocator.reverse(f"{latitude}, {longitude}", language='en')
-        region_name = location.raw.get('address', {}).get('city') or \
-                     location.raw.get('address', {}).get('town') or \
-                     location.raw.get('address', {}).get('village') or "Unknown Region"
-    except:
-        region_name = "Unknown Region"
+    region_name = REVERSE_GEOCODER.region_name(latitude, longitude)
     
     st.caption(f"📍 {region_name}")
     
-    # Weather Info
-    weather = WeatherAPI(latitude=latitude, longitude=longitude, days=simulation_days)
-    current_temp = round(weather.current_temperature(), 1)
-    current_conditions = weather.current_conditions()
+    # Weather Info and simulation, shared across sessions for the same configuration
+    progress_placeholder = st.empty()
+    if horizon == "Forecast":
+        simulation = run_simulation(
+            soil_name=soil_choice,
+            crop_name=crop_choice,
+            initial_condition=initial_condition,
+            latitude=latitude,
+            longitude=longitude,
+            days=simulation_days,
+            progress=lambda day, days: progress_placeholder.progress(day / days, text=f"Simulated {day} of {days} days...")
+        )
+    else:
+        with st.spinner("Simulating historical weather..."):
+            simulation = run_history_simulation(
+                soil_name=soil_choice,
+                crop_name=crop_choice,
+                initial_condition=initial_condition,
+                latitude=latitude,
+                longitude=longitude,
+                start_date=history_range[0].isoformat(),
+                end_date=history_range[1].isoformat()
+            )
+    progress_placeholder.empty()
+    simulation_days = len(simulation.df)
+    current_temp = "—" if simulation.current_temperature is None else simulation.current_temperature
+    current_conditions = simulation.current_conditions
     
     st.markdown("---")
     st.markdown("### Current Weather")
@@ -370,60 +400,11 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # ===== SIMULATION EXECUTION =====
-# Convert inputs
 soil = SOIL_TYPES[soil_choice]
-crop = CROP_TYPES[crop_choice]
-INITIAL_MOISTURE_MAPPING = {"Dry": 0.4, "Normal": 0.6, "Wet": 0.8}
-initial_moisture_mm = soil.field_capacity_mm * INITIAL_MOISTURE_MAPPING[initial_condition]
-
-# Get weather data
-weather = WeatherAPI(latitude=latitude, longitude=longitude, days=simulation_days)
-et0_daily, rainfall_daily = weather.fetch()
-
-# Initialize simulator
-simulator = SoilTwinSimulator(soil=soil, crop=crop, initial_moisture_mm=initial_moisture_mm)
-decision_engine = DecisionEngine(threshold_low=0.3, threshold_high=0.6, max_irrigation_mm=15.0)
-
-# Run simulation
-st.markdown("### Simulation Progress")
-progress_bar = st.progress(0)
-status_text = st.empty()
-
-results = []
-for day in range(simulation_days):
-    progress_bar.progress((day + 1) / simulation_days)
-    status_text.text(f"Processing day {day + 1} of {simulation_days}...")
-    
-    current_stress = max(0.0, min(1.0,
-        1 - (simulator.soil_moisture_mm - soil.wilting_point_mm) / (soil.field_capacity_mm - soil.wilting_point_mm)
-    ))
-
-    decision = decision_engine.evaluate(
-        stress_index=current_stress,
-        soil_moisture_mm=simulator.soil_moisture_mm,
-        field_capacity_mm=soil.field_capacity_mm
-    )
-
-    state = simulator.step(
-        et0_mm=et0_daily[day] * crop.kc,
-        rainfall_mm=rainfall_daily[day],
-        irrigation_mm=decision.irrigation_mm
-    )
-
-    results.append({
-        "Day": day + 1,
-        "Soil Moisture (mm)": round(state.soil_moisture_mm, 1),
-        "Stress Index": round(state.stress_index, 3),
-        "Memory Factor": round(state.memory_factor, 3),
-        "Soil Health Score": round(state.soil_health_score, 2),
-        "Irrigation (mm)": decision.irrigation_mm,
-        "ET0 (mm)": round(et0_daily[day] * crop.kc, 1),
-        "Rainfall (mm)": rainfall_daily[day],
-        "Status": "Optimal" if state.stress_index < 0.3 else "Moderate" if state.stress_index < 0.6 else "Critical"
-    })
-
-df = pd.DataFrame(results)
-status_text.success("✅ Simulation completed")
+df = simulation.df
+# Long runs are charted against dates, through a server-side window and downsampling
+x_column = "Date" if "Date" in df.columns else "Day"
+long_horizon = simulation_days > LONG_HORIZON_DAYS
 
 # ===== KEY METRICS =====
 st.markdown("### Key Metrics")
@@ -503,39 +484,59 @@ with tab1:
     col1, col2 = st.columns([3, 1])
     
     with col1:
+        chart_df = df
+        if long_horizon:
+            # Zooming re-windows and re-decimates here, so each view carries a bounded payload
+            first, last = df[x_column].iloc[0].date(), df[x_column].iloc[-1].date()
+            view = st.slider(
+                "Window",
+                min_value=first,
+                max_value=last,
+                value=(first, last),
+                key="chart_window"
+            )
+            chart_df = window_frame(df, x_column, pd.Timestamp(view[0]), pd.Timestamp(view[1]))
+        
         # Create plot
+        chart_started = time.perf_counter()
         fig = go.Figure()
+        # WebGL traces for long runs; SVG is fine for a few weeks
+        line_trace = go.Scattergl if long_horizon else go.Scatter
+        x_label = "%{x|%b %d, %Y}" if x_column == "Date" else "Day %{x}"
+        line_df = decimate_frame(chart_df, x_column, ["Soil Moisture (mm)", "Stress Index"])
         
         # Add soil moisture line
-        fig.add_trace(go.Scatter(
-            x=df["Day"],
-            y=df["Soil Moisture (mm)"],
+        fig.add_trace(line_trace(
+            x=line_df[x_column],
+            y=line_df["Soil Moisture (mm)"],
             name="Soil Moisture",
             line=dict(color="#10B981", width=3),
             mode="lines",
-            hovertemplate="Day %{x}<br>%{y:.1f} mm<extra></extra>"
+            hovertemplate=x_label + "<br>%{y:.1f} mm<extra></extra>"
         ))
         
-        # Add irrigation bars
-        irrigation_df = df[df["Irrigation (mm)"] > 0]
+        # Add irrigation bars, summed per bucket when there are too many days to draw
+        irrigation_df = bucket_frame(chart_df, x_column, "Irrigation (mm)")
+        irrigation_df = irrigation_df[irrigation_df["Irrigation (mm)"] > 0]
         if not irrigation_df.empty:
             fig.add_trace(go.Bar(
-                x=irrigation_df["Day"],
+                x=irrigation_df[x_column],
                 y=irrigation_df["Irrigation (mm)"],
                 name="Irrigation",
                 marker_color="#3B82F6",
                 opacity=0.8,
-                hovertemplate="Day %{x}<br>Irrigation: %{y:.1f} mm<extra></extra>"
+                hovertemplate=x_label + "<br>Irrigation: %{y:.1f} mm<extra></extra>"
             ))
         
         # Add stress index
-        fig.add_trace(go.Scatter(
-            x=df["Day"],
-            y=df["Stress Index"],
+        fig.add_trace(line_trace(
+            x=line_df[x_column],
+            y=line_df["Stress Index"],
             name="Stress Index",
             line=dict(color="#F59E0B", width=2, dash="dash"),
+            mode="lines",
             yaxis="y2",
-            hovertemplate="Day %{x}<br>Stress: %{y:.3f}<extra></extra>"
+            hovertemplate=x_label + "<br>Stress: %{y:.3f}<extra></extra>"
         ))
         
         # Update layout
@@ -545,7 +546,7 @@ with tab1:
             paper_bgcolor="white",
             hovermode="x unified",
             xaxis=dict(
-                title="Day",
+                title=x_column,
                 gridcolor="#E5E7EB",
                 showline=True,
                 linecolor="#D1D5DB"
@@ -574,6 +575,7 @@ with tab1:
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        METRICS.observe("chart_soil_dynamics", time.perf_counter() - chart_started)
     
     with col2:
         st.markdown("**Summary**")
@@ -594,8 +596,8 @@ with tab1:
             st.markdown(f"Efficiency: {efficiency:.1f}")
 
 with tab2:
-    # Format dataframe
-    display_df = df.copy()
+    # Format dataframe; long runs are summarised per month, the CSV keeps every day
+    display_df = monthly_summary(df) if long_horizon and x_column == "Date" else df.copy()
     
     # Color function for status
     def color_status(val):
@@ -607,7 +609,10 @@ with tab2:
             return "background-color: #FEE2E2; color: #991B1B;"
     
     # Apply styling
-    styled_df = display_df.style.applymap(color_status, subset=['Status'])
+    if "Status" in display_df.columns:
+        styled_df = display_df.style.applymap(color_status, subset=['Status'])
+    else:
+        styled_df = display_df
     
     st.dataframe(
         styled_df,
@@ -677,7 +682,9 @@ with tab3:
         st.markdown("---")
         st.markdown("⚠️ **Attention Required**")
         st.markdown(f"High stress on {len(high_stress)} days")
-        stress_days = ", ".join([str(d) for d in high_stress["Day"].tolist()])
+        stress_days = ", ".join([str(d) for d in high_stress["Day"].tolist()[:30]])
+        if len(high_stress) > 30:
+            stress_days += f", … ({len(high_stress) - 30} more)"
         st.caption(f"Days: {stress_days}")
 
 # ===== WATER BALANCE =====
@@ -686,6 +693,7 @@ st.markdown("### Water Balance")
 col1, col2 = st.columns([2, 1])
 with col1:
     # Water balance chart
+    chart_started = time.perf_counter()
     water_data = pd.DataFrame({
         "Category": ["Rainfall", "Irrigation", "ET0"],
         "Amount (mm)": [total_rainfall, total_irrigation, total_et0],
@@ -706,6 +714,7 @@ with col1:
     ).properties(height=250)
     
     st.altair_chart(chart, use_container_width=True)
+    METRICS.observe("chart_water_balance", time.perf_counter() - chart_started)
     
     # Net water
     net_water = total_rainfall + total_irrigation - total_et0
@@ -742,4 +751,29 @@ st.markdown("""
 <div style='text-align: center; color: #6B7280; font-size: 0.875rem; padding: 1rem;'>
     🌱 Soil Digital Twin • Smart Irrigation • v2.5.1
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ===== DEBUG PANEL =====
+if METRICS.enabled:
+    METRICS.observe("dashboard_render", time.perf_counter() - rerun_started)
+if debug_panel and not METRICS.enabled:
+    st.sidebar.caption("Performance metrics are off; start the server with SOILTWIN_METRICS=1 to collect them.")
+elif debug_panel:
+    metrics = METRICS.snapshot()
+    with st.sidebar.expander("Performance (debug)"):
+        st.markdown("**Stages**")
+        st.dataframe(
+            pd.DataFrame.from_dict(metrics["timers"], orient="index").sort_values("total_s", ascending=False),
+            use_container_width=True
+        )
+        for name, value in sorted(metrics["derived"].items()):
+            st.caption(f"{name}: {value:,.3f}")
+        st.markdown("**Counters**")
+        st.json(metrics["counters"], expanded=False)
+        st.download_button(
+            label="Prometheus metrics",
+            data=METRICS.to_prometheus(),
+            file_name="soiltwin_metrics.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
\ No newline at end of file
@@ -0,0 +1,65 @@
+# dashboard/charts.py
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.decimation import bucket_sums, lttb_indices, window
+
+# Points sent to the browser per trace; longer series are downsampled on the server
+MAX_CHART_POINTS = 1500
+
+# Runs longer than this get the long-horizon layout (window slider, WebGL traces, monthly table)
+LONG_HORIZON_DAYS = 120
+
+
+def decimate_frame(
+    df: pd.DataFrame,
+    x_column: str,
+    columns: Sequence[str],
+    max_points: int = MAX_CHART_POINTS
+) -> pd.DataFrame:
+    """
+    Rows of df that keep the shape of every one of columns, at most max_points
+    in total: the union of the LTTB points of each column, which share the
+    budget equally.
+    """
+    if len(df) <= max_points:
+        return df
+    budget = max(3, max_points // len(columns))
+    x = df[x_column].to_numpy()
+    kept = np.unique(np.concatenate([lttb_indices(x, df[column].to_numpy(), budget) for column in columns]))
+    return df.iloc[kept]
+
+
+def bucket_frame(
+    df: pd.DataFrame,
+    x_column: str,
+    column: str,
+    max_points: int = MAX_CHART_POINTS
+) -> pd.DataFrame:
+    """df[column] summed over at most max_points buckets, keeping the totals of bar series."""
+    x, sums = bucket_sums(df[x_column].to_numpy(), df[column].to_numpy(), max_points)
+    return pd.DataFrame({x_column: x, column: sums})
+
+
+def window_frame(df: pd.DataFrame, x_column: str, start=None, end=None) -> pd.DataFrame:
+    """Rows of df (sorted by x_column) with x_column within [start, end]."""
+    return df.iloc[window(df[x_column].to_numpy(), start, end)]
+
+
+def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per calendar month of a run with a "Date" column, for tables too long to list daily."""
+    months = df.groupby(df["Date"].dt.to_period("M"))
+    summary = pd.DataFrame({
+        "Mean Moisture (mm)": months["Soil Moisture (mm)"].mean().round(1),
+        "Mean Stress": months["Stress Index"].mean().round(3),
+        "Irrigation (mm)": months["Irrigation (mm)"].sum().round(1),
+        "Irrigation Days": months["Irrigation (mm)"].apply(lambda values: int((values > 0).sum())),
+        "ET0 (mm)": months["ET0 (mm)"].sum().round(1),
+        "Rainfall (mm)": months["Rainfall (mm)"].sum().round(1),
+        "Critical Days": months["Status"].apply(lambda values: int((values == "Critical").sum())),
+    })
+    summary.index = summary.index.astype(str)
+    summary.index.name = "Month"
+    return summary.reset_index()
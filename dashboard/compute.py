@@ -0,0 +1,216 @@
+# dashboard/compute.py
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.climate_store import ClimateStore, backfill
+from core.decision_engine import DecisionEngine
+from core.geocoder import NominatimFallback, ReverseGeocoder
+from core.metrics import METRICS
+from core.result_cache import ResultCache
+from core.simulator import SoilTwinSimulator
+from core.weather_api import WeatherAPI
+from core.weather_cache import WeatherCache
+from domain.models import SoilStateBatch
+from domain.soil import CROP_TYPES, SOIL_TYPES, SoilProfile, CropProfile
+
+INITIAL_MOISTURE_MAPPING = {"Dry": 0.4, "Normal": 0.6, "Wet": 0.8}
+
+# Decimals kept from latitude/longitude; 2 decimals is roughly 1 km
+LOCATION_PRECISION = 2
+
+# Shared on-disk weather cache; set SOILTWIN_WEATHER_OFFLINE=1 to replay cached data only
+WEATHER_CACHE = WeatherCache(offline=os.environ.get("SOILTWIN_WEATHER_OFFLINE") == "1")
+
+# Observed weather for history runs, backfilled on first use (see core.climate_store)
+CLIMATE_STORE = ClimateStore()
+
+# Local place index; Nominatim is only asked when no bundled place is nearby
+REVERSE_GEOCODER = ReverseGeocoder(fallback=NominatimFallback(user_agent="soil_dashboard_minimal"))
+
+# Results shared by every session of this server process
+RESULT_CACHE = ResultCache(maxsize=256, ttl_seconds=900.0)
+METRICS.register_collector(
+    "result_cache", lambda: {"result_cache_hits": RESULT_CACHE.hits, "result_cache_misses": RESULT_CACHE.misses}
+)
+
+
+@dataclass
+class SimulationResult:
+    """Everything the dashboard renders for one configuration. Treat as read-only: it is shared across sessions."""
+    df: pd.DataFrame
+    current_temperature: Optional[float]  # None for history runs
+    current_conditions: str
+
+
+def simulation_key(
+    soil_name: str,
+    crop_name: str,
+    initial_condition: str,
+    latitude: float,
+    longitude: float,
+    days: int,
+    forecast_date: str
+) -> tuple:
+    return (
+        soil_name,
+        crop_name,
+        initial_condition,
+        round(latitude, LOCATION_PRECISION),
+        round(longitude, LOCATION_PRECISION),
+        days,
+        forecast_date,
+    )
+
+
+def run_simulation(
+    soil_name: str,
+    crop_name: str,
+    initial_condition: str,
+    latitude: float,
+    longitude: float,
+    days: int,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> SimulationResult:
+    """
+    Return the simulation for a dashboard configuration, computing it at most
+    once per key across all sessions (see ResultCache).
+
+    progress(day, days) is only called when this call actually computes, and
+    then a few times per run (see SoilTwinSimulator.run_closed_loop).
+    """
+    key = simulation_key(
+        soil_name, crop_name, initial_condition, latitude, longitude, days, date.today().isoformat()
+    )
+    return RESULT_CACHE.get_or_compute(key, lambda: _simulate(*key[:6], progress=progress))
+
+
+def _simulate(
+    soil_name: str,
+    crop_name: str,
+    initial_condition: str,
+    latitude: float,
+    longitude: float,
+    days: int,
+    progress: Optional[Callable[[int, int], None]] = None,
+    weather_cache: Optional[WeatherCache] = None
+) -> SimulationResult:
+    soil = SOIL_TYPES[soil_name]
+    crop = CROP_TYPES[crop_name]
+    initial_moisture_mm = soil.field_capacity_mm * INITIAL_MOISTURE_MAPPING[initial_condition]
+
+    # Get weather data
+    weather = WeatherAPI(latitude=latitude, longitude=longitude, days=days, cache=weather_cache or WEATHER_CACHE)
+    et0_daily, rainfall_daily = weather.fetch()
+
+    states, irrigation_mm = _run_field(soil, crop, initial_moisture_mm, et0_daily, rainfall_daily, progress)
+    with METRICS.timer("dataframe"):
+        df = trajectory_frame(states, irrigation_mm, et0_daily, rainfall_daily, crop.kc)
+    return SimulationResult(
+        df=df,
+        current_temperature=round(weather.current_temperature(), 1),
+        current_conditions=weather.current_conditions()
+    )
+
+
+def run_history_simulation(
+    soil_name: str,
+    crop_name: str,
+    initial_condition: str,
+    latitude: float,
+    longitude: float,
+    start_date: str,
+    end_date: str
+) -> SimulationResult:
+    """
+    Simulate a field over observed weather between two past dates (multi-season
+    or multi-year), shared across sessions like run_simulation.
+
+    The df additionally has a "Date" column.
+    """
+    key = (
+        "history",
+        soil_name,
+        crop_name,
+        initial_condition,
+        round(latitude, LOCATION_PRECISION),
+        round(longitude, LOCATION_PRECISION),
+        start_date,
+        end_date,
+    )
+    return RESULT_CACHE.get_or_compute(key, lambda: _simulate_history(*key[1:]))
+
+
+def _simulate_history(
+    soil_name: str,
+    crop_name: str,
+    initial_condition: str,
+    latitude: float,
+    longitude: float,
+    start_date: str,
+    end_date: str,
+    store: Optional[ClimateStore] = None
+) -> SimulationResult:
+    soil = SOIL_TYPES[soil_name]
+    crop = CROP_TYPES[crop_name]
+    initial_moisture_mm = soil.field_capacity_mm * INITIAL_MOISTURE_MAPPING[initial_condition]
+
+    # Only years not stored yet touch the network; offline mode reads the store only
+    store = store or CLIMATE_STORE
+    if not WEATHER_CACHE.offline:
+        backfill(store, [(latitude, longitude)], start_date, end_date)
+    weather = store.query([(latitude, longitude)], start_date, end_date)
+    et0_daily, rainfall_daily = weather.et0_mm[:, 0], weather.rainfall_mm[:, 0]
+
+    states, irrigation_mm = _run_field(soil, crop, initial_moisture_mm, et0_daily, rainfall_daily)
+    with METRICS.timer("dataframe"):
+        df = trajectory_frame(states, irrigation_mm, et0_daily, rainfall_daily, crop.kc, dates=weather.dates)
+    return SimulationResult(df=df, current_temperature=None, current_conditions="Historical weather")
+
+
+def _run_field(
+    soil: SoilProfile,
+    crop: CropProfile,
+    initial_moisture_mm: float,
+    et0_mm: Sequence[float],
+    rainfall_mm: Sequence[float],
+    progress: Optional[Callable[[int, int], None]] = None
+):
+    """
+    The whole horizon in one closed-loop run of the twin. et0_mm is reference
+    ET0; the twin applies the crop coefficient itself.
+    """
+    simulator = SoilTwinSimulator(soil=soil, crop=crop, initial_moisture_mm=initial_moisture_mm)
+    decision_engine = DecisionEngine(threshold_low=0.3, threshold_high=0.6, max_irrigation_mm=15.0)
+    return simulator.run_closed_loop(decision_engine, et0_mm, rainfall_mm, progress=progress)
+
+
+def trajectory_frame(
+    states: SoilStateBatch,
+    irrigation_mm: np.ndarray,
+    et0_mm: Sequence[float],
+    rainfall_mm: Sequence[float],
+    kc: float,
+    dates: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Dashboard table of a run's daily states and irrigation, built column by column."""
+    stress = states.stress_index
+    columns = {}
+    if dates is not None:
+        columns["Date"] = pd.to_datetime(list(dates))
+    columns.update({
+        "Day": states.day,
+        "Soil Moisture (mm)": np.round(states.soil_moisture_mm, 1),
+        "Stress Index": np.round(stress, 3),
+        "Memory Factor": np.round(states.memory_factor, 3),
+        "Soil Health Score": np.round(states.soil_health_score, 2),
+        "Irrigation (mm)": irrigation_mm,
+        "ET0 (mm)": np.round(np.asarray(et0_mm, dtype=np.float64) * kc, 1),
+        "Rainfall (mm)": np.asarray(rainfall_mm, dtype=np.float64),
+        "Status": np.select([stress < 0.3, stress < 0.6], ["Optimal", "Moderate"], "Critical"),
+    })
+    return pd.DataFrame(columns)
@@ -1,8 +1,10 @@
 # domain/models.py
 from dataclasses import dataclass
 
+import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class SoilState:
     day: int
     soil_moisture_mm: float
@@ -11,7 +13,235 @@ class SoilState:
     soil_health_score: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Decision:
     irrigation_mm: float
     reason: str
+
+
+@dataclass
+class FleetState:
+    """SoilState for many fields at once; every attribute is an array."""
+    day: np.ndarray
+    soil_moisture_mm: np.ndarray
+    stress_index: np.ndarray
+    memory_factor: np.ndarray
+    soil_health_score: np.ndarray
+
+
+# Reason codes used by DecisionBatch.reason_code
+REASON_BELOW_LOW = 0
+REASON_PROPORTIONAL = 1
+REASON_FULL = 2
+
+
+def format_reason(
+    reason_code: int,
+    stress_index: float,
+    irrigation_mm: float,
+    threshold_low: float,
+    threshold_high: float
+) -> str:
+    """Human-readable text for a decision reason code."""
+    if reason_code == REASON_BELOW_LOW:
+        return f"Stress {stress_index:.2f} below low threshold {threshold_low:.2f}: no irrigation"
+    if reason_code == REASON_FULL:
+        return f"Stress {stress_index:.2f} above high threshold {threshold_high:.2f}: full irrigation"
+    return f"Stress {stress_index:.2f} moderate: proportional irrigation {irrigation_mm:.1f} mm"
+
+
+@dataclass
+class DecisionBatch:
+    """
+    Decisions for many fields at once.
+
+    Reasons are stored as compact codes; the text is only built on request
+    through reason() or decision().
+    """
+    irrigation_mm: np.ndarray
+    reason_code: np.ndarray
+    stress_index: np.ndarray
+    threshold_low: float
+    threshold_high: float
+
+    def __len__(self) -> int:
+        return len(self.irrigation_mm)
+
+    def reason(self, index) -> str:
+        return format_reason(
+            int(self.reason_code[index]),
+            float(self.stress_index[index]),
+            float(self.irrigation_mm[index]),
+            self.threshold_low,
+            self.threshold_high
+        )
+
+    def decision(self, index) -> Decision:
+        return Decision(irrigation_mm=float(self.irrigation_mm[index]), reason=self.reason(index))
+
+    def __getitem__(self, index) -> "DecisionView":
+        return DecisionView(self, index)
+
+    def __iter__(self):
+        return (DecisionView(self, i) for i in range(len(self)))
+
+    def to_records(self) -> np.ndarray:
+        """Pack the decisions into one DECISION_DTYPE structured array."""
+        records = np.empty(np.shape(self.irrigation_mm), dtype=DECISION_DTYPE)
+        records["irrigation_mm"] = self.irrigation_mm
+        records["reason_code"] = self.reason_code
+        records["stress_index"] = self.stress_index
+        return records
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, threshold_low: float, threshold_high: float) -> "DecisionBatch":
+        return cls(
+            irrigation_mm=records["irrigation_mm"],
+            reason_code=records["reason_code"],
+            stress_index=records["stress_index"],
+            threshold_low=threshold_low,
+            threshold_high=threshold_high
+        )
+
+
+DECISION_DTYPE = np.dtype([
+    ("irrigation_mm", np.float64),
+    ("stress_index", np.float64),
+    ("reason_code", np.int8),
+])
+
+
+class DecisionView:
+    """
+    One row of a DecisionBatch that reads like a Decision; the reason text
+    is only formatted when it is accessed.
+    """
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: DecisionBatch, index):
+        self._batch = batch
+        self._index = index
+
+    @property
+    def irrigation_mm(self) -> float:
+        return float(self._batch.irrigation_mm[self._index])
+
+    @property
+    def reason(self) -> str:
+        return self._batch.reason(self._index)
+
+    def to_decision(self) -> Decision:
+        return self._batch.decision(self._index)
+
+    def __eq__(self, other):
+        if isinstance(other, (Decision, DecisionView)):
+            return (self.irrigation_mm, self.reason) == (other.irrigation_mm, other.reason)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_decision())
+
+
+STATE_DTYPE = np.dtype([
+    ("day", np.int64),
+    ("soil_moisture_mm", np.float64),
+    ("stress_index", np.float64),
+    ("memory_factor", np.float64),
+    ("soil_health_score", np.float64),
+])
+STATE_FIELDS = STATE_DTYPE.names
+
+
+class SoilStateView:
+    """One record of a SoilStateBatch that reads like a SoilState."""
+    __slots__ = ("_records", "_index")
+
+    def __init__(self, records: np.ndarray, index):
+        self._records = records
+        self._index = index
+
+    def __getattr__(self, name):
+        if name in STATE_FIELDS:
+            return self._records[name][self._index].item()
+        raise AttributeError(name)
+
+    def to_state(self) -> SoilState:
+        return SoilState(*self._records[self._index].item())
+
+    def __eq__(self, other):
+        if isinstance(other, (SoilState, SoilStateView)):
+            return all(getattr(self, name) == getattr(other, name) for name in STATE_FIELDS)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_state())
+
+
+class SoilStateBatch:
+    """
+    Many SoilStates in one STATE_DTYPE structured array (40 bytes per state).
+
+    Indexing with an integer gives a SoilStateView, with a slice or mask a
+    SoilStateBatch sharing the same memory; attributes named like the
+    SoilState fields return column views.
+    """
+
+    def __init__(self, records: np.ndarray):
+        if records.dtype != STATE_DTYPE:
+            raise ValueError(f"Expected records of dtype {STATE_DTYPE}, got {records.dtype}")
+        self.records = records
+
+    @classmethod
+    def empty(cls, shape) -> "SoilStateBatch":
+        return cls(np.zeros(shape, dtype=STATE_DTYPE))
+
+    @classmethod
+    def from_states(cls, states) -> "SoilStateBatch":
+        states = list(states)
+        records = np.empty(len(states), dtype=STATE_DTYPE)
+        for i, state in enumerate(states):
+            records[i] = tuple(getattr(state, name) for name in STATE_FIELDS)
+        return cls(records)
+
+    @classmethod
+    def from_fleet_state(cls, state: "FleetState") -> "SoilStateBatch":
+        records = np.empty(np.shape(state.soil_moisture_mm), dtype=STATE_DTYPE)
+        for name in STATE_FIELDS:
+            records[name] = getattr(state, name)
+        return cls(records)
+
+    def __getattr__(self, name):
+        if name in STATE_FIELDS:
+            return self.records[name]
+        raise AttributeError(name)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return SoilStateView(self.records, index)
+        return SoilStateBatch(self.records[index])
+
+    def __setitem__(self, index, state):
+        self.records[index] = tuple(getattr(state, name) for name in STATE_FIELDS)
+
+    def __iter__(self):
+        return (SoilStateView(self.records, i) for i in range(len(self)))
+
+
+@dataclass
+class FleetTrajectory:
+    """
+    Daily states and decisions for a fleet, each array shaped (days, *fleet shape).
+
+    irrigation_mm and reason_code are the decisions applied on each day;
+    the state arrays are the states after that day's step.
+    """
+    day: np.ndarray
+    soil_moisture_mm: np.ndarray
+    stress_index: np.ndarray
+    memory_factor: np.ndarray
+    soil_health_score: np.ndarray
+    irrigation_mm: np.ndarray
+    reason_code: np.ndarray
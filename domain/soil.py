@@ -1,5 +1,6 @@
 # domain/soil.py
 from dataclasses import dataclass
+from typing import Optional, Sequence
 
 
 @dataclass
@@ -9,6 +10,44 @@ class SoilProfile:
     wilting_point_mm: float
 
 
+@dataclass
+class LayeredSoilProfile:
+    """
+    Root zone split into layers, listed top to bottom.
+
+    field_capacity_mm and wilting_point_mm are the totals over all layers, so
+    the profile can be used wherever a SoilProfile is expected.
+    """
+    name: str
+    layer_field_capacity_mm: Sequence[float]
+    layer_wilting_point_mm: Sequence[float]
+    root_fraction: Optional[Sequence[float]] = None  # Share of ET drawn per layer (default: by capacity)
+    drainage_rate: float = 1.0  # Share of the water above FC that percolates per day
+    redistribution_mm: float = 0.0  # Daily exchange between layers per unit difference in saturation
+
+    @classmethod
+    def from_profile(cls, soil: SoilProfile, layers: int, **kwargs) -> "LayeredSoilProfile":
+        """Split a single-bucket profile into equal layers."""
+        return cls(
+            name=soil.name,
+            layer_field_capacity_mm=[soil.field_capacity_mm / layers] * layers,
+            layer_wilting_point_mm=[soil.wilting_point_mm / layers] * layers,
+            **kwargs
+        )
+
+    @property
+    def layers(self) -> int:
+        return len(self.layer_field_capacity_mm)
+
+    @property
+    def field_capacity_mm(self) -> float:
+        return float(sum(self.layer_field_capacity_mm))
+
+    @property
+    def wilting_point_mm(self) -> float:
+        return float(sum(self.layer_wilting_point_mm))
+
+
 @dataclass
 class CropProfile:
     name: str
@@ -26,3 +65,18 @@ WHEAT = CropProfile(
     name="Wheat",
     kc=1.05
 )
+
+# Profiles selectable by name in the dashboard and in fields files
+SOIL_TYPES = {
+    "Loam": LOAM,
+    "Clay": SoilProfile(name="Clay", field_capacity_mm=200.0, wilting_point_mm=80.0),
+    "Sand": SoilProfile(name="Sand", field_capacity_mm=100.0, wilting_point_mm=30.0),
+}
+
+CROP_TYPES = {
+    "Wheat": WHEAT,
+    "Corn": CropProfile(name="Corn", kc=1.15),
+    "Rice": CropProfile(name="Rice", kc=1.20),
+    "Tomato": CropProfile(name="Tomato", kc=1.10),
+    "Potato": CropProfile(name="Potato", kc=1.00),
+}
@@ -1,43 +1,84 @@
-# main.py (تغییرات)
-from core.simulator import SoilTwinSimulator
-from core.decision_engine import DecisionEngine
-from domain.soil import LOAM, WHEAT
+# main.py
+"""
+Batch runner: simulate every field of a fields file with daily irrigation
+decisions, on all cores.
 
-def main():
-    simulator = SoilTwinSimulator(
-        soil=LOAM,
-        crop=WHEAT,
-        initial_moisture_mm=120.0
-    )
+    python main.py fields.csv --days 10 --output results/
+    python main.py fields.parquet --start 2005-01-01 --end 2024-12-31 --output hindcast/ --trajectories
 
-    decision_engine = DecisionEngine(threshold_stress=0.5, irrigation_mm=15.0)
+The fields file (CSV or Parquet) has one row per field with latitude,
+longitude, soil, crop, initial_moisture_mm and optionally field_id. Weather
+is fetched once per location: the forecast through the weather cache, or with
+--start/--end observed weather from the local climate store; with
+--weather-resolution only on a coarse lattice, interpolated to the fields.
+Results are written to <output>/summary.parquet (one row per field) and,
+with --trajectories, every field-day to <output>/trajectories/part-*.parquet.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
 
-    for day in range(1, 11):
-        state = simulator.step(
-            et0_mm=5.0,
-            rainfall_mm=0.0,
-            irrigation_mm=0.0  # ابتدا بدون آبیاری
-        )
+from core.batch import DEFAULT_CHUNK_FIELDS, load_weather, read_fields, run_batch
+from core.decision_engine import DecisionEngine
 
-        # گرفتن توصیه آبیاری
-        decision = decision_engine.evaluate(state.stress_index)
 
-        # اعمال آبیاری پیشنهادی
-        state = simulator.step(
-            et0_mm=5.0,
-            rainfall_mm=0.0,
-            irrigation_mm=decision.irrigation_mm
-        )
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SoilTwin batch run over a fields file")
+    parser.add_argument("fields", help="CSV or Parquet file with one row per field")
+    parser.add_argument("--output", required=True, help="directory for summary.parquet (and trajectories/)")
+    parser.add_argument("--days", type=int, default=10, help="forecast days (ignored with --start/--end)")
+    parser.add_argument("--start", help="first day of an observed-weather run, YYYY-MM-DD")
+    parser.add_argument("--end", help="last day of an observed-weather run, YYYY-MM-DD")
+    parser.add_argument("--weather-resolution", type=float,
+                        help="fetch weather on a lattice of this spacing in degrees and interpolate to fields")
+    parser.add_argument("--offline", action="store_true", help="use cached/stored weather only")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-fields", type=int, default=DEFAULT_CHUNK_FIELDS, help="fields per task")
+    parser.add_argument("--trajectories", action="store_true", help="also write every field-day")
+    parser.add_argument("--threshold-low", type=float, default=0.3, help="stress below which nothing is irrigated")
+    parser.add_argument("--threshold-high", type=float, default=0.6, help="stress above which max irrigation is applied")
+    parser.add_argument("--max-irrigation-mm", type=float, default=15.0, help="daily irrigation limit")
+    args = parser.parse_args(argv)
+    if (args.start is None) != (args.end is None):
+        parser.error("--start and --end go together")
+
+    started = time.perf_counter()
+    fields = read_fields(args.fields)
+    weather = load_weather(
+        fields, days=args.days, start_date=args.start, end_date=args.end, offline=args.offline,
+        resolution_degrees=args.weather_resolution
+    )
+    loaded = time.perf_counter()
 
-        print(
-            f"Day {state.day} | "
-            f"Soil Moisture: {state.soil_moisture_mm:.1f} mm | "
-            f"Stress: {state.stress_index:.2f} | "
-            f"Memory: {state.memory_factor:.2f} | "
-            f"Health: {state.soil_health_score:.1f} | "
-            f"Irrigation: {decision.irrigation_mm} mm ({decision.reason})"
-        )
+    os.makedirs(args.output, exist_ok=True)
+    summary = run_batch(
+        fields,
+        weather,
+        engine=DecisionEngine(args.threshold_low, args.threshold_high, args.max_irrigation_mm),
+        workers=args.workers,
+        chunk_fields=args.chunk_fields,
+        trajectory_dir=os.path.join(args.output, "trajectories") if args.trajectories else None,
+        progress=lambda done, total: print(f"\r{done}/{total} chunks", end="", file=sys.stderr)
+    )
+    print(file=sys.stderr)
+    summary.to_parquet(os.path.join(args.output, "summary.parquet"), index=False)
+    finished = time.perf_counter()
+
+    days = len(weather.dates)
+    print(
+        f"{len(fields)} fields x {days} days ({weather.dates[0]} .. {weather.dates[-1]}) | "
+        f"weather {loaded - started:.1f} s, simulation {finished - loaded:.1f} s "
+        f"({len(fields) * days / max(finished - loaded, 1e-9):,.0f} field-days/s)"
+    )
+    print(
+        f"Irrigation {summary['total_irrigation_mm'].sum():,.1f} mm in total; "
+        f"{int((summary['next_irrigation_mm'] > 0).sum())} fields to irrigate tomorrow; "
+        f"{int((summary['high_stress_days'] > 0).sum())} fields had high-stress days"
+    )
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -5,4 +5,5 @@ setup(
     name="soil_twin",
     version="0.1",
     packages=find_packages(),
+    package_data={"core": ["data/*.csv"]},
 )
@@ -0,0 +1,51 @@
+# tests/test_assimilation.py
+import unittest
+
+import numpy as np
+
+from core.assimilation import MoistureAssimilator
+from core.fleet import FleetSimulator
+
+
+class TestMoistureAssimilator(unittest.TestCase):
+
+    def setUp(self):
+        self.fleet = FleetSimulator(150.0, 60.0, 1.0, [100.0, 100.0, 100.0])
+        self.assimilator = MoistureAssimilator(
+            self.fleet, field_ids=[30, 10, 20], sensor_noise_mm2=25.0, initial_variance_mm2=25.0
+        )
+
+    def test_batch_equals_sequential_updates(self):
+        result = self.assimilator.assimilate([10, 10, 30], [1, 2, 1], [120.0, 110.0, 90.0])
+        self.assertEqual(result.accepted, 3)
+
+        # Field with id 10 is fleet index 1: two sequential scalar updates
+        x, p = 100.0, 25.0
+        for z in (120.0, 110.0):
+            gain = p / (p + 25.0)
+            x, p = x + gain * (z - x), (1 - gain) * p
+        self.assertAlmostEqual(self.fleet.soil_moisture_mm[1], x)
+        self.assertAlmostEqual(result.variance_mm2[1], p)
+        self.assertAlmostEqual(self.fleet.soil_moisture_mm[0], 95.0)
+        self.assertEqual(self.fleet.soil_moisture_mm[2], 100.0)
+        self.assertAlmostEqual(result.innovation_mm[1], 15.0)
+        self.assertTrue(np.isnan(result.innovation_mm[2]))
+
+    def test_drops_unknown_and_stale_readings(self):
+        self.assimilator.assimilate([20], [np.datetime64("2026-05-01T10:00")], [130.0])
+        moisture = self.fleet.soil_moisture_mm.copy()
+        result = self.assimilator.assimilate(
+            [20, 99], np.array(["2026-05-01T09:00", "2026-05-01T11:00"], dtype="datetime64[m]"), [10.0, 10.0]
+        )
+        self.assertEqual((result.accepted, result.unknown, result.stale), (0, 1, 1))
+        np.testing.assert_array_equal(self.fleet.soil_moisture_mm, moisture)
+
+    def test_forecast_grows_variance_and_clamps(self):
+        self.assimilator.forecast(days=3)
+        self.assimilator.assimilate([30], [1], [400.0], noise_mm2=1.0)
+        self.assertEqual(self.fleet.soil_moisture_mm[0], 150.0)
+        np.testing.assert_allclose(self.assimilator.variance_mm2[1:], 37.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# tests/test_batch.py
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from core.batch import FieldWeather, load_weather, read_fields, run_batch
+from core.climate_store import ClimateStore
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, run_closed_loop
+from core.trajectory import read_trajectory
+
+
+def _fields(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "field_id": [f"F{i:03d}" for i in range(n)],
+        "latitude": rng.choice([35.7, 36.3], n),
+        "longitude": 51.4,
+        "soil": rng.choice(["Loam", "Clay", "Sand"], n),
+        "crop": rng.choice(["Wheat", "Corn"], n),
+        "initial_moisture_mm": rng.uniform(40.0, 100.0, n),
+    })
+
+
+def _weather(days, n):
+    rng = np.random.default_rng(1)
+    return FieldWeather(
+        dates=[f"2025-06-{d + 1:02d}" for d in range(days)],
+        et0_mm=rng.uniform(3.0, 8.0, (days, n)),
+        rainfall_mm=rng.choice([0.0, 0.0, 0.0, 12.0], (days, n)),
+    )
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_fields_validates(self):
+        path = os.path.join(self.tmp.name, "fields.csv")
+        _fields(3).drop(columns="field_id").to_csv(path, index=False)
+        self.assertEqual(list(read_fields(path)["field_id"]), [0, 1, 2])
+
+        bad = _fields(3)
+        bad.loc[1, "soil"] = "Peat"
+        bad.to_csv(path, index=False)
+        with self.assertRaises(ValueError):
+            read_fields(path)
+
+        bad = _fields(3)
+        bad.loc[2, "latitude"] = np.nan
+        bad.to_csv(path, index=False)
+        with self.assertRaisesRegex(ValueError, "latitude"):
+            read_fields(path)
+
+        _fields(0).to_csv(path, index=False)
+        with self.assertRaisesRegex(ValueError, "no fields"):
+            read_fields(path)
+
+    def test_chunks_and_processes_match_one_fleet(self):
+        fields, weather = _fields(25), _weather(20, 25)
+        trajectories = os.path.join(self.tmp.name, "trajectories")
+        summary = run_batch(fields, weather, workers=2, chunk_fields=10, trajectory_dir=trajectories)
+        with mock.patch("core.batch.DAYS_PER_BLOCK", 6):
+            inline = run_batch(fields, weather, workers=1, chunk_fields=7)
+        pd.testing.assert_frame_equal(summary, inline)
+
+        soils = {"Loam": (150.0, 60.0), "Clay": (200.0, 80.0), "Sand": (100.0, 30.0)}
+        fleet = FleetSimulator(
+            [soils[s][0] for s in fields["soil"]], [soils[s][1] for s in fields["soil"]],
+            [{"Wheat": 1.05, "Corn": 1.15}[c] for c in fields["crop"]], fields["initial_moisture_mm"]
+        )
+        expected = run_closed_loop(fleet, DecisionEngine(), weather.et0_mm, weather.rainfall_mm)
+        np.testing.assert_allclose(summary["total_irrigation_mm"], np.round(expected.irrigation_mm.sum(axis=0), 1))
+        self.assertEqual(list(summary["field_id"]), list(fields["field_id"]))
+
+        # The same forcing given per location, with each field's column in index
+        locations = FieldWeather(dates=weather.dates, et0_mm=weather.et0_mm[:, ::-1],
+                                 rainfall_mm=weather.rainfall_mm[:, ::-1], index=np.arange(25)[::-1])
+        pd.testing.assert_frame_equal(run_batch(fields, locations, workers=1, chunk_fields=10), inline)
+
+        parts = sorted(os.listdir(trajectories))
+        self.assertEqual(parts, ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"])
+        last = read_trajectory(os.path.join(trajectories, parts[-1])).to_pandas()
+        self.assertEqual(sorted(set(last["field"])), list(range(20, 25)))
+        self.assertEqual(len(last), 5 * 20)
+
+    def test_load_weather_from_climate_store(self):
+        store = ClimateStore(directory=self.tmp.name)
+        dates = [f"2020-01-{d:02d}" for d in range(1, 32)]
+        for lat in (35.7, 36.3):
+            store.write(lat, 51.4, {
+                "time": dates,
+                "temperature_2m_max": [15.0] * 31,
+                "temperature_2m_min": [2.0] * 31,
+                "precipitation_sum": [lat - 35.0] * 31,
+            })
+        fields = _fields(6)
+        weather = load_weather(fields, start_date="2020-01-05", end_date="2020-01-10", store=store, offline=True)
+        self.assertEqual(weather.et0_mm.shape, (6, 2))
+        np.testing.assert_allclose(weather.rainfall_mm[0, weather.index], np.round(fields["latitude"] - 35.0, 1))
+
+        # Both locations lie on the 0.1 degree lattice, so interpolation reads the same stored points
+        interpolated = load_weather(fields, start_date="2020-01-05", end_date="2020-01-10", store=store,
+                                    offline=True, resolution_degrees=0.1)
+        np.testing.assert_allclose(interpolated.rainfall_mm[:, interpolated.index],
+                                   weather.rainfall_mm[:, weather.index])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+# tests/test_benchmarks.py
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.run import main, recorded_payload
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_recorded_payload_tiles_days(self):
+        daily = recorded_payload(40)["daily"]
+        self.assertEqual(len(daily["time"]), 40)
+        self.assertEqual(len(daily["precipitation_sum"]), 40)
+        self.assertEqual(daily["temperature_2m_max"][16], daily["temperature_2m_max"][0])
+        self.assertEqual(len(set(daily["time"])), 40)
+
+    def test_writes_and_compares_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            args = ["--days", "20", "--fields", "10", "--members", "5", "--repeat", "1"]
+            self.assertEqual(main(args + ["--output", path]), 0)
+            with open(path, "r", encoding="utf-8") as f:
+                results = json.load(f)
+            self.assertEqual(results["scale"], {"days": 20, "fields": 10, "members": 5})
+            self.assertIn("dashboard_pipeline", results["benchmarks"])
+            self.assertEqual(main(args + ["--only", "et0_hargreaves", "--compare", path, "--tolerance", "1e9"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
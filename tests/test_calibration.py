@@ -0,0 +1,44 @@
+# tests/test_calibration.py
+import unittest
+
+import numpy as np
+
+from core.calibration import FieldObservations, SoilCalibrator, calibrate_fields
+from core.simulator import SoilTwinSimulator
+from domain.soil import SoilProfile, CropProfile
+
+
+def _observations(fc, kc, initial, seed):
+    rng = np.random.default_rng(seed)
+    days = 90
+    et0 = rng.uniform(3.0, 8.0, days)
+    rain = np.where(rng.random(days) < 0.15, rng.uniform(5.0, 40.0, days), 0.0)
+    irrigation = np.where(np.arange(days) % 10 == 0, 30.0, 0.0)
+    sim = SoilTwinSimulator(
+        soil=SoilProfile(name="True", field_capacity_mm=fc, wilting_point_mm=0.4 * fc),
+        crop=CropProfile(name="True", kc=kc),
+        initial_moisture_mm=initial
+    )
+    observed = np.array([sim.step(e, r, i).soil_moisture_mm for e, r, i in zip(et0, rain, irrigation)])
+    observed[rng.random(days) < 0.2] = np.nan
+    return FieldObservations(observed, et0, rain, irrigation)
+
+
+class TestCalibration(unittest.TestCase):
+
+    def test_recovers_parameters(self):
+        field = _observations(fc=180.0, kc=1.1, initial=120.0, seed=0)
+        result = SoilCalibrator(seed=0).calibrate(field)
+        self.assertAlmostEqual(result.soil.field_capacity_mm, 180.0, delta=2.0)
+        self.assertAlmostEqual(result.crop.kc, 1.1, delta=0.02)
+        self.assertLess(result.rmse_mm, 1.0)
+
+    def test_calibrate_fields_in_process(self):
+        fields = [_observations(120.0, 0.9, 100.0, seed=1), _observations(220.0, 1.2, 150.0, seed=2)]
+        results = calibrate_fields(fields, SoilCalibrator(seed=0), processes=1)
+        self.assertAlmostEqual(results[0].soil.field_capacity_mm, 120.0, delta=2.0)
+        self.assertAlmostEqual(results[1].crop.kc, 1.2, delta=0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
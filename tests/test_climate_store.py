@@ -0,0 +1,90 @@
+# tests/test_climate_store.py
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from core.climate_store import ClimateStore, backfill
+
+
+class _Response:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _ArchiveSession:
+    """Serves synthetic archive responses; the last lag_days of 2024 are not published yet."""
+
+    def __init__(self, lag_days=0):
+        self.calls = []
+        self.lag_days = lag_days
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append((params["latitude"], params["start_date"], params["end_date"]))
+        start = date.fromisoformat(params["start_date"])
+        days = (date.fromisoformat(params["end_date"]) - start).days + 1
+        daily = {"time": [(start + timedelta(days=i)).isoformat() for i in range(days)]}
+        for variable in params["daily"].split(","):
+            daily[variable] = [float((start + timedelta(days=i)).day) for i in range(days)]
+        if params["end_date"] == "2024-12-31" and self.lag_days:
+            for variable in daily:
+                if variable != "time":
+                    daily[variable][-self.lag_days:] = [None] * self.lag_days
+        return _Response({"elevation": 1191.0, "daily": daily})
+
+
+class TestClimateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ClimateStore(directory=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_backfill_is_chunked_by_year_and_resumable(self):
+        session = _ArchiveSession()
+        locations = [(35.7, 51.4), (-33.9, 18.4)]
+        self.assertEqual(backfill(self.store, locations, "2020-03-01", "2022-12-31", session=session), 6)
+        self.assertIn((35.7, "2020-03-01", "2020-12-31"), session.calls)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "tile=-34_18", "year=2021", "-33.90_18.40.parquet")))
+
+        # Everything stored: a rerun is purely local
+        self.assertEqual(backfill(self.store, locations, "2020-03-01", "2022-12-31", session=session), 0)
+        # Widening the range refetches the partial year over the union
+        self.assertEqual(backfill(self.store, locations[:1], "2020-01-01", "2020-12-31", session=session), 1)
+        self.assertEqual(session.calls[-1], (35.7, "2020-01-01", "2020-12-31"))
+
+    def test_query_aligns_locations(self):
+        locations = [(35.7, 51.4), (36.2, 50.1)]
+        backfill(self.store, locations, "2019-12-20", "2020-01-10", session=_ArchiveSession())
+        weather = self.store.query(locations, "2019-12-25", "2020-01-05")
+
+        self.assertEqual(weather.et0_mm.shape, (12, 2))
+        self.assertEqual(weather.dates[0], "2019-12-25")
+        self.assertEqual(weather.dates[-1], "2020-01-05")
+        np.testing.assert_allclose(weather.rainfall_mm[:, 0], [25, 26, 27, 28, 29, 30, 31, 1, 2, 3, 4, 5])
+        self.assertTrue(np.all(weather.et0_mm >= 0.0))
+
+    def test_unpublished_days_are_fetched_again(self):
+        session = _ArchiveSession(lag_days=3)
+        backfill(self.store, [(35.7, 51.4)], "2024-06-01", "2024-12-31", session=session)
+        self.assertEqual(self.store.coverage(35.7, 51.4, 2024), ("2024-06-01", "2024-12-28"))
+        self.assertEqual(self.store.missing(35.7, 51.4, "2024-06-01", "2024-12-31"), [("2024-06-01", "2024-12-31")])
+        with self.assertRaises(ValueError):
+            self.store.query([(35.7, 51.4)], "2024-12-01", "2024-12-31")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# tests/test_decimation.py
+import unittest
+
+import numpy as np
+
+from core.decimation import bucket_sums, lttb_indices, window
+
+
+class TestDecimation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange("2015-01-01", "2025-01-01", dtype="datetime64[D]")
+        self.y = np.sin(np.arange(len(self.x)) / 58.0) + rng.normal(0.0, 0.05, len(self.x))
+        self.y[1234] = 5.0
+
+    def test_lttb_keeps_ends_and_spike(self):
+        kept = lttb_indices(self.x, self.y, 500)
+        self.assertEqual(len(kept), 500)
+        self.assertEqual(kept[0], 0)
+        self.assertEqual(kept[-1], len(self.y) - 1)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertIn(1234, kept)
+
+    def test_short_series_is_kept_whole(self):
+        np.testing.assert_array_equal(lttb_indices(self.x[:100], self.y[:100], 500), np.arange(100))
+
+    def test_bucket_sums_preserve_total(self):
+        x, sums = bucket_sums(self.x, np.abs(self.y), 100)
+        self.assertEqual(len(sums), 100)
+        self.assertEqual(x[0], self.x[0])
+        self.assertAlmostEqual(sums.sum(), np.abs(self.y).sum(), places=6)
+
+    def test_window(self):
+        selected = window(self.x, np.datetime64("2020-01-01"), np.datetime64("2020-12-31"))
+        self.assertEqual(self.x[selected][0], np.datetime64("2020-01-01"))
+        self.assertEqual(len(self.x[selected]), 366)
+
+
+if __name__ == "__main__":
+    unittest.main()
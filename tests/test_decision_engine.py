@@ -1,17 +1,40 @@
 # tests/test_decision_engine.py
 import unittest
+
+import numpy as np
+
 from core.decision_engine import DecisionEngine
+from domain.models import REASON_BELOW_LOW, REASON_PROPORTIONAL, REASON_FULL
 
 class TestDecisionEngine(unittest.TestCase):
     def test_no_irrigation_below_threshold(self):
-        engine = DecisionEngine(threshold_stress=0.5)
-        decision = engine.evaluate(0.3)
+        engine = DecisionEngine(threshold_low=0.5)
+        decision = engine.evaluate(0.3, soil_moisture_mm=100.0, field_capacity_mm=150.0)
         self.assertEqual(decision.irrigation_mm, 0.0)
 
     def test_irrigation_above_threshold(self):
-        engine = DecisionEngine(threshold_stress=0.5, irrigation_mm=12.0)
-        decision = engine.evaluate(0.7)
+        engine = DecisionEngine(threshold_low=0.3, threshold_high=0.5, max_irrigation_mm=12.0)
+        decision = engine.evaluate(0.7, soil_moisture_mm=60.0, field_capacity_mm=150.0)
         self.assertEqual(decision.irrigation_mm, 12.0)
 
+
+class TestDecisionEngineBatch(unittest.TestCase):
+    def test_batch_matches_evaluate(self):
+        engine = DecisionEngine()
+        rng = np.random.default_rng(1)
+        stress = np.concatenate([rng.uniform(0.0, 1.0, 2000), [0.3, 0.6, 0.45]])
+        moisture = rng.uniform(0.0, 150.0, stress.size)
+        batch = engine.evaluate_batch(stress, moisture, 150.0)
+        for i in range(stress.size):
+            decision = engine.evaluate(float(stress[i]), float(moisture[i]), 150.0)
+            self.assertEqual(batch.irrigation_mm[i], decision.irrigation_mm)
+            self.assertEqual(batch.reason(i), decision.reason)
+
+    def test_reason_codes(self):
+        engine = DecisionEngine(threshold_low=0.3, threshold_high=0.6, max_irrigation_mm=15.0)
+        batch = engine.evaluate_batch([0.1, 0.5, 0.9], [140.0, 100.0, 60.0], 150.0)
+        np.testing.assert_array_equal(batch.reason_code, [REASON_BELOW_LOW, REASON_PROPORTIONAL, REASON_FULL])
+        np.testing.assert_array_equal(batch.irrigation_mm, [0.0, 15.0, 15.0])
+
 if __name__ == "__main__":
     unittest.main()
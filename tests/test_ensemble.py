@@ -0,0 +1,58 @@
+# tests/test_ensemble.py
+import unittest
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.ensemble import RainOccurrenceFlip, run_ensemble
+from core.fleet import FleetSimulator, run_closed_loop
+from core.simulator import SoilTwinSimulator
+from domain.soil import LOAM, WHEAT
+
+ET0 = [5.2, 6.1, 5.8, 4.9, 6.3, 6.0, 5.5, 5.1, 4.7, 5.9]
+RAIN = [0.0, 0.0, 12.0, 0.0, 0.0, 3.1, 0.0, 0.0, 0.0, 0.0]
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def test_closed_loop_matches_scalar_loop(self):
+        engine = DecisionEngine()
+        sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=80.0)
+        expected = []
+        for et0, rain in zip(ET0, RAIN):
+            decision = engine.evaluate(sim._calculate_stress(), sim.soil_moisture_mm, LOAM.field_capacity_mm)
+            state = sim.step(et0, rain, decision.irrigation_mm)
+            expected.append((state.soil_moisture_mm, decision.irrigation_mm))
+
+        fleet = FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, [80.0])
+        trajectory = run_closed_loop(fleet, engine, ET0, RAIN)
+        np.testing.assert_array_equal(trajectory.soil_moisture_mm[:, 0], [m for m, _ in expected])
+        np.testing.assert_array_equal(trajectory.irrigation_mm[:, 0], [i for _, i in expected])
+
+    def test_zero_noise_collapses_bands(self):
+        result = run_ensemble(LOAM, WHEAT, 80.0, ET0, RAIN, members=50, et0_noise=(), rain_noise=(), seed=1)
+        np.testing.assert_allclose(result.band("soil_moisture_mm", 5), result.band("soil_moisture_mm", 95))
+
+    def test_rejects_empty_ensemble(self):
+        with self.assertRaises(ValueError):
+            run_ensemble(LOAM, WHEAT, 80.0, ET0, RAIN, members=0)
+        result = run_ensemble(LOAM, WHEAT, 80.0, ET0, RAIN, members=1, seed=3, processes=2)
+        self.assertEqual(result.soil_moisture_mm.shape, (5, len(ET0)))
+
+    def test_bands_are_ordered_and_reproducible(self):
+        first = run_ensemble(LOAM, WHEAT, 80.0, ET0, RAIN, members=500, seed=7)
+        second = run_ensemble(LOAM, WHEAT, 80.0, ET0, RAIN, members=500, seed=7)
+        np.testing.assert_array_equal(first.soil_moisture_mm, second.soil_moisture_mm)
+        self.assertEqual(first.soil_moisture_mm.shape, (5, len(ET0)))
+        self.assertTrue(np.all(np.diff(first.stress_index, axis=0) >= 0))
+
+    def test_rain_flip_probabilities(self):
+        rng = np.random.default_rng(0)
+        rain = np.tile([0.0, 10.0], (10000, 1))
+        flipped = RainOccurrenceFlip(p_wet_to_dry=0.3, p_dry_to_wet=0.0).perturb(rain, rng)
+        self.assertTrue(np.all(flipped[:, 0] == 0.0))
+        self.assertAlmostEqual(np.mean(flipped[:, 1] == 0.0), 0.3, delta=0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
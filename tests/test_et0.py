@@ -0,0 +1,70 @@
+# tests/test_et0.py
+import unittest
+
+import numpy as np
+
+from core.et0 import (
+    compute_et0,
+    extraterrestrial_radiation,
+    fill_missing,
+    hargreaves,
+    penman_monteith,
+    wind_speed_2m,
+)
+
+
+class TestEt0(unittest.TestCase):
+
+    def test_extraterrestrial_radiation_fao56_example_8(self):
+        # 20°S on 3 September
+        self.assertAlmostEqual(float(extraterrestrial_radiation(-20.0, 246)), 32.2, places=1)
+
+    def test_penman_monteith_fao56_example_18(self):
+        # Brussels, 6 July
+        et0 = penman_monteith(
+            tmax=21.5, tmin=12.3, shortwave_radiation=22.07, rh_max=84.0, rh_min=63.0,
+            wind_speed_2m=wind_speed_2m(10 / 3.6, 10.0), latitude_deg=50.8,
+            day_of_year=187, elevation_m=100.0
+        )
+        self.assertAlmostEqual(float(et0), 3.9, delta=0.05)
+
+    def test_hargreaves_broadcasts_days_by_locations(self):
+        tmax = np.array([[30.0, 25.0, 35.0], [31.0, 26.0, 34.0]])
+        tmin = tmax - 12.0
+        latitude = np.array([10.0, 35.0, 50.0])
+        doy = np.array([[180], [181]])
+        et0 = hargreaves(tmax, tmin, latitude, doy)
+        self.assertEqual(et0.shape, (2, 3))
+        self.assertAlmostEqual(et0[1, 1], float(hargreaves(26.0, 14.0, 35.0, 181)))
+
+    def test_fill_missing_interpolates_and_keeps_empty_series(self):
+        values = np.array([[np.nan, np.nan], [2.0, np.nan], [np.nan, np.nan], [4.0, np.nan]])
+        filled = fill_missing(values)
+        np.testing.assert_array_equal(filled[:, 0], [2.0, 2.0, 3.0, 4.0])
+        self.assertTrue(np.isnan(filled[:, 1]).all())
+
+    def test_compute_et0_registry(self):
+        daily = {
+            "time": ["2025-07-01", "2025-07-02"],
+            "temperature_2m_max": [32.0, None],
+            "temperature_2m_min": [18.0, 20.0],
+        }
+        et0 = compute_et0("hargreaves", daily, latitude=35.7)
+        self.assertTrue(np.all(et0 > 0))
+        with self.assertRaises(ValueError):
+            compute_et0("unknown", daily, latitude=35.7)
+
+    def test_compute_et0_rejects_a_location_without_data(self):
+        daily = {
+            "time": ["2025-07-01", "2025-07-02"],
+            "temperature_2m_max": np.array([[32.0, 30.0, np.nan], [None, 31.0, np.nan]], dtype=np.float64),
+            "temperature_2m_min": np.array([[18.0, 17.0, 15.0], [20.0, 19.0, 16.0]]),
+        }
+        with self.assertRaisesRegex(ValueError, r"temperature_2m_max.*\[2\]"):
+            compute_et0("hargreaves", daily, latitude=np.array([35.7, 36.0, 36.3]))
+        daily["temperature_2m_max"][:, 2] = 33.0
+        self.assertTrue(np.all(compute_et0("hargreaves", daily, latitude=np.array([35.7, 36.0, 36.3])) > 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
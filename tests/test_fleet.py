@@ -0,0 +1,74 @@
+# tests/test_fleet.py
+import unittest
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+from core.simulator import SoilTwinSimulator
+from domain.soil import SoilProfile, CropProfile, LOAM, WHEAT
+
+
+class TestFleetSimulator(unittest.TestCase):
+
+    def test_matches_scalar_simulator(self):
+        rng = np.random.default_rng(0)
+        soils = [
+            LOAM,
+            SoilProfile(name="Clay", field_capacity_mm=200.0, wilting_point_mm=80.0),
+            SoilProfile(name="Sand", field_capacity_mm=100.0, wilting_point_mm=30.0),
+        ] * 4
+        crops = [WHEAT, CropProfile(name="Corn", kc=1.15)] * 6
+        initial = rng.uniform(0.0, 220.0, size=len(soils))
+
+        fleet = FleetSimulator.from_profiles(soils, crops, initial)
+        twins = [
+            SoilTwinSimulator(soil=s, crop=c, initial_moisture_mm=m)
+            for s, c, m in zip(soils, crops, initial)
+        ]
+
+        for _ in range(30):
+            et0 = rng.uniform(0.0, 9.0, size=len(twins))
+            rain = rng.choice([0.0, 0.0, 3.5, 25.0], size=len(twins))
+            irrigation = rng.choice([0.0, 12.5], size=len(twins))
+            batch = fleet.step(et0, rain, irrigation)
+            for i, twin in enumerate(twins):
+                state = twin.step(et0[i], rain[i], irrigation[i])
+                self.assertEqual(batch.day[i], state.day)
+                self.assertEqual(batch.soil_moisture_mm[i], state.soil_moisture_mm)
+                self.assertEqual(batch.stress_index[i], state.stress_index)
+                self.assertEqual(batch.memory_factor[i], state.memory_factor)
+                self.assertEqual(batch.soil_health_score[i], state.soil_health_score)
+
+    def test_scalar_forcing_broadcasts(self):
+        fleet = FleetSimulator(150.0, 60.0, 1.05, np.full(5, 120.0))
+        state = fleet.step(et0_mm=5.0, rainfall_mm=0.0, irrigation_mm=0.0)
+        self.assertEqual(state.soil_moisture_mm.shape, (5,))
+        np.testing.assert_array_equal(state.day, np.ones(5))
+
+    def test_fast_forward_matches_stepping(self):
+        rng = np.random.default_rng(3)
+        et0 = rng.uniform(0.0, 9.0, (400, 6))
+        rain = rng.choice([0.0, 0.0, 5.0, 40.0], (400, 6))
+        for max_fields in (FleetSimulator.SCAN_MAX_FIELDS, 0):
+            fleet = FleetSimulator([150.0, 100.0] * 3, [60.0, 30.0] * 3, 1.05, rng.uniform(0.0, 150.0, 6))
+            fleet.SCAN_MAX_FIELDS = max_fields
+            stepped = fleet.copy()
+            trajectory = fleet.fast_forward(et0, rain, irrigation_mm=1.5)
+            for d in range(len(et0)):
+                state = stepped.step(et0[d], rain[d], 1.5)
+                np.testing.assert_array_equal(trajectory.day[d], state.day)
+                np.testing.assert_allclose(trajectory.soil_moisture_mm[d], state.soil_moisture_mm, atol=1e-9)
+                np.testing.assert_allclose(trajectory.memory_factor[d], state.memory_factor, atol=1e-9)
+                np.testing.assert_allclose(trajectory.soil_health_score[d], state.soil_health_score, atol=1e-7)
+            np.testing.assert_allclose(fleet.soil_moisture_mm, stepped.soil_moisture_mm, atol=1e-9)
+
+    def test_fast_forward_final_state(self):
+        fleet = FleetSimulator(150.0, 60.0, 1.05, np.full(4, 120.0))
+        state = fleet.fast_forward(np.full(30, 4.0), np.zeros(30), return_trajectory=False)
+        self.assertEqual(state.soil_moisture_mm.shape, (4,))
+        np.testing.assert_array_equal(fleet.day, np.full(4, 30))
+        np.testing.assert_allclose(state.soil_moisture_mm, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+# tests/test_geocoder.py
+import unittest
+
+import numpy as np
+
+from core.geocoder import Gazetteer, ReverseGeocoder, UNKNOWN_REGION, _chord_to_km, _unit_vectors
+
+
+class TestGeocoder(unittest.TestCase):
+
+    def test_bundled_places_resolve(self):
+        geocoder = ReverseGeocoder()
+        self.assertEqual(geocoder.region_name(35.6892, 51.3890), "Tehran")
+        self.assertEqual(geocoder.region_name(29.60, 52.55), "Shiraz")
+        self.assertEqual(geocoder.region_name(0.0, -140.0), UNKNOWN_REGION)
+
+    def test_nearest_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        gazetteer = Gazetteer(
+            names=[str(i) for i in range(500)],
+            countries=[""] * 500,
+            latitudes=rng.uniform(-60, 60, 500),
+            longitudes=rng.uniform(-180, 180, 500),
+        )
+        for lat, lon in zip(rng.uniform(-89, 89, 200), rng.uniform(-180, 180, 200)):
+            index, distance_km = gazetteer.nearest(lat, lon)
+            chords = np.linalg.norm(gazetteer.points - _unit_vectors(lat, lon), axis=1)
+            self.assertEqual(index, int(np.argmin(chords)))
+            self.assertAlmostEqual(distance_km, _chord_to_km(float(chords.min())))
+
+
+if __name__ == "__main__":
+    unittest.main()
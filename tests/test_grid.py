@@ -0,0 +1,80 @@
+# tests/test_grid.py
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, run_closed_loop
+from core.grid import GridSpec, UniformWeather, create_grid, open_grid, run_grid
+from core.snapshot import load_fleet
+
+
+def _field_capacity(latitude, longitude):
+    return 120.0 + 40.0 * (longitude - 51.0)
+
+
+class TestGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.domain = os.path.join(self.tmp.name, "domain")
+        self.spec = GridSpec(rows=10, cols=7, north=36.0, west=51.0, cell_degrees=0.1, tile_rows=4, tile_cols=3)
+        create_grid(self.domain, self.spec, _field_capacity, 50.0, 1.1, lambda lat, lon: 60.0 + 10.0 * (36.0 - lat))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tiles_cover_grid(self):
+        cells = np.zeros((self.spec.rows, self.spec.cols), dtype=int)
+        for rows, cols in self.spec.tiles():
+            cells[rows, cols] += 1
+        self.assertEqual(len(self.spec.tiles()), 9)
+        self.assertTrue((cells == 1).all())
+        self.assertEqual(open_grid(self.domain), self.spec)
+
+    def test_tiles_and_processes_match_one_fleet(self):
+        rng = np.random.default_rng(0)
+        weather = UniformWeather(rng.uniform(3.0, 8.0, 15), rng.choice([0.0, 0.0, 10.0], 15))
+        latitude, longitude = self.spec.cell_centers()
+        fleet = FleetSimulator(_field_capacity(latitude, longitude), np.full(latitude.shape, 50.0),
+                               np.full(latitude.shape, 1.1), 60.0 + 10.0 * (36.0 - latitude))
+        shape = (15,) + latitude.shape
+        expected = run_closed_loop(fleet, DecisionEngine(), np.broadcast_to(weather.et0_mm[:, None, None], shape),
+                                   np.broadcast_to(weather.rainfall_mm[:, None, None], shape))
+
+        done = []
+        paths = run_grid(self.domain, weather, os.path.join(self.tmp.name, "run"), workers=2,
+                         progress=lambda n, total: done.append((n, total)))
+        self.assertEqual(done[-1], (9, 9))
+        np.testing.assert_allclose(np.load(paths["stress_index"]), expected.stress_index, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(np.load(paths["total_irrigation_mm"]), expected.irrigation_mm.sum(axis=0), rtol=1e-5)
+        np.testing.assert_allclose(load_fleet(os.path.join(self.domain, "state.snap")).soil_moisture_mm,
+                                   fleet.soil_moisture_mm)
+
+        # The snapshot was advanced in place, so a second run continues from it
+        again = run_grid(self.domain, weather, os.path.join(self.tmp.name, "again"), workers=1, daily=False)
+        self.assertNotIn("stress_index", again)
+        state = load_fleet(os.path.join(self.domain, "state.snap"))
+        self.assertTrue((np.asarray(state.day) == 30).all())
+        np.testing.assert_array_equal(state.field_capacity_mm, _field_capacity(latitude, longitude))
+
+    def test_failed_run_leaves_state_unchanged(self):
+        class FailingWeather(UniformWeather):
+            def tile(self, spec, rows, cols):
+                if rows.start > 0:
+                    raise RuntimeError("no weather")
+                return super().tile(spec, rows, cols)
+
+        with self.assertRaises(RuntimeError):
+            run_grid(self.domain, FailingWeather(np.full(5, 5.0), 0.0), os.path.join(self.tmp.name, "run"), workers=1)
+        state = load_fleet(os.path.join(self.domain, "state.snap"))
+        self.assertTrue((np.asarray(state.day) == 0).all())
+
+        run_grid(self.domain, UniformWeather(np.full(5, 5.0), 0.0), os.path.join(self.tmp.name, "run"), workers=1)
+        self.assertTrue((np.asarray(load_fleet(os.path.join(self.domain, "state.snap")).day) == 5).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# tests/test_interpolation.py
+import unittest
+
+import numpy as np
+
+from core.interpolation import LatticeWeatherFetcher, lattice_weights
+from core.weather_bulk import BulkWeather
+
+
+def _plane(points):
+    points = np.asarray(points, dtype=np.float64)
+    return 2.0 + 3.0 * (points[:, 0] - 35.0) - 1.5 * (points[:, 1] - 51.0)
+
+
+class TestLatticeWeights(unittest.TestCase):
+
+    def test_bilinear_reproduces_a_plane(self):
+        rng = np.random.default_rng(0)
+        latitude, longitude = rng.uniform(35.0, 36.0, 50), rng.uniform(51.0, 52.0, 50)
+        weights = lattice_weights(latitude, longitude, 0.25)
+        self.assertEqual(weights.index.shape, (50, 4))
+        np.testing.assert_allclose(weights.weight.sum(axis=1), 1.0)
+        np.testing.assert_allclose(weights.apply(_plane(weights.points)),
+                                   _plane(np.stack([latitude, longitude], axis=-1)))
+
+    def test_locations_on_the_lattice_need_one_point(self):
+        for method in ("bilinear", "idw", "nearest"):
+            weights = lattice_weights([35.7, 35.7], [51.4, 51.4], 0.1, method)
+            self.assertEqual(weights.points, [(35.7, 51.4)])
+            np.testing.assert_allclose(weights.apply(np.array([[4.0]])), [[4.0, 4.0]])
+
+    def test_idw_weights_nearest_points_most(self):
+        weights = lattice_weights([35.71], [51.42], 0.1, "idw")
+        self.assertEqual(weights.index.shape, (1, 4))
+        np.testing.assert_allclose(weights.weight.sum(), 1.0)
+        heaviest = weights.points[weights.index[0, weights.weight[0].argmax()]]
+        self.assertEqual(heaviest, (35.7, 51.4))
+        with self.assertRaises(ValueError):
+            lattice_weights([35.7], [51.4], 0.1, "kriging")
+
+
+class TestLatticeWeatherFetcher(unittest.TestCase):
+
+    def test_fetches_lattice_points_once(self):
+        requested = []
+
+        def fetch(points):
+            requested.append(list(points))
+            values = np.tile(_plane(points), (3, 1))
+            return BulkWeather(dates=["d0", "d1", "d2"], et0_mm=values, rainfall_mm=values * 0 + 1.0)
+
+        rng = np.random.default_rng(1)
+        locations = np.stack([rng.uniform(35.71, 35.79, 1000), rng.uniform(51.41, 51.49, 1000)], axis=-1)
+        weather = LatticeWeatherFetcher(fetch, resolution_degrees=0.1).fetch(locations)
+
+        self.assertEqual(len(requested), 1)
+        self.assertEqual(len(requested[0]), 4)
+        self.assertEqual(weather.et0_mm.shape, (3, 1000))
+        np.testing.assert_allclose(weather.et0_mm[0], _plane(locations))
+        np.testing.assert_allclose(weather.rainfall_mm, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
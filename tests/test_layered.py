@@ -0,0 +1,65 @@
+# tests/test_layered.py
+import unittest
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+from core.layered import LayeredFleetSimulator, solve_tridiagonal
+from core.simulator import SoilTwinSimulator
+from domain.soil import LayeredSoilProfile, LOAM, WHEAT
+
+
+class TestLayeredFleetSimulator(unittest.TestCase):
+
+    def test_single_layer_matches_bucket(self):
+        rng = np.random.default_rng(0)
+        fc = rng.uniform(100.0, 200.0, 50)
+        initial = rng.uniform(0.0, 200.0, 50)
+        bucket = FleetSimulator(fc, 0.4 * fc, 1.05, initial)
+        layered = LayeredFleetSimulator([fc], [0.4 * fc], 1.05, initial)
+        for _ in range(30):
+            et0 = rng.uniform(0.0, 9.0, 50)
+            rain = rng.choice([0.0, 3.5, 40.0], 50)
+            expected = bucket.step(et0, rain, 5.0)
+            state = layered.step(et0, rain, 5.0)
+            np.testing.assert_array_equal(state.soil_moisture_mm, expected.soil_moisture_mm)
+            np.testing.assert_array_equal(state.soil_health_score, expected.soil_health_score)
+
+    def test_water_balance_closes(self):
+        soil = LayeredSoilProfile.from_profile(LOAM, 10, drainage_rate=0.5, redistribution_mm=20.0)
+        fleet = LayeredFleetSimulator.from_profiles([soil] * 4, [WHEAT] * 4, [40.0, 90.0, 150.0, 0.0])
+        before = fleet.soil_moisture_mm
+        fleet.step(et0_mm=0.0, rainfall_mm=[0.0, 60.0, 120.0, 10.0], irrigation_mm=0.0)
+        np.testing.assert_allclose(
+            fleet.soil_moisture_mm + fleet.deep_drainage_mm,
+            before + [0.0, 60.0, 120.0, 10.0]
+        )
+        self.assertTrue(np.all(fleet.layer_moisture_mm >= 0.0))
+        self.assertGreater(fleet.deep_drainage_mm[2], 0.0)
+        # Rain on a dry profile is pulled down from the top layer
+        self.assertGreater(fleet.layer_moisture_mm[1, 3], 0.0)
+
+    def test_tridiagonal_solver_matches_dense(self):
+        rng = np.random.default_rng(2)
+        lower, upper = rng.uniform(-1.0, 0.0, (2, 6, 3))
+        diag = 3.0 + rng.uniform(0.0, 1.0, (6, 3))
+        rhs = rng.uniform(0.0, 10.0, (6, 3))
+        x = solve_tridiagonal(lower, diag, upper, rhs)
+        for j in range(3):
+            matrix = np.diag(diag[:, j]) + np.diag(lower[1:, j], -1) + np.diag(upper[:-1, j], 1)
+            np.testing.assert_allclose(x[:, j], np.linalg.solve(matrix, rhs[:, j]))
+
+    def test_scalar_simulator_with_layered_profile(self):
+        soil = LayeredSoilProfile.from_profile(LOAM, 3, root_fraction=[0.6, 0.3, 0.1])
+        twin = SoilTwinSimulator(soil=soil, crop=WHEAT, initial_moisture_mm=120.0)
+        fleet = LayeredFleetSimulator.from_profiles([soil], [WHEAT], [120.0])
+        for rain in (0.0, 80.0, 0.0):
+            state = twin.step(5.0, rain, 0.0)
+            expected = fleet.step(5.0, rain, 0.0)
+            self.assertEqual(state.soil_moisture_mm, expected.soil_moisture_mm[0])
+            self.assertEqual(state.stress_index, expected.stress_index[0])
+        self.assertLessEqual(state.soil_moisture_mm, soil.field_capacity_mm)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# tests/test_metrics.py
+import json
+import os
+import tempfile
+import unittest
+
+from core.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics()
+        metrics.count("weather_cache_hits")
+        with metrics.timer("simulation"):
+            pass
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["counters"], snapshot["timers"]), ({}, {}))
+
+    def test_counters_timers_and_derived_rates(self):
+        metrics = Metrics(enabled=True)
+        metrics.count("weather_cache_hits", 3)
+        metrics.count("weather_cache_misses")
+        metrics.count("simulated_days", 100)
+        metrics.observe("simulation", 0.5)
+        metrics.observe("simulation", 1.5)
+        metrics.register_collector("cache", lambda: {"result_cache_hits": 1, "result_cache_misses": 1})
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["timers"]["simulation"], {"count": 2, "total_s": 2.0, "max_s": 1.5, "mean_s": 1.0})
+        self.assertEqual(snapshot["derived"]["weather_cache_hit_rate"], 0.75)
+        self.assertEqual(snapshot["derived"]["result_cache_hit_rate"], 0.5)
+        self.assertEqual(snapshot["derived"]["simulated_days_per_second"], 50.0)
+
+        text = metrics.to_prometheus()
+        self.assertIn("soiltwin_weather_cache_hits_total 3.0\n", text)
+        self.assertIn("soiltwin_simulation_seconds_count 2\n", text)
+        self.assertIn("# TYPE soiltwin_simulation_seconds summary\n", text)
+
+    def test_write_json(self):
+        metrics = Metrics(enabled=True)
+        metrics.count("decisions", 10)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            metrics.write_json(path)
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["counters"], {"decisions": 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
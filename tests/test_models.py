@@ -0,0 +1,53 @@
+# tests/test_models.py
+import dataclasses
+import unittest
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator
+from core.simulator import SoilTwinSimulator
+from domain.models import SoilState, SoilStateBatch
+from domain.soil import LOAM, WHEAT
+
+
+class TestModels(unittest.TestCase):
+
+    def test_records_are_slotted_and_frozen(self):
+        state = SoilState(day=1, soil_moisture_mm=100.0, stress_index=0.2, memory_factor=0.06, soil_health_score=94.0)
+        self.assertFalse(hasattr(state, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            state.day = 2
+
+    def test_state_batch_rows_behave_like_states(self):
+        sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=120.0)
+        states = [sim.step(6.0, 0.0, 0.0) for _ in range(5)]
+        batch = SoilStateBatch.from_states(states)
+
+        self.assertEqual(batch.records.itemsize, 40)
+        self.assertEqual(list(batch), states)
+        self.assertEqual(batch[2].soil_moisture_mm, states[2].soil_moisture_mm)
+        self.assertEqual(batch[3].to_state(), states[3])
+        np.testing.assert_array_equal(batch.day, [1, 2, 3, 4, 5])
+
+        batch[0] = states[4]
+        self.assertEqual(batch[0], states[4])
+        self.assertEqual(len(batch[1:3]), 2)
+
+    def test_fleet_state_and_decision_views(self):
+        fleet = FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, [150.0, 90.0, 60.0])
+        batch = SoilStateBatch.from_fleet_state(fleet.step(5.0, 0.0, 0.0))
+        np.testing.assert_array_equal(batch.soil_moisture_mm, fleet.soil_moisture_mm)
+
+        engine = DecisionEngine()
+        decisions = engine.evaluate_batch(batch.stress_index, batch.soil_moisture_mm, LOAM.field_capacity_mm)
+        for i, view in enumerate(decisions):
+            expected = engine.evaluate(batch[i].stress_index, batch[i].soil_moisture_mm, LOAM.field_capacity_mm)
+            self.assertEqual(view, expected)
+
+        records = decisions.to_records()
+        np.testing.assert_array_equal(records["irrigation_mm"], decisions.irrigation_mm)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_optimizer.py
+import itertools
+import unittest
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+from core.optimizer import IrrigationOptimizer
+from core.simulator import SoilTwinSimulator
+from domain.soil import LOAM, WHEAT
+
+
+class TestIrrigationOptimizer(unittest.TestCase):
+
+    def test_no_irrigation_when_wet(self):
+        fleet = FleetSimulator(150.0, 60.0, 1.05, [150.0, 140.0])
+        plan = IrrigationOptimizer(max_stress=0.3).plan(fleet, [3.0] * 5, [5.0] * 5)
+        np.testing.assert_array_equal(plan.irrigation_mm, np.zeros((5, 2)))
+
+    def test_rejects_empty_horizon(self):
+        fleet = FleetSimulator(150.0, 60.0, 1.05, [120.0, 80.0])
+        with self.assertRaises(ValueError):
+            IrrigationOptimizer().plan(fleet, [], [])
+
+    def test_matches_brute_force(self):
+        et0 = [7.0, 7.5, 6.5, 8.0]
+        rain = [0.0, 0.0, 4.0, 0.0]
+        optimizer = IrrigationOptimizer(max_stress=0.3, irrigation_step_mm=5.0, grid_points=301)
+
+        best = np.inf
+        for schedule in itertools.product(optimizer.actions, repeat=len(et0)):
+            sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=118.0)
+            states = [sim.step(e, r, a) for e, r, a in zip(et0, rain, schedule)]
+            if all(state.stress_index <= 0.3 for state in states):
+                best = min(best, sum(schedule))
+
+        fleet = FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, [118.0])
+        plan = optimizer.plan(fleet, et0, rain)
+        self.assertTrue(np.all(plan.stress_index <= 0.3))
+        self.assertEqual(plan.total_irrigation_mm[0], best)
+        self.assertEqual(fleet.day[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_result_cache.py
+import threading
+import time
+import unittest
+
+from core.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: -1), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: -2), -2)
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(ttl_seconds=0.0)
+        cache.get_or_compute("a", lambda: 1)
+        time.sleep(0.01)
+        self.assertEqual(cache.get_or_compute("a", lambda: 2), 2)
+
+    def test_single_flight(self):
+        cache = ResultCache()
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow))) for _ in range(8)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 8)
+
+    def test_errors_are_shared_but_not_cached(self):
+        cache = ResultCache()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_compute("k", fail)
+        self.assertEqual(cache.get_or_compute("k", lambda: 1), 1)
+
+    def test_interrupted_leader_hands_over_to_a_waiter(self):
+        cache = ResultCache()
+        started = threading.Event()
+        calls = []
+
+        class Rerun(BaseException):
+            pass
+
+        def interrupted():
+            calls.append("leader")
+            started.set()
+            time.sleep(0.05)
+            raise Rerun()
+
+        def leader():
+            with self.assertRaises(Rerun):
+                cache.get_or_compute("k", interrupted)
+
+        def recompute():
+            calls.append("waiter")
+            return "value"
+
+        results = []
+        first = threading.Thread(target=leader)
+        first.start()
+        started.wait()
+        waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", recompute)))
+                   for _ in range(4)]
+        for thread in waiters:
+            thread.start()
+        for thread in [first] + waiters:
+            thread.join()
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
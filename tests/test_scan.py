@@ -0,0 +1,34 @@
+# tests/test_scan.py
+import unittest
+
+import numpy as np
+
+from core.scan import clamped_cumsum, exponential_filter
+
+
+class TestScan(unittest.TestCase):
+
+    def test_clamped_cumsum_matches_loop(self):
+        rng = np.random.default_rng(0)
+        increments = rng.normal(0.0, 20.0, (600, 3))
+        upper = np.array([50.0, 100.0, 150.0])
+        values = np.concatenate(list(clamped_cumsum(increments, [0.0, 80.0, 200.0], upper, block_days=64)))
+
+        x = np.array([0.0, 80.0, 200.0])
+        for t in range(len(increments)):
+            x = np.clip(x + increments[t], 0.0, upper)
+            np.testing.assert_allclose(values[t], x, atol=1e-9)
+
+    def test_exponential_filter_matches_recurrence(self):
+        rng = np.random.default_rng(1)
+        values = rng.uniform(0.0, 1.0, (256, 2))
+        filtered = exponential_filter(values, [0.5, 0.0], 0.7, 0.3)
+
+        m = np.array([0.5, 0.0])
+        for t in range(len(values)):
+            m = 0.7 * m + 0.3 * values[t]
+            np.testing.assert_allclose(filtered[t], m, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
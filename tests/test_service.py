@@ -0,0 +1,110 @@
+# tests/test_service.py
+import asyncio
+import json
+import unittest
+
+from core.decision_engine import DecisionEngine
+from core.service import DecisionService
+from core.simulator import SoilTwinSimulator
+from domain.soil import LOAM, WHEAT
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, json.loads(content) if b"application/json" in head else content.decode()
+
+
+class TestDecisionService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.service = DecisionService(max_delay_s=0.005)
+        self.server = await self.service.start(port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.service.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_concurrent_decisions_are_batched(self):
+        for i in range(50):
+            status, _ = await _request(self.port, "PUT", f"/fields/f{i}",
+                                       {"soil": "Loam", "crop": "Wheat", "initial_moisture_mm": 60.0 + 2 * i})
+            self.assertEqual(status, 200)
+
+        responses = await asyncio.gather(*(
+            _request(self.port, "POST", "/decide", {"field_id": f"f{i}"}) for i in range(50)
+        ))
+        engine = DecisionEngine()
+        for i, (status, decision) in enumerate(responses):
+            twin = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=60.0 + 2 * i)
+            expected = engine.evaluate(twin._calculate_stress(), twin.soil_moisture_mm, LOAM.field_capacity_mm)
+            self.assertEqual(status, 200)
+            self.assertEqual(decision["irrigation_mm"], expected.irrigation_mm)
+            self.assertEqual(decision["reason"], expected.reason)
+        self.assertLess(self.service.batches, 50)
+
+        status, stats = await _request(self.port, "GET", "/stats")
+        self.assertEqual(stats["requests"], 50)
+        self.assertIsNotNone(stats["p99_ms"])
+
+    async def test_simulate_keeps_state_and_order(self):
+        await _request(self.port, "PUT", "/fields/a", {"soil": "Loam", "crop": "Wheat", "initial_moisture_mm": 120.0})
+        # Two days for the same field in one batch advance it twice, in order
+        first, second = await asyncio.gather(
+            _request(self.port, "POST", "/simulate", {"field_id": "a", "et0_mm": 5.0, "irrigation_mm": 0.0}),
+            _request(self.port, "POST", "/simulate", {"field_id": "a", "et0_mm": 4.0, "rainfall_mm": 2.0}),
+        )
+        twin = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=120.0)
+        twin.step(5.0, 0.0, 0.0)
+        irrigation = DecisionEngine().evaluate(twin._calculate_stress(), twin.soil_moisture_mm, 150.0).irrigation_mm
+        expected = twin.step(4.0, 2.0, irrigation)
+
+        self.assertEqual(second[1]["day"], 2)
+        self.assertEqual(second[1]["irrigation_mm"], irrigation)
+        self.assertAlmostEqual(second[1]["soil_moisture_mm"], expected.soil_moisture_mm)
+        status, state = await _request(self.port, "GET", "/fields/a")
+        self.assertEqual(state["day"], 2)
+
+    async def test_rejects_bad_requests(self):
+        self.assertEqual((await _request(self.port, "POST", "/decide", {"field_id": "nope"}))[0], 404)
+        await _request(self.port, "PUT", "/fields/a", {"soil": "Loam", "crop": "Wheat"})
+        self.assertEqual((await _request(self.port, "POST", "/simulate", {"field_id": "a"}))[0], 400)
+        self.assertEqual((await _request(self.port, "PUT", "/fields/b", {"soil": "Peat", "crop": "Wheat"}))[0], 400)
+        self.assertEqual((await _request(self.port, "GET", "/decide"))[0], 405)
+
+        # json.dumps writes NaN/Infinity literals, which json.loads accepts
+        for value in (float("nan"), float("inf"), "-Infinity"):
+            status, _ = await _request(self.port, "POST", "/simulate", {"field_id": "a", "et0_mm": value})
+            self.assertEqual(status, 400)
+        status, _ = await _request(self.port, "POST", "/decide", {"field_id": "a", "soil_moisture_mm": float("nan")})
+        self.assertEqual(status, 400)
+        status, state = await _request(self.port, "GET", "/fields/a")
+        self.assertEqual(state["day"], 0)
+
+    async def test_decisions_for_one_field_use_their_own_readings(self):
+        await _request(self.port, "PUT", "/fields/a", {"soil": "Loam", "crop": "Wheat", "initial_moisture_mm": 140.0})
+        self.service.max_delay_s = 0.05
+        dry, wet = await asyncio.gather(
+            _request(self.port, "POST", "/decide", {"field_id": "a", "soil_moisture_mm": 70.0}),
+            _request(self.port, "POST", "/decide", {"field_id": "a", "soil_moisture_mm": 145.0}),
+        )
+        self.assertEqual(self.service.batches, 1)
+        self.assertEqual(dry[1]["soil_moisture_mm"], 70.0)
+        self.assertGreater(dry[1]["irrigation_mm"], 0.0)
+        self.assertEqual(wet[1]["soil_moisture_mm"], 145.0)
+        self.assertEqual(wet[1]["irrigation_mm"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
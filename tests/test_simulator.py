@@ -1,5 +1,8 @@
 # tests/test_simulator.py
 import unittest
+import numpy as np
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, run_closed_loop
 from core.simulator import SoilTwinSimulator
 from domain.soil import LOAM, WHEAT
 
@@ -16,5 +19,36 @@ class TestSoilTwinSimulator(unittest.TestCase):
         states = [sim.step(5.0, 0.0, 0.0) for _ in range(3)]
         self.assertTrue(states[-1].memory_factor >= states[0].memory_factor)
 
+    def test_fast_forward_matches_step(self):
+        et0 = [5.0, 6.0, 2.0, 7.5] * 50
+        rain = [0.0, 30.0, 0.0, 4.0] * 50
+        fast = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=100.0)
+        slow = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=100.0)
+        trajectory = fast.fast_forward(et0, rain)
+        for i, state in enumerate(trajectory):
+            expected = slow.step(et0[i], rain[i], 0.0)
+            self.assertEqual(state.day, expected.day)
+            self.assertAlmostEqual(state.soil_moisture_mm, expected.soil_moisture_mm)
+            self.assertAlmostEqual(state.memory_factor, expected.memory_factor)
+        self.assertEqual(fast.day, 200)
+        self.assertAlmostEqual(fast.soil_moisture_mm, slow.soil_moisture_mm)
+
+    def test_run_closed_loop_matches_fleet(self):
+        et0 = np.tile([5.0, 6.0, 2.0, 7.5], 25)
+        rain = np.tile([0.0, 30.0, 0.0, 4.0], 25)
+        calls = []
+        sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=90.0)
+        states, irrigation = sim.run_closed_loop(
+            DecisionEngine(), et0, rain, progress=lambda day, days: calls.append(day)
+        )
+        fleet = FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, [90.0])
+        expected = run_closed_loop(fleet, DecisionEngine(), et0, rain)
+
+        np.testing.assert_allclose(states.soil_moisture_mm, expected.soil_moisture_mm[:, 0])
+        np.testing.assert_array_equal(irrigation, expected.irrigation_mm[:, 0])
+        self.assertEqual(sim.day, 100)
+        self.assertEqual(calls, [20, 40, 60, 80, 100])
+
+
 if __name__ == "__main__":
     unittest.main()
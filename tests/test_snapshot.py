@@ -0,0 +1,79 @@
+# tests/test_snapshot.py
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from core.fleet import FleetSimulator
+from core.simulator import SoilTwinSimulator
+from core.snapshot import save_fleet, load_fleet, save_simulator, load_simulator
+from domain.soil import LayeredSoilProfile, LOAM, WHEAT
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fleet_round_trip_continues_identically(self):
+        rng = np.random.default_rng(0)
+        fleet = FleetSimulator(rng.uniform(100, 200, (3, 5)), 50.0, rng.uniform(0.8, 1.2, (3, 5)), 90.0)
+        for _ in range(4):
+            fleet.step(6.0, 1.0, 2.0)
+        save_fleet(fleet, self.path)
+
+        restored = load_fleet(self.path)
+        self.assertEqual(restored.shape, (3, 5))
+        expected = fleet.step(5.0, 0.0, 3.0)
+        actual = restored.step(5.0, 0.0, 3.0)
+        np.testing.assert_array_equal(actual.soil_moisture_mm, expected.soil_moisture_mm)
+        np.testing.assert_array_equal(actual.memory_factor, expected.memory_factor)
+        np.testing.assert_array_equal(actual.day, expected.day)
+
+    def test_save_over_its_own_mapped_source(self):
+        fleet = FleetSimulator(np.linspace(100, 200, 100000), 50.0, 1.1, 90.0)
+        save_fleet(fleet, self.path)
+
+        restored = load_fleet(self.path, mmap=True)
+        restored.step(6.0, 0.0, 0.0)
+        fleet.step(6.0, 0.0, 0.0)
+        save_fleet(restored, self.path)
+
+        reloaded = load_fleet(self.path)
+        np.testing.assert_array_equal(reloaded.soil_moisture_mm, fleet.soil_moisture_mm)
+        np.testing.assert_array_equal(reloaded.field_capacity_mm, fleet.field_capacity_mm)
+        self.assertTrue((reloaded.day == 1).all())
+        self.assertEqual(os.listdir(self.tmp.name), ["state.snap"])
+
+    def test_simulator_round_trip(self):
+        sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=110.0)
+        for _ in range(3):
+            sim.step(7.0, 0.0, 0.0)
+        save_simulator(sim, self.path)
+
+        restored = load_simulator(self.path, soil=LOAM, crop=WHEAT)
+        self.assertEqual(restored.day, 3)
+        self.assertEqual(restored.memory_factor, sim.memory_factor)
+        self.assertEqual(restored.step(4.0, 2.0, 0.0), sim.step(4.0, 2.0, 0.0))
+
+    def test_layered_twin_is_refused(self):
+        sim = SoilTwinSimulator(soil=LayeredSoilProfile.from_profile(LOAM, 3), crop=WHEAT, initial_moisture_mm=65.0)
+        sim.step(2.0, 30.0, 0.0)
+        with self.assertRaises(ValueError):
+            save_simulator(sim, self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot" * 10)
+        with self.assertRaises(ValueError):
+            load_fleet(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# tests/test_trajectory.py
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from core.decision_engine import DecisionEngine
+from core.fleet import FleetSimulator, run_closed_loop
+from core.simulator import SoilTwinSimulator
+from core.trajectory import TrajectoryWriter, read_trajectory, REASON_UNKNOWN
+from domain.soil import LOAM, WHEAT
+
+
+def _fleet():
+    return FleetSimulator(LOAM.field_capacity_mm, LOAM.wilting_point_mm, WHEAT.kc, [150.0, 110.0, 80.0])
+
+
+class TestTrajectoryWriter(unittest.TestCase):
+
+    def test_in_memory_matches_closed_loop(self):
+        et0 = np.full(20, 6.0)
+        rain = np.zeros(20)
+        expected = run_closed_loop(_fleet(), DecisionEngine(), et0, rain)
+
+        writer = TrajectoryWriter(rows_per_batch=7)
+        self.assertIsNone(run_closed_loop(_fleet(), DecisionEngine(), et0, rain, writer=writer))
+        table = writer.table()
+
+        self.assertEqual(table.num_rows, 60)
+        self.assertGreater(len(table.to_batches()), 1)
+        np.testing.assert_array_equal(table["soil_moisture_mm"].to_numpy(), expected.soil_moisture_mm.ravel())
+        np.testing.assert_array_equal(table["reason_code"].to_numpy(), expected.reason_code.ravel())
+        np.testing.assert_array_equal(table["field"].to_numpy(), np.tile(np.arange(3), 20))
+
+    def test_streams_single_twin_to_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.parquet")
+            sim = SoilTwinSimulator(soil=LOAM, crop=WHEAT, initial_moisture_mm=120.0)
+            engine = DecisionEngine()
+            states = []
+            with TrajectoryWriter(path, rows_per_batch=4) as writer:
+                for _ in range(10):
+                    decision = engine.evaluate(sim._calculate_stress(), sim.soil_moisture_mm, LOAM.field_capacity_mm)
+                    state = sim.step(5.0, 0.0, decision.irrigation_mm)
+                    writer.append_state(state, decision)
+                    states.append(state)
+
+            df = read_trajectory(path).to_pandas()
+            self.assertEqual(list(df["day"]), [s.day for s in states])
+            self.assertEqual(list(df["soil_health_score"]), [s.soil_health_score for s in states])
+            self.assertTrue((df["reason_code"] == REASON_UNKNOWN).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_weather_bulk.py
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from core.weather_bulk import BulkWeatherFetcher
+from core.weather_cache import WeatherCache
+
+
+def _payload(lat):
+    return {
+        "latitude": lat,
+        "daily": {
+            "time": ["2025-06-01", "2025-06-02", "2025-06-03"],
+            "temperature_2m_max": [30.0, 32.0, 29.0],
+            "temperature_2m_min": [18.0, 19.0, 17.0],
+            "precipitation_sum": [0.0, lat / 10.0, None],
+        },
+        "current_weather": {"temperature": 25.0, "weathercode": 0},
+    }
+
+
+class _Response:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _FakeSession:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append(params)
+        lats = [float(v) for v in str(params["latitude"]).split(",")]
+        data = [_payload(lat) for lat in lats]
+        return _Response(data[0] if len(data) == 1 else data)
+
+
+class TestBulkWeatherFetcher(unittest.TestCase):
+
+    def test_batches_and_aligns_locations(self):
+        session = _FakeSession()
+        fetcher = BulkWeatherFetcher(days=3, batch_size=4, max_workers=3, session=session)
+        locations = [(float(i), 50.0) for i in range(10)]
+        weather = fetcher.fetch(locations)
+
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(weather.et0_mm.shape, (3, 10))
+        self.assertEqual(weather.dates, ["2025-06-01", "2025-06-02", "2025-06-03"])
+        np.testing.assert_allclose(weather.rainfall_mm[1], [round(i / 10.0, 1) for i in range(10)])
+        np.testing.assert_array_equal(weather.rainfall_mm[2], np.zeros(10))
+
+    def test_cached_locations_are_not_requested(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = WeatherCache(tmp)
+            session = _FakeSession()
+            fetcher = BulkWeatherFetcher(days=3, batch_size=4, session=session, cache=cache)
+            first = fetcher.fetch([(1.0, 2.0), (3.0, 4.0)])
+            second = fetcher.fetch([(1.0, 2.0), (3.0, 4.0)])
+            self.assertEqual(len(session.calls), 1)
+            np.testing.assert_array_equal(first.et0_mm, second.et0_mm)
+
+    def test_duplicate_locations_are_requested_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            session = _FakeSession()
+            fetcher = BulkWeatherFetcher(days=3, session=session, cache=WeatherCache(tmp))
+            # The first two share the cache's 2-decimal key
+            weather = fetcher.fetch([(35.6891, 51.3889), (35.6912, 51.3902), (36.0, 51.0), (35.69, 51.39)])
+            self.assertEqual(len(session.calls), 1)
+            self.assertEqual(session.calls[0]["latitude"], "35.6900,36.0000")
+            self.assertEqual(weather.et0_mm.shape, (3, 4))
+            np.testing.assert_array_equal(weather.rainfall_mm[1], [3.6, 3.6, 3.6, 3.6])
+            np.testing.assert_array_equal(weather.et0_mm[:, 0], weather.et0_mm[:, 3])
+
+            fetcher.fetch([(35.6899, 51.3901)])
+            self.assertEqual(len(session.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_weather_cache.py
+import os
+import tempfile
+import time
+import unittest
+
+from core.weather_api import WeatherAPI
+from core.weather_cache import WeatherCache
+
+VARIABLES = "temperature_2m_max,temperature_2m_min,precipitation_sum"
+PAYLOAD = {
+    "daily": {
+        "time": ["2025-06-01", "2025-06-02"],
+        "temperature_2m_max": [30.0, 31.0],
+        "temperature_2m_min": [18.0, None],
+        "precipitation_sum": [0.0, 4.2],
+    },
+    "current_weather": {"temperature": 27.3, "weathercode": 1},
+}
+
+
+class TestWeatherCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_put_get_and_ttl(self):
+        cache = WeatherCache(self.tmp.name, ttl_seconds=60)
+        key = cache.key(35.68921, 51.38897, "2025-06-01", "2025-06-02", VARIABLES)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, PAYLOAD)
+        self.assertEqual(cache.get(key), PAYLOAD)
+        # Nearby coordinates share the rounded key
+        self.assertEqual(key, cache.key(35.6899, 51.3901, "2025-06-01", "2025-06-02", VARIABLES))
+
+        old = time.time() - 120
+        os.utime(cache._path(key), (old, old))
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(WeatherCache(self.tmp.name, offline=True).get(key), PAYLOAD)
+
+    def test_reads_do_not_extend_ttl(self):
+        cache = WeatherCache(self.tmp.name, ttl_seconds=60)
+        key = cache.key(35.69, 51.39, "2025-06-01", "2025-06-02", VARIABLES)
+        cache.put(key, PAYLOAD)
+        fetched = time.time() - 50
+        os.utime(cache._path(key), (fetched, fetched))
+        for _ in range(3):
+            self.assertEqual(cache.get(key), PAYLOAD)
+        self.assertEqual(os.path.getmtime(cache._path(key)), fetched)
+
+        # Read within every TTL window, yet expired once the fetch is older than the TTL
+        old = time.time() - 61
+        os.utime(cache._path(key), (time.time(), old))
+        self.assertIsNone(cache.get(key))
+
+    def test_size_eviction_drops_least_recently_used(self):
+        cache = WeatherCache(self.tmp.name)
+        first = cache.key(10.0, 10.0, "2025-06-01", "2025-06-02", VARIABLES)
+        second = cache.key(20.0, 20.0, "2025-06-01", "2025-06-02", VARIABLES)
+        cache.put(first, PAYLOAD)
+        old = time.time() - 10
+        os.utime(cache._path(first), (old, old))
+        cache.max_bytes = os.path.getsize(cache._path(first)) + 1
+        cache.put(second, PAYLOAD)
+        self.assertIsNone(cache.get(first))
+        self.assertEqual(cache.get(second), PAYLOAD)
+
+    def test_offline_replays_last_response(self):
+        cache = WeatherCache(self.tmp.name, offline=True)
+        cache.put(cache.key(35.69, 51.39, "2025-06-01", "2025-06-02", VARIABLES), PAYLOAD)
+
+        weather = WeatherAPI(latitude=35.69, longitude=51.39, days=2, cache=cache)
+        et0, rain = weather.fetch()
+        self.assertEqual(len(et0), 2)
+        self.assertEqual(rain, [0.0, 4.2])
+        self.assertEqual(weather.current_temperature(), 27.3)
+
+        with self.assertRaises(ValueError):
+            WeatherAPI(latitude=0.0, longitude=0.0, days=2, cache=cache).fetch()
+
+
+if __name__ == "__main__":
+    unittest.main()